@@ -0,0 +1,99 @@
+"""
+Startup time of scripts/cli.py subcommands
+
+Every subcommand is run as a fresh interpreter against the local emulator. The wall time of each run and the
+cumulative import time reported by -X importtime are measured, and the run fails when the import time of a
+command exceeds its budget. Commands that call the API have to import the client and requests, so they get a
+separate budget.
+
+python -m benchmarks.bench_cli_startup --budget_ms 120 --client_budget_ms 300
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+from omnisearch.emulator import Emulator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (arguments, whether the command calls the API)
+COMMANDS = {
+    "help": (["--help"], False),
+    "search-help": (["search", "--help"], False),
+    "hello": (["hello"], True),
+    "get-records": (["get-records", "--record_type", "post"], True),
+    "search": (["search", "--record_type", "post"], True),
+}
+
+
+def import_times(stderr):
+    """
+    :return: {module: cumulative import microseconds} of the top level imports in -X importtime output, the
+    modules imported by other modules are indented and already counted in their importer's cumulative time
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if not module[1:].startswith(" "):
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def run_command(args, env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT, "scripts", "cli.py")] + args,
+        env=env, capture_output=True, text=True, cwd=ROOT,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    times = import_times(result.stderr)
+    return elapsed, sum(times.values()), times
+
+
+@click.command()
+@click.option("--runs", help="Runs per command.", type=int, default=10)
+@click.option("--budget_ms", help="Maximum import time of a command in milliseconds.", type=float, default=150.0)
+@click.option(
+    "--client_budget_ms", help="Maximum import time of a command calling the API in milliseconds.", type=float,
+    default=350.0,
+)
+@click.option("--top", help="Number of slowest imports to list per command.", type=int, default=5)
+def main(runs, budget_ms, client_budget_ms, top):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "scripts")]))
+
+    failures = []
+    with Emulator(api_key="benchmark-key") as server:
+        env.update(
+            OMNISEARCH_API_SERVER=server.api_host, OMNISEARCH_API_VERSION="v1", OMNISEARCH_API_KEY="benchmark-key"
+        )
+        print(f"{'command':16}{'wall p50 (ms)':>16}{'wall min (ms)':>16}{'imports (ms)':>16}")
+        for name, (args, calls_api) in COMMANDS.items():
+            walls, imports, times = [], [], {}
+            for _ in range(runs):
+                elapsed, total, times = run_command(args, env)
+                walls.append(elapsed)
+                imports.append(total)
+            import_ms = statistics.median(imports) / 1000
+            print(f"{name:16}{statistics.median(walls) * 1000:>16.1f}{min(walls) * 1000:>16.1f}{import_ms:>16.1f}")
+            slowest = sorted(((us, m) for m, us in times.items()), reverse=True)[:top]
+            for us, module in slowest:
+                print(f"    {module:40}{us / 1000:>10.1f} ms")
+            budget = client_budget_ms if calls_api else budget_ms
+            if import_ms > budget:
+                failures.append(f"{name}: imports take {import_ms:.1f}ms, budget {budget:.1f}ms")
+
+    for message in failures:
+        print(f"OVER BUDGET {message}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Client-side overhead of every Client method, excluding the network
+
+Client methods run against an in-process transport adapter that answers with canned bodies, so the numbers
+are the cost of URL building, serialization, response parsing and the client's own bookkeeping. The CLI is
+driven end to end against the local emulator.
+
+python -m benchmarks.bench_client            # run and compare against benchmarks/baseline.json
+python -m benchmarks.bench_client --save     # record a new baseline
+"""
+import io
+import json
+import logging
+import os
+import sys
+from urllib.parse import urlparse
+
+import click
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from benchmarks import harness
+from omnisearch import apiclient, emulator, instrumentation
+from omnisearch.client import Client
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+STUB_HOST = "http://stub/api"
+
+logger = logging.getLogger("benchmarks")
+logger.setLevel(logging.WARNING)
+
+
+def make_record(i):
+    return {
+        "uid": f"record-{i:032x}",
+        "type": "post",
+        "name": f"Post {i}",
+        "hidden": False,
+        "properties": {
+            "title": f"Post title {i}",
+            "slug": f"/posts/post-{i}.html",
+            "author": "Elaine Jones",
+            "categories": ["Tax", "Audit"],
+            "publishedDate": "2023-05-01 10:00",
+        },
+        "data": {"mainImage": f"/images/{i}.png"},
+    }
+
+
+def make_bodies():
+    records = [make_record(i) for i in range(10)]
+    content = {"url": "", "content": "<p>" + "Lorem ipsum dolor sit amet. " * 400 + "</p>"}
+    detailed = [dict(r, objects={"content": content}) for r in records]
+    transcript = [{"start": i * 2.5, "end": i * 2.5 + 2.5, "text": "Lorem ipsum dolor sit amet"} for i in range(500)]
+    bodies = {
+        "/hello": {"message": "Hello"},
+        "/languages": emulator.LANGUAGES,
+        "/records": {"records": records, "total": 10, "page": 0, "page_size": 10},
+        "/records/{uid}": records[0],
+        "/records/{uid}/objects": {"content": content},
+        "/records/{uid}/objects/{type}": content,
+        "/records/{uid}/objects/{type}/content": content["content"],
+        "/records/{uid}/objects/{type}/transcript": transcript,
+        "/schema/{type}": {
+            "author": [["Elaine Jones", 10], ["John Smith", 4]],
+            "categories": [["Audit", 10], ["Tax", 10]],
+        },
+        "/search/{type}": {"results": records, "total": 10, "page": 1, "page_size": 10},
+        "/search/{type}/detailed": {"results": detailed, "total": 10, "page": 1, "page_size": 10},
+    }
+    return {route: json.dumps(body).encode("utf-8") for route, body in bodies.items()}
+
+
+class _Raw(io.BytesIO):
+    decode_content = True
+
+
+class StubAdapter(BaseAdapter):
+    def __init__(self, bodies):
+        """Transport adapter answering every route with a canned body"""
+        super().__init__()
+        self.bodies = bodies
+
+    def send(self, request, stream=False, **kwargs):
+        route = instrumentation.route_template(urlparse(request.url).path[len("/api/v1"):])
+        if route not in self.bodies:
+            raise ValueError(f"No stub for {route}")
+
+        response = requests.Response()
+        response.status_code = 201 if request.method == "POST" else 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.url = request.url
+        response.request = request
+        body = self.bodies[route]
+        if stream:
+            response.raw = _Raw(body)
+        else:
+            response._content = body
+        return response
+
+    def close(self):
+        pass
+
+
+def stub_client(**kwargs):
+    client = Client(logger=logger, api_key="benchmark-key", api_host=STUB_HOST, **kwargs)
+    client.session.mount("http://stub/", StubAdapter(make_bodies()))
+    return client
+
+
+def client_benchmarks(client):
+    record = make_record(1)
+    uid = record["uid"]
+    filters = [["categories", "HasIntersectionWith", ["Tax"]], ["author", "EqualTo", "Elaine Jones"]]
+    objects = json.loads(make_bodies()["/records/{uid}/objects"])
+    return {
+        "client.hello": lambda: client.hello(),
+        "client.languages": lambda: client.languages(),
+        "client.records": lambda: client.records(record_type="post", page=1, page_size=10),
+        "client.record": lambda: client.record(record_id=uid),
+        "client.create_records": lambda: client.create_records(
+            record_type="post", name=record["name"], properties=record["properties"], data=record["data"]
+        ),
+        "client.update_record": lambda: client.update_record(
+            record_id=uid, name=record["name"], properties=record["properties"], data=record["data"]
+        ),
+        "client.delete_record": lambda: client.delete_record(record_id=uid),
+        "client.record_objects": lambda: client.record_objects(record_id=uid),
+        "client.create_record_objects": lambda: client.create_record_objects(record_id=uid, objects=objects),
+        "client.record_objects_type": lambda: client.record_objects_type(record_id=uid, object_type="content"),
+        "client.update_record_objects_type": lambda: client.update_record_objects_type(
+            record_id=uid, object_type="content", data=objects["content"]
+        ),
+        "client.record_type_content": lambda: client.record_type_content(record_id=uid, object_type="content"),
+        "client.record_type_transcript": lambda: client.record_type_transcript(record_id=uid, object_type="video"),
+        "client.record_schema": lambda: client.record_schema(record_type="post", query="tax", filters=filters),
+        "client.search": lambda: client.search(record_type="post", query="tax", filters=filters),
+        "client.search_detailed": lambda: client.search(record_type="post", query="tax", detailed=True),
+    }
+
+
+def component_benchmarks(client):
+    params = {
+        "query": "tax", "record_uids": [], "object_types": [], "filters": '[["author", "EqualTo", "Elaine Jones"]]',
+        "include_hidden": False, "disable_autocorrect": False, "sort_by": "slug:descending", "page": 1,
+        "page_size": 10, "key": "benchmark-key",
+    }
+    payload = {"type": "post", "name": "Post 1", "properties": make_record(1)["properties"], "data": {}}
+    detailed = make_bodies()["/search/{type}/detailed"]
+    return {
+        "apiclient.clean_params": lambda: apiclient.clean_params(params),
+        "apiclient.merge_url": lambda: apiclient.merge_url(f"{STUB_HOST}/v1/search/post", params),
+        "codec.dumps_record": lambda: client.codec.dumps(payload),
+        "codec.loads_detailed_page": lambda: client.codec.loads(detailed),
+    }
+
+
+def cli_benchmarks(api_host):
+    from click.testing import CliRunner
+    from scripts import cli
+
+    runner = CliRunner()
+    env = {"OMNISEARCH_API_SERVER": api_host, "OMNISEARCH_API_VERSION": "v1", "OMNISEARCH_API_KEY": "benchmark-key"}
+    logging.getLogger().setLevel(logging.WARNING)
+
+    def invoke(*args):
+        result = runner.invoke(cli.cli, list(args), env=env)
+        if result.exit_code != 0:
+            raise RuntimeError(result.output)
+
+    return {
+        "cli.hello": lambda: invoke("hello"),
+        "cli.get-records": lambda: invoke("get-records", "--record_type", "post"),
+        "cli.search": lambda: invoke("search", "--record_type", "post", "--query", "post"),
+    }
+
+
+@click.command()
+@click.option("--iterations", help="Calls per benchmark.", type=int, default=2000)
+@click.option("--cli_iterations", help="Calls per CLI benchmark.", type=int, default=200)
+@click.option("--codec", help="JSON codec to benchmark.", type=str, default=None)
+@click.option("--baseline", help="Baseline file.", type=click.Path(), default=BASELINE)
+@click.option("--tolerance", help="Allowed regression as a fraction of the baseline.", type=float, default=0.3)
+@click.option("--save", is_flag=True, default=False, help="Save the results as the new baseline.")
+@click.option("--only", help="Only run benchmarks whose name starts with this.", type=str, default="")
+def main(iterations, cli_iterations, codec, baseline, tolerance, save, only):
+    calibration = harness.calibrate()
+    client = stub_client(codec=codec)
+    benchmarks = dict(client_benchmarks(client), **component_benchmarks(client))
+
+    results = []
+    print(harness.HEADER)
+    for name, func in benchmarks.items():
+        if name.startswith(only):
+            results.append(harness.run(name, func, iterations=iterations))
+            print(results[-1])
+
+    if any(name.startswith(only) for name in ("cli.hello", "cli.get-records", "cli.search")):
+        with emulator.Emulator(api_key="benchmark-key") as server:
+            seed = Client(logger=logger, api_key="benchmark-key", api_host=server.api_host)
+            for i in range(10):
+                record = make_record(i)
+                seed.create_records("post", record["name"], record["properties"], record["data"])
+            for name, func in cli_benchmarks(server.api_host).items():
+                if name.startswith(only):
+                    results.append(harness.run(name, func, iterations=cli_iterations, warmup=5))
+                    print(results[-1])
+
+    if save:
+        harness.save_baseline(baseline, results, calibration)
+        print(f"Saved baseline to {baseline}")
+        return
+
+    failures = harness.regressions(results, harness.load_baseline(baseline), tolerance, calibration)
+    for message in failures:
+        print(f"FAILED {message}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Memory and attribute access cost of omnisearch.models against plain dicts
+
+python -m benchmarks.bench_models --hits 50000
+"""
+import gc
+import random
+import timeit
+import tracemalloc
+
+import click
+
+from omnisearch import models
+
+
+def make_hit(i):
+    return {
+        "uid": f"record-{i:032x}",
+        "type": "post",
+        "name": f"Post {i}",
+        "score": random.random(),
+        "properties": {
+            "title": f"Post title {i}",
+            "slug": f"/posts/post-{i}.html",
+            "author": random.choice(["John Smith", "Elaine Jones", "Jim Fitzgerald"]),
+            "categories": random.sample(["Tax", "Audit", "Company Law", "Financial Reporting"], k=2),
+            "publishedDate": "2023-05-01 10:00",
+        },
+        "data": {"mainImage": f"/images/{i}.png"},
+    }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+@click.command()
+@click.option("--hits", help="Number of search hits to hold.", type=int, default=50000)
+def main(hits):
+    random.seed(0)
+    raw = [make_hit(i) for i in range(hits)]
+    encoded = models.SearchHit.codec.dumps(raw)
+
+    dicts, dict_size = measure(lambda: models.SearchHit.codec.loads(encoded))
+    slotted, model_size = measure(lambda: [models.SearchHit.from_dict(hit) for hit in dicts])
+
+    print(f"{'':24}{'dict':>14}{'SearchHit':>14}")
+    print(f"{'bytes held':24}{dict_size:>14,}{model_size:>14,}")
+    print(f"{'bytes per hit':24}{dict_size // hits:>14,}{model_size // hits:>14,}")
+
+    for label, dict_stmt, model_stmt in (
+        ("uid access (ns)", "for h in dicts: h['uid']", "for h in slotted: h.uid"),
+        ("properties access (ns)", "for h in dicts: h['properties']['title']",
+         "for h in slotted: h.properties['title']"),
+    ):
+        scope = {"dicts": dicts, "slotted": slotted}
+        dict_time = min(timeit.repeat(dict_stmt, globals=scope, number=1, repeat=5)) / hits * 1e9
+        model_time = min(timeit.repeat(model_stmt, globals=scope, number=1, repeat=5)) / hits * 1e9
+        print(f"{label:24}{dict_time:>14.1f}{model_time:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
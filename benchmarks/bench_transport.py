@@ -0,0 +1,138 @@
+"""
+HTTP/1.1 connection pooling (requests.Session) against HTTP/2 multiplexing (http2transport.HTTP2Session)
+
+Concurrent callers share one Client and alternate search and record calls. By default each transport runs
+against its own emulator process (HTTP/1.1, and HTTP/2 with prior knowledge) with --latency added to every
+response, so the numbers show what a connection per in-flight request costs compared to streams over one
+connection. --host benchmarks a real https API instead, where HTTP/2 is negotiated.
+
+python -m benchmarks.bench_transport --concurrency 1 --concurrency 16 --concurrency 128 --latency 0.02
+"""
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+from omnisearch.client import Client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger("benchmarks")
+logger.setLevel(logging.CRITICAL)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_emulator(key, latency, http2):
+    """Run the emulator in its own process, so serving doesn't compete with the callers for the GIL"""
+    port = free_port()
+    args = [sys.executable, "-m", "omnisearch.emulator", "--port", str(port), "--key", key, "--latency", str(latency)]
+    if http2:
+        args.append("--http2")
+    process = subprocess.Popen(args, cwd=ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}/api"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("The emulator didn't start")
+
+
+def run(client, concurrency, calls, record_id):
+    """
+    :return: (seconds, per call latencies, errors)
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def caller(index):
+        nonlocal errors
+        local, failed = [], 0
+        for i in range(calls):
+            start = time.perf_counter()
+            if (index + i) % 2:
+                response = client.search(record_type="post", query="post", page_size=10)
+            else:
+                response = client.record(record_id)
+            local.append(time.perf_counter() - start)
+            failed += response is None
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(caller, range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+@click.command()
+@click.option(
+    "--concurrency", help="Concurrent callers, repeat for several runs.", type=int, multiple=True,
+    default=(1, 16, 128),
+)
+@click.option("--calls", help="Calls per caller.", type=int, default=50)
+@click.option("--latency", help="Seconds the emulator adds to every response.", type=float, default=0.02)
+@click.option("--host", help="Benchmark this API instead of local emulators.", default=None)
+@click.option("--key", help="API key of --host.", default="benchmark-key")
+@click.option("--record_id", help="Record read from --host (the emulators are seeded with one).", default=None)
+def main(concurrency, calls, latency, host, key, record_id):
+    servers = []
+    try:
+        if host:
+            hosts = {"http1.1": (host, False), "http2": (host, True)}
+        else:
+            process, http1_host = start_emulator(key, latency, http2=False)
+            servers.append(process)
+            process, http2_host = start_emulator(key, latency, http2=True)
+            servers.append(process)
+            hosts = {"http1.1": (http1_host, False), "http2": (http2_host, "prior_knowledge")}
+
+        print(f"{'transport':10}{'callers':>8}{'req/s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'connections':>13}"
+              f"{'errors':>8}")
+        for callers in concurrency:
+            for name, (api_host, http2) in hosts.items():
+                # A pool as large as the number of callers, so HTTP/1.1 isn't held back by waiting for connections
+                client = Client(
+                    logger=logger, api_key=key, api_host=api_host, http2=http2, pool_maxsize=callers, pool_block=True
+                )
+                uid = record_id
+                if uid is None:
+                    uid = client.create_records(
+                        record_type="post", name="Post", properties={"title": "Post"}, data={}
+                    )["uid"]
+                seconds, latencies, errors = run(client, callers, calls, uid)
+                print(
+                    f"{name:10}{callers:>8}{len(latencies) / seconds:>10.0f}"
+                    f"{statistics.median(latencies) * 1000:>10.1f}{percentile(latencies, 0.99) * 1000:>10.1f}"
+                    f"{client.pool_stats.new_connections:>13}{errors:>8}"
+                )
+                client.close()
+    finally:
+        for process in servers:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Timing, peak memory and baseline comparison helpers shared by the benchmarks"""
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+
+class Result:
+    def __init__(self, name, rounds, peak_bytes):
+        """
+        :param name: benchmark name
+        :param rounds: for each round, the seconds taken by each call
+        :param peak_bytes: peak memory traced by tracemalloc during one call, in bytes (not a count of allocations)
+        """
+        self.name = name
+        self.rounds = rounds
+        self.timings = sorted(t for timings in rounds for t in timings)
+        self.peak_bytes = peak_bytes
+
+    @property
+    def ops(self):
+        """Throughput of the fastest round, the least disturbed by other load on the machine"""
+        return max(len(timings) / sum(timings) for timings in self.rounds)
+
+    @property
+    def p50(self):
+        return statistics.median(self.timings)
+
+    @property
+    def p99(self):
+        return self.timings[min(int(len(self.timings) * 0.99), len(self.timings) - 1)]
+
+    def as_dict(self):
+        return {"ops": self.ops, "p50": self.p50, "p99": self.p99, "peak_bytes": self.peak_bytes}
+
+    def __str__(self):
+        return (
+            f"{self.name:40}{self.ops:>12,.0f}{self.p50 * 1e6:>12,.1f}{self.p99 * 1e6:>12,.1f}"
+            f"{self.peak_bytes / 1024:>12,.1f}"
+        )
+
+
+HEADER = f"{'benchmark':40}{'ops/sec':>12}{'p50 (us)':>12}{'p99 (us)':>12}{'peak (KiB)':>12}"
+
+
+def run(name, func, iterations=1000, warmup=50, repeat=5):
+    """
+    Call func iterations times in each of repeat rounds, timing every call, then once more under tracemalloc
+    to find the peak memory in use during one call.
+    """
+    for _ in range(warmup):
+        func()
+
+    rounds = []
+    clock = time.perf_counter
+    per_round = max(iterations // repeat, 1)
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            timings = []
+            for _ in range(per_round):
+                start = clock()
+                func()
+                timings.append(clock() - start)
+        finally:
+            gc.enable()
+        rounds.append(timings)
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    return Result(name, rounds, peak_bytes)
+
+
+CALIBRATION = "_calibration"
+
+
+def _reference_workload():
+    value = {"name": "calibration", "values": list(range(50)), "nested": {"a": "b" * 20}}
+    return sorted(json.loads(json.dumps(value))["values"], reverse=True)
+
+
+def calibrate():
+    """
+    Throughput of a fixed reference workload, stored with the baseline so results from a faster or slower (or
+    busier) machine are scaled before being compared.
+    """
+    return run(CALIBRATION, _reference_workload, iterations=5000, warmup=200).ops
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, calibration):
+    baseline = {r.name: r.as_dict() for r in results}
+    baseline[CALIBRATION] = calibration
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(results, baseline, tolerance, calibration):
+    """
+    :return: list of messages for results whose throughput dropped, or whose median latency or peak memory
+    grew, by more than tolerance (a fraction) against the baseline scaled to this machine's calibration, and
+    for results missing from the baseline, which can't be checked; p99 is reported but too noisy to gate on
+    """
+    if not baseline.get(CALIBRATION):
+        return ["no baseline to compare against, record one with --save (make benchmark-baseline)"]
+    scale = calibration / baseline[CALIBRATION]
+    messages = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            messages.append(f"{result.name}: not in the baseline, record a new one with --save")
+            continue
+        base_ops, base_p50 = base["ops"] * scale, base["p50"] / scale
+        if result.ops < base_ops * (1 - tolerance):
+            messages.append(f"{result.name}: {result.ops:,.0f} ops/sec, baseline {base_ops:,.0f}")
+        if result.p50 > base_p50 * (1 + tolerance):
+            messages.append(f"{result.name}: p50 {result.p50 * 1e6:,.1f}us, baseline {base_p50 * 1e6:,.1f}us")
+        if result.peak_bytes > base["peak_bytes"] * (1 + tolerance) + 1024:
+            messages.append(f"{result.name}: {result.peak_bytes:,} bytes peak, baseline {base['peak_bytes']:,}")
+    return messages
@@ -1,5 +1,15 @@
 """Python wrapper around the OmniSearch.ai API"""
 
-from omnisearch.client import Client
-
 __version__ = "0.0.1"
+
+
+def __getattr__(name):
+    # Imported on first use so that importing a light submodule (e.g. omnisearch.exceptions) doesn't pay for
+    # requests
+    if name == "Client":
+        from omnisearch.client import Client
+        return Client
+    if name == "AsyncClient":
+        from omnisearch.asyncclient import AsyncClient
+        return AsyncClient
+    raise AttributeError(f"module 'omnisearch' has no attribute {name!r}")
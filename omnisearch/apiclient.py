@@ -1,7 +1,9 @@
-import json
-from urllib.parse import urlencode
+import hashlib
+import logging
+import time
+from urllib.parse import quote_plus, urlencode
 import requests
-from omnisearch import exceptions
+from omnisearch import compression, conditional, exceptions, instrumentation, serialization, transport
 
 
 def clean_params(params: dict):
@@ -15,25 +17,114 @@ def merge_url(url: str, params: dict):
 
 
 class ApiClient:
-    def __init__(self, logger, api_key, api_host, api_version, **kwargs):
+    def __init__(
+            self, logger, api_key, api_host, api_version,
+            pool_connections=10, pool_maxsize=10, pool_block=False,
+            connect_timeout=10.0, read_timeout=60.0, keep_alive=True, max_retries=0, ssl_context=None, codec=None,
+            hooks=None, conditional_requests=False, http2=False,
+            compress_requests=None, compression_threshold=1024, compression_level=None, accept_encoding=None,
+            **kwargs
+    ):
         """
         :param logger: Logger
         :param base_uri: The base URI to the API
         :param version: API version
+        :param pool_connections: Number of hosts to keep connection pools for
+        :param pool_maxsize: Maximum number of connections kept per host; size it to the number of threads
+        sharing the client
+        :param pool_block: Wait for a free pooled connection instead of opening a throwaway one when all
+        pool_maxsize connections are in use
+        :param connect_timeout: Seconds to wait for a connection to be established (None to wait forever)
+        :param read_timeout: Seconds to wait between bytes of the response (None to wait forever)
+        :param keep_alive: Keep connections (and so their TLS sessions) open for reuse between requests
+        :param max_retries: Number of retries on connection errors (an int or a urllib3 Retry)
+        :param ssl_context: Optional ssl.SSLContext for https connections
+        :param codec: JSON codec for request and response bodies, see serialization.get_codec
+        :param hooks: Callables called with an instrumentation.RequestEvent after every request
+        :param conditional_requests: send repeat GETs with the ETag / Last-Modified validators of the last
+        response and serve a 304 from its stored body; True or a conditional.ValidatorStore, counts are in
+        validators.stats()
+        :param http2: multiplex requests over HTTP/2 (http2transport.HTTP2Session, needs httpx[http2]) instead of
+        pooling HTTP/1.1 connections; HTTP/2 is negotiated on https hosts, "prior_knowledge" also speaks it to
+        plain http hosts
+        :param compress_requests: compress POST, PUT and PATCH bodies with gzip or zstd (needs zstandard), None
+        to send them as they are; counts and ratios are in compression_stats.as_dict()
+        :param compression_threshold: smallest body in bytes worth compressing
+        :param compression_level: gzip or zstd level (default compression.DEFAULT_LEVELS)
+        :param accept_encoding: response encodings to accept, in order of preference (e.g. ["zstd", "gzip"], or
+        "identity" for uncompressed responses); default the transport's own (gzip, deflate)
         """
         self.logger = logger
         self.api_host = api_host
         self.api_version = api_version
         self.api_key = api_key
+        self.codec = serialization.get_codec(codec)
+        self.hooks = list(hooks or [])
+        if conditional_requests is True:
+            conditional_requests = conditional.ValidatorStore()
+        self.validators = conditional_requests if conditional_requests is not False else None
         self.headers = {
             "accept": "application/json",
             "Content-Type": "application/json"
         }
+        if compress_requests is not None:
+            if compress_requests not in compression.REQUEST_ENCODINGS:
+                raise ValueError(
+                    f"Unsupported request encoding {compress_requests!r}, "
+                    f"use one of {', '.join(compression.REQUEST_ENCODINGS)}"
+                )
+            if compress_requests == "zstd":
+                compression._zstd()
+        self.compress_requests = compress_requests
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self.compression_stats = compression.CompressionStats()
+        if accept_encoding is not None:
+            self.headers["Accept-Encoding"] = compression.accept_encoding(accept_encoding)
 
         for k, v in kwargs.items():
             setattr(self, k, v)
 
-        self.session = requests.Session()
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_stats = transport.PoolStats()
+        if http2:
+            from omnisearch import http2transport
+
+            # HTTP/2 forbids the Connection header, connections are closed by not keeping them
+            self.session = http2transport.HTTP2Session(
+                self.pool_stats,
+                ssl_context=ssl_context,
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize if keep_alive else 0,
+                max_retries=max_retries,
+                prior_knowledge=http2 == "prior_knowledge",
+            )
+            self._connect_timer = self.session
+        else:
+            if not keep_alive:
+                self.headers["Connection"] = "close"
+            adapter = transport.PooledHTTPAdapter(
+                self.pool_stats,
+                ssl_context=ssl_context,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                max_retries=max_retries,
+            )
+            self.session = requests.Session()
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+            self._connect_timer = transport
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the pooled connections, and for HTTP/2 the session's event loop thread"""
+        self.session.close()
 
     @property
     def api_host(self):
@@ -46,27 +137,139 @@ class ApiClient:
             value = value[:-1]
         self._api_host = value
 
-    def request(self, method, url, data=None, params=None):
+    def request(self, method, url, data=None, params=None, stream=False):
+        """
+        :param stream: return the requests.Response with its body left unread instead of the decoded body;
+        the caller must close it
+        """
         # Add the api key to params
         if params is None:
             params = {}
 
         params["key"] = self.api_key
 
-        if type(data) == dict:
-            data = json.dumps(data)
+        if isinstance(data, (dict, list)):
+            data = self.codec.dumps(data)
 
         full_url = merge_url(f"{self.api_host}/{self.api_version}{url}", params)
 
-        self.logger.info(full_url)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"{method} {url}")
 
-        result = self.session.request(
-            method=method, url=full_url, data=data, headers=self.headers
-        )
+        headers = self.headers
+        uncompressed_size = None
+        if data and self.compress_requests is not None and method in ("POST", "PUT", "PATCH"):
+            data, headers, uncompressed_size = self._compress(data)
+
+        validator_key = None
+        if self.validators is not None and method == "GET" and not stream:
+            validator_key = self.account_key() + (merge_url(url, {k: v for k, v in params.items() if k != "key"}),)
+            conditional_headers = self.validators.headers(validator_key)
+            if conditional_headers:
+                headers = {**headers, **conditional_headers}
+
+        result = self._send(method, url, full_url, data, headers, stream, uncompressed_size)
+
+        if result.status_code == 304 and validator_key is not None:
+            content = self.validators.not_modified_content(validator_key)
+            if content is not None:
+                return self.codec.loads(content)
+            # The stored body was evicted since the request was sent
+            result = self._send(method, url, full_url, data, self.headers, stream)
 
         if result.status_code in [200, 201]:
-            return json.loads(result.text)
+            if stream:
+                return result
+            if validator_key is not None:
+                self.validators.store(validator_key, result.headers, result.content)
+            return self.codec.loads(result.content)
         else:
             self.logger.error(f"{result.status_code} {result.text}")
 
-        raise exceptions.OmniSearchError
+        raise exceptions.OmniSearchError(result.text, status_code=result.status_code)
+
+    def _compress(self, data):
+        """
+        :return: (body, headers, size before compression or None if the body is sent as it is)
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if len(data) >= self.compression_threshold:
+            compressed = compression.compress(data, self.compress_requests, self.compression_level)
+            # Already compressed or random content can come out larger
+            if len(compressed) < len(data):
+                self.compression_stats.record_request(len(data), len(compressed))
+                return compressed, {**self.headers, "Content-Encoding": self.compress_requests}, len(data)
+        self.compression_stats.record_request(len(data))
+        return data, self.headers, None
+
+    def _send(self, method, url, full_url, data, headers, stream, uncompressed_size=None):
+        self._connect_timer.reset_connect_time()
+        start = time.perf_counter()
+        try:
+            result = self.session.request(
+                method=method, url=full_url, data=data, headers=headers, timeout=self.timeout, stream=stream
+            )
+        except requests.RequestException as e:
+            message = self.redact(str(e))
+            self.logger.error(f"{type(e).__name__} {message}")
+            if self.hooks:
+                self._emit(method, url, start, data, error=e, uncompressed_size=uncompressed_size)
+            raise exceptions.OmniSearchError(message) from e
+
+        response_encoding = result.headers.get("Content-Encoding")
+        received_size = None
+        if response_encoding and not stream:
+            length = result.headers.get("Content-Length")
+            if length and length.isdigit():
+                received_size = int(length)
+                self.compression_stats.record_response(len(result.content), received_size)
+
+        if self.hooks:
+            self._emit(
+                method, url, start, data, result=result, stream=stream, uncompressed_size=uncompressed_size,
+                response_encoding=response_encoding, received_size=received_size,
+            )
+        return result
+
+    def account_key(self):
+        """
+        (api_host, api_version, hash of api_key): the part of the key of caches and stores that can be shared by
+        clients of other hosts and accounts
+        """
+        return self.api_host, self.api_version, hashlib.sha256((self.api_key or "").encode()).hexdigest()[:16]
+
+    def redact(self, text):
+        """Remove the api key from text (e.g. a transport error quoting the request url)"""
+        if not self.api_key:
+            return text
+        return text.replace(quote_plus(str(self.api_key)), "***").replace(str(self.api_key), "***")
+
+    def _emit(
+            self, method, url, start, data, result=None, error=None, stream=False, uncompressed_size=None,
+            response_encoding=None, received_size=None,
+    ):
+        event = instrumentation.RequestEvent(
+            method=method,
+            route=instrumentation.route_template(url),
+            connect=self._connect_timer.connect_time(),
+            total=time.perf_counter() - start,
+            request_bytes=len(data) if data else 0,
+            error=error,
+            request_encoding=self.compress_requests if uncompressed_size is not None else None,
+            uncompressed_request_bytes=uncompressed_size,
+            response_encoding=response_encoding,
+            compressed_response_bytes=received_size,
+        )
+        if result is not None:
+            event.status = result.status_code
+            event.ttfb = result.elapsed.total_seconds()
+            event.response_bytes = None if stream else len(result.content)
+            retries = getattr(result.raw, "retries", None)
+            event.retries = len(retries.history) if retries is not None and retries.history else 0
+
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                self.logger.exception(f"Instrumentation hook {hook!r} failed")
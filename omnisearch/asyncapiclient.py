@@ -0,0 +1,105 @@
+import logging
+from omnisearch import exceptions, serialization
+from omnisearch.apiclient import ApiClient, merge_url
+
+
+class AsyncApiClient:
+    def __init__(
+            self, logger, api_key, api_host, api_version,
+            max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0,
+            connect_timeout=10.0, read_timeout=60.0, codec=None,
+            **kwargs
+    ):
+        """
+        :param logger: Logger
+        :param api_key: The API key
+        :param api_host: The base URI to the API
+        :param api_version: API version
+        :param max_connections: Maximum number of connections the pool will open
+        :param max_keepalive_connections: Maximum number of idle connections kept alive in the pool
+        :param keepalive_expiry: Seconds an idle connection is kept alive
+        :param connect_timeout: Seconds to wait for a connection to be established (None to wait forever)
+        :param read_timeout: Seconds to wait between bytes of the response (None to wait forever)
+        :param codec: JSON codec, see serialization.get_codec
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("AsyncClient requires httpx, install it with: pip install omnisearch[async]")
+
+        self.logger = logger
+        self.api_host = api_host
+        self.api_version = api_version
+        self.api_key = api_key
+        self.codec = serialization.get_codec(codec)
+        self.headers = {
+            "accept": "application/json",
+            "Content-Type": "application/json"
+        }
+
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+        self._httpx = httpx
+        self.session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+
+    @property
+    def api_host(self):
+        return self._api_host
+
+    @api_host.setter
+    def api_host(self, value):
+        """The default api_host"""
+        if value and value.endswith("/"):
+            value = value[:-1]
+        self._api_host = value
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled connections"""
+        await self.session.aclose()
+
+    redact = ApiClient.redact
+
+    async def request(self, method, url, data=None, params=None):
+        # Add the api key to params
+        if params is None:
+            params = {}
+
+        params["key"] = self.api_key
+
+        if isinstance(data, (dict, list)):
+            data = self.codec.dumps(data)
+
+        full_url = merge_url(f"{self.api_host}/{self.api_version}{url}", params)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"{method} {url}")
+
+        try:
+            result = await self.session.request(
+                method=method, url=full_url, content=data, headers=self.headers
+            )
+        except self._httpx.HTTPError as e:
+            message = self.redact(str(e))
+            self.logger.error(f"{type(e).__name__} {message}")
+            raise exceptions.OmniSearchError(message) from e
+
+        if result.status_code in [200, 201]:
+            return self.codec.loads(result.content)
+        else:
+            self.logger.error(f"{result.status_code} {result.text}")
+
+        raise exceptions.OmniSearchError(result.text, status_code=result.status_code)
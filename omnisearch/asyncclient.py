@@ -0,0 +1,140 @@
+"""Omnisearch.ai API Python asyncio Client"""
+from omnisearch import asyncapiclient, cache, exceptions, singleflight
+from omnisearch.client import Client
+
+
+class AsyncClient(asyncapiclient.AsyncApiClient):
+    def __init__(
+        self,
+        logger,
+        api_key,
+        api_host=None,
+        api_version="v1",
+        coalesce=False,
+        **kwargs
+    ):
+        """
+        Every Client endpoint as a coroutine, taking the same arguments and building the same requests (see the
+        Client methods of the same name for their documentation).
+
+        Usage::
+
+            async with AsyncClient(logger=logger, api_key=key, api_host=host) as client:
+                results = await asyncio.gather(client.search("post", query="tax"), client.record(uid))
+
+        :param coalesce: share one request between coroutines concurrently calling record, record_objects,
+        record_schema or search with identical arguments; counts are in single_flight.stats()
+        :param kwargs: Transport settings passed to AsyncApiClient (max_connections, connect_timeout, read_timeout, ...)
+        """
+        super().__init__(logger=logger, api_key=api_key, api_host=api_host, api_version=api_version, **kwargs)
+        self.single_flight = singleflight.AsyncSingleFlight() if coalesce else None
+
+    async def _get(self, url, params=None):
+        if params is None:
+            params = {}
+        if self.single_flight is None:
+            return await self.request(method="GET", url=url, params=params)
+
+        key = cache.make_key(url, params)
+        return await self.single_flight.do(key, lambda: self.request(method="GET", url=url, params=params))
+
+    async def _call(self, method, url, params=None, data=None, coalesce=False):
+        """
+        :param coalesce: GET through request coalescing, when enabled
+        :return: the decoded response, None on error
+        """
+        try:
+            if coalesce:
+                return await self._get(url, params)
+            return await self.request(method=method, url=url, params=params, data=data)
+        except exceptions.OmniSearchError:
+            return None
+
+    async def hello(self):
+        """GET /hello"""
+        return await self._call("GET", "/hello")
+
+    async def languages(self):
+        """GET /languages"""
+        return await self._call("GET", "/languages")
+
+    async def records(self, record_type, page=0, page_size=10):
+        """GET /records"""
+        return await self._call("GET", "/records", params=Client._records_params(record_type, page, page_size))
+
+    async def create_records(self, record_type: str, name: str, properties: dict, data: dict, hidden: bool = False):
+        """POST /records"""
+        body = Client._record_body(name, properties, data, hidden, record_type=record_type)
+        return await self._call("POST", "/records", data=body)
+
+    async def record(self, record_id):
+        """GET /records/{uid}"""
+        return await self._call("GET", f"/records/{record_id}", coalesce=True)
+
+    async def update_record(self, record_id, name: str, properties: dict, data: dict, hidden: bool = False):
+        """PATCH /records/{uid}"""
+        body = Client._record_body(name, properties, data, hidden)
+        return await self._call("PATCH", f"/records/{record_id}", data=body)
+
+    async def delete_record(self, record_id):
+        """DELETE /records/{uid}"""
+        return await self._call("DELETE", f"/records/{record_id}")
+
+    async def record_objects(self, record_id):
+        """GET /records/{uid}/objects"""
+        return await self._call("GET", f"/records/{record_id}/objects", coalesce=True)
+
+    async def create_record_objects(self, record_id, objects):
+        """POST /records/{uid}/objects"""
+        return await self._call("POST", f"/records/{record_id}/objects", data={"objects": objects})
+
+    async def delete_record_objects(self, record_id):
+        """DELETE /records/{uid}/objects"""
+        return await self._call("DELETE", f"/records/{record_id}/objects")
+
+    async def record_objects_type(self, record_id, object_type):
+        """GET /records/{uid}/objects/{type}"""
+        return await self._call("GET", f"/records/{record_id}/objects/{object_type}")
+
+    async def update_record_objects_type(self, record_id, object_type, data):
+        """PUT /records/{uid}/objects/{type}"""
+        return await self._call("PUT", f"/records/{record_id}/objects/{object_type}", data=data)
+
+    async def delete_record_objects_type(self, record_id, object_type):
+        """DELETE /records/{uid}/objects/{type}"""
+        return await self._call("DELETE", f"/records/{record_id}/objects/{object_type}")
+
+    async def record_type_content(self, record_id, object_type):
+        """GET /records/{uid}/objects/{type}/content"""
+        return await self._call("GET", f"/records/{record_id}/objects/{object_type}/content")
+
+    async def record_type_transcript(self, record_id, object_type):
+        """GET /records/{uid}/objects/{type}/transcript"""
+        return await self._call("GET", f"/records/{record_id}/objects/{object_type}/transcript")
+
+    async def record_schema(
+            self, record_type, query="", record_ids=None, object_types=None, filters=None,
+            include_hidden=False, disable_autocorrect=False,
+            excluded_properties=None, aggregate_properties=None,
+            sort_by_count=False,
+    ):
+        """GET /schema/{record_type}"""
+        params = Client._schema_params(
+            query, record_ids, object_types, filters, include_hidden, disable_autocorrect, excluded_properties,
+            aggregate_properties, sort_by_count,
+        )
+        return await self._call("GET", f"/schema/{record_type}", params=params, coalesce=True)
+
+    async def search(
+            self, record_type, query="", record_ids=None, object_types=None, filters=None,
+            include_hidden=False, disable_autocorrect=False, sort_by="",
+            detailed=False, page=1, page_size=10):
+        """
+        GET /search/{record_type}
+        GET /search/{record_type}/detailed
+        """
+        url, params = Client._search_request(
+            record_type, query, record_ids, object_types, filters, include_hidden, disable_autocorrect, sort_by,
+            detailed, page, page_size,
+        )
+        return await self._call("GET", url, params=params, coalesce=True)
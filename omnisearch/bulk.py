@@ -0,0 +1,64 @@
+"""Bounded concurrent execution of bulk record operations"""
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class BulkResult(namedtuple("BulkResult", ["index", "payload", "response", "error"])):
+    """
+    Outcome of one bulk item.
+
+    index: position of the payload in the input iterable
+    payload: the payload that was sent
+    response: the decoded API response, None on failure
+    error: the exception raised for the item (OmniSearchError, or e.g. KeyError for a malformed payload), None
+    on success
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def run_bounded(func, payloads, concurrency=8, max_pending=None):
+    """
+    Call func(payload) for every payload on a pool of concurrency threads and yield a BulkResult per
+    payload as it completes (so not necessarily in input order).
+
+    At most max_pending payloads (2 * concurrency by default) are pulled from the iterable and held in
+    flight at any time, so arbitrarily long iterators are consumed with flat memory.
+
+    :param func: callable taking one payload; an exception raised by it is reported on that payload's result, so
+    one bad payload doesn't end the run
+    :param payloads: iterable of payloads
+    :param concurrency: number of worker threads
+    :param max_pending: maximum number of submitted but not yet yielded payloads
+    :return: generator of BulkResult
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if max_pending is None:
+        max_pending = 2 * concurrency
+
+    def call(index, payload):
+        try:
+            return BulkResult(index, payload, func(payload), None)
+        except Exception as e:
+            return BulkResult(index, payload, None, e)
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="omnisearch-bulk")
+    try:
+        pending = set()
+        for index, payload in enumerate(payloads):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(call, index, payload))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,270 @@
+"""Response caching for read endpoints, in process (ResponseCache) or on disk (DiskCache)"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+def normalize(value):
+    """
+    Normalize an argument for use in a cache key: falsy values (None, "", [], False, 0) compare equal,
+    as the request drops them from the query string anyway, and lists become tuples so they are hashable.
+    """
+    if not value:
+        return None
+    return _hashable(value)
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def make_key(url, params):
+    """
+    Build a cache key for a GET of url with the given query params.
+
+    record_uids and object_types are treated as sets; the order of everything else is significant.
+    """
+    params = dict(params)
+    for name in ("record_uids", "object_types"):
+        if isinstance(params.get(name), (list, tuple)):
+            params[name] = sorted(params[name])
+    return (url,) + tuple(sorted((k, normalize(v)) for k, v in params.items()))
+
+
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=60.0):
+        """
+        LRU cache with a per-entry time to live, safe to share between threads.
+
+        Every entry is tagged (with its record_type) so that writes can invalidate the entries they
+        affect. Cached responses are shared between callers and must be treated as read only.
+
+        :param maxsize: maximum number of entries before the least recently used is evicted
+        :param ttl: seconds an entry stays valid (None for no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        :return: the cached value, or MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, tag, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, tag=None):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, tag, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tag=None):
+        """
+        Drop every entry tagged with tag, or every entry when tag is None.
+        """
+        with self._lock:
+            if tag is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            keys = [k for k, (_, entry_tag, _) in self._entries.items() if entry_tag == tag]
+            for k in keys:
+                del self._entries[k]
+            self.invalidations += len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    tag TEXT,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_tag ON entries (tag);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals (id, size) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+    BEGIN UPDATE totals SET size = size + new.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+    BEGIN UPDATE totals SET size = size - old.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+    BEGIN UPDATE totals SET size = size - old.size + new.size; END;
+"""
+
+
+class DiskCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttl=24 * 60 * 60.0):
+        """
+        Persistent cache in a SQLite database with the ResponseCache interface, so cached responses survive the
+        process and can be shared by processes on the same machine.
+
+        Values are stored as JSON. Entries expire after ttl seconds (wall clock, as they outlive the process),
+        and the least recently read ones are evicted once the stored values exceed max_bytes.
+
+        :param path: SQLite database file
+        :param max_bytes: maximum total size of the stored values
+        :param ttl: seconds an entry stays valid (None for no expiry)
+        """
+        import sqlite3
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(DISK_SCHEMA)
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key, separators=(",", ":"))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, key):
+        """
+        :return: the cached value, or MISSING
+        """
+        key = self._key(key)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISSING
+            value, expires = row
+            if expires is not None and expires < now:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, value, tag=None):
+        value = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO entries (key, tag, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tag = excluded.tag, value = excluded.value, "
+                    "size = excluded.size, expires = excluded.expires, accessed = excluded.accessed",
+                    (self._key(key), tag, value, len(value), expires, now),
+                )
+                self._evict(now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now):
+        if self._total() <= self.max_bytes:
+            return
+        self.expirations += self._db.execute(
+            "DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,)
+        ).rowcount
+        excess = self._total() - self.max_bytes
+        if excess > 0:
+            # The least recently read entries whose sizes add up to the excess
+            self.evictions += self._db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM ("
+                "SELECT key, size, SUM(size) OVER (ORDER BY accessed, key) AS running FROM entries"
+                ") WHERE running - size < ?)",
+                (excess,),
+            ).rowcount
+
+    def _total(self):
+        return self._db.execute("SELECT size FROM totals").fetchone()[0]
+
+    def invalidate(self, tag=None):
+        """
+        Drop every entry tagged with tag, or every entry when tag is None.
+        """
+        with self._lock:
+            if tag is None:
+                self.invalidations += self._db.execute("DELETE FROM entries").rowcount
+            else:
+                self.invalidations += self._db.execute("DELETE FROM entries WHERE tag = ?", (tag,)).rowcount
+
+    def clear(self):
+        self.invalidate()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self):
+        with self._lock:
+            size, total = self._db.execute("SELECT COUNT(*), (SELECT size FROM totals) FROM entries").fetchone()
+        return {
+            "size": size,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -1,6 +1,6 @@
 """Omnisearch.ai API Python Client"""
 import json
-from omnisearch import apiclient, exceptions
+from omnisearch import apiclient, bulk, cache, exceptions, pagination, singleflight, streaming
 
 
 class Client(apiclient.ApiClient):
@@ -10,8 +10,80 @@ class Client(apiclient.ApiClient):
         api_key,
         api_host=None,
         api_version="v1",
+        response_cache=None,
+        coalesce=False,
+        disk_cache=None,
+        **kwargs
     ):
-        super().__init__(logger=logger, api_key=api_key, api_host=api_host, api_version=api_version)
+        """
+        :param response_cache: optional cache.ResponseCache used by search and record_schema; entries for a
+        record_type are invalidated by writes made through this client
+        :param disk_cache: optional cache.DiskCache read through by record, record_objects, record_objects_type,
+        record_type_content and record_type_transcript; a record's entries are invalidated by writes to it made
+        through this client (but not by writes from elsewhere, so pick the cache's ttl accordingly)
+        :param coalesce: share one request between threads concurrently calling record, record_objects,
+        record_schema or search with identical arguments; counts are in single_flight.stats()
+        :param kwargs: Transport settings passed to ApiClient (pool_maxsize, connect_timeout, read_timeout, ...)
+        """
+        super().__init__(logger=logger, api_key=api_key, api_host=api_host, api_version=api_version, **kwargs)
+        self.response_cache = response_cache
+        self.disk_cache = disk_cache
+        self.single_flight = singleflight.SingleFlight() if coalesce else None
+
+    def _get(self, url, params=None, record_type=None, cached=False):
+        """
+        GET url through the response cache (when cached) and request coalescing, when enabled.
+
+        Responses served from the cache or shared between coalesced callers are the same object and must be
+        treated as read only.
+        """
+        if params is None:
+            params = {}
+        use_cache = cached and self.response_cache is not None
+        if not use_cache and self.single_flight is None:
+            return self.request(method="GET", url=url, params=params)
+
+        # The cache may be shared by clients of other hosts and accounts
+        key = self.account_key() + cache.make_key(url, params)
+        if use_cache:
+            value = self.response_cache.get(key)
+            if value is not cache.MISSING:
+                return value
+
+        if self.single_flight is None:
+            value = self.request(method="GET", url=url, params=params)
+        else:
+            value = self.single_flight.do(key, lambda: self.request(method="GET", url=url, params=params))
+
+        if use_cache:
+            self.response_cache.set(key, value, tag=record_type)
+        return value
+
+    def _get_record_data(self, url, record_id):
+        """
+        GET url, a record or one of its objects, through the disk cache when there is one.
+        """
+        if self.disk_cache is None:
+            return self._get(url)
+
+        # The cache may be shared by clients of other hosts and accounts
+        key = self.account_key() + (url,)
+        value = self.disk_cache.get(key)
+        if value is not cache.MISSING:
+            return value
+        value = self._get(url)
+        self.disk_cache.set(key, value, tag=record_id)
+        return value
+
+    def _invalidate(self, record_type=None, record_id=None):
+        """
+        Drop cached responses for record_type; writes addressed by record id don't know the record type
+        and drop every cached response, and the record's disk cache entries.
+        """
+        if self.response_cache is not None:
+            self.response_cache.invalidate(record_type)
+        if self.disk_cache is not None and record_id is not None:
+            self.disk_cache.invalidate(record_id)
 
     def hello(self):
         """
@@ -50,17 +122,43 @@ class Client(apiclient.ApiClient):
         """
         url = "/records"
 
-        params = {
-            "type": record_type,
-            "page": page,
-            "page_size": page_size
-        }
+        params = self._records_params(record_type, page, page_size)
 
         try:
             return self.request(method="GET", url=url, params=params)
         except exceptions.OmniSearchError:
             return None
 
+    @staticmethod
+    def _records_params(record_type, page, page_size):
+        """GET /records query parameters"""
+        return {
+            "type": record_type,
+            "page": page,
+            "page_size": page_size
+        }
+
+    def iter_records(
+            self, record_type, page_size=100, first_page=pagination.RECORDS_FIRST_PAGE, prefetch=True, walk=None
+    ):
+        """
+        GET /records for every page, yielding one record at a time
+
+        The next page is fetched in the background while the current one is consumed. Iteration stops
+        after the first page holding fewer than page_size records.
+
+        :param record_type:
+        :param page_size:
+        :param first_page: page to start from (/records pages are numbered from 0)
+        :param prefetch: fetch the next page while the current one is consumed
+        :param walk: optional pagination.Walk recording the pages
+        :return: generator of records; raises OmniSearchError if a page can't be fetched
+        """
+        def fetch(page):
+            return self.records(record_type=record_type, page=page, page_size=page_size)
+
+        return pagination.iter_pages(fetch, first_page, page_size, prefetch=prefetch, walk=walk)
+
     def create_records(self, record_type: str, name: str, properties: dict, data: dict, hidden: bool = False):
         """
         POST /records
@@ -77,18 +175,21 @@ class Client(apiclient.ApiClient):
         """
         url = "/records"
 
-        data = {
-            "type": record_type,
-            "name": name,
-            "properties": properties,
-            "data": data,
-            "hidden": hidden,
-        }
+        data = self._record_body(name, properties, data, hidden, record_type=record_type)
 
         try:
             return self.request(method="POST", url=url, data=data)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_type)
+
+    @staticmethod
+    def _record_body(name, properties, data, hidden, record_type=None):
+        """POST /records (with record_type) and PATCH /records/{uid} request body"""
+        body = {} if record_type is None else {"type": record_type}
+        body.update(name=name, properties=properties, data=data, hidden=hidden)
+        return body
 
     def record(self, record_id):
         """
@@ -99,7 +200,7 @@ class Client(apiclient.ApiClient):
         """
         url = f"/records/{record_id}"
         try:
-            return self.request(method="GET", url=url)
+            return self._get_record_data(url, record_id)
         except exceptions.OmniSearchError:
             return None
 
@@ -118,17 +219,14 @@ class Client(apiclient.ApiClient):
         """
         url = f"/records/{record_id}"
 
-        data = {
-            "name": name,
-            "properties": properties,
-            "data": data,
-            "hidden": hidden,
-        }
+        data = self._record_body(name, properties, data, hidden)
 
         try:
             return self.request(method="PATCH", url=url, data=data)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_id=record_id)
 
     def delete_record(self, record_id):
         """
@@ -142,6 +240,74 @@ class Client(apiclient.ApiClient):
             return self.request(method="DELETE", url=url)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_id=record_id)
+
+    def bulk_create_records(self, records, concurrency=8, max_pending=None):
+        """
+        POST /records for every record in records, concurrency requests at a time
+
+        Each record is a dict with the create_records arguments:
+            {"record_type": ..., "name": ..., "properties": {...}, "data": {...}, "hidden": False}
+
+        Unlike create_records, failures are not swallowed: every record yields a bulk.BulkResult
+        carrying either the response or the OmniSearchError. Results are yielded as they complete and
+        the input is consumed lazily, so records may be an arbitrarily long iterator.
+
+        :param records: iterable of record dicts
+        :param concurrency: number of requests in flight
+        :param max_pending: maximum number of records buffered (default 2 * concurrency)
+        :return: generator of bulk.BulkResult
+        """
+        return bulk.run_bounded(self._bulk_create, records, concurrency=concurrency, max_pending=max_pending)
+
+    def bulk_update_records(self, records, concurrency=8, max_pending=None):
+        """
+        PATCH /records/{uid} for every record in records, concurrency requests at a time
+
+        Each record is a dict with the update_record arguments:
+            {"record_id": ..., "name": ..., "properties": {...}, "data": {...}, "hidden": False}
+
+        See bulk_create_records for how results are reported.
+
+        :param records: iterable of record dicts
+        :param concurrency: number of requests in flight
+        :param max_pending: maximum number of records buffered (default 2 * concurrency)
+        :return: generator of bulk.BulkResult
+        """
+        return bulk.run_bounded(self._bulk_update, records, concurrency=concurrency, max_pending=max_pending)
+
+    def bulk_write_records(self, records, concurrency=8, max_pending=None):
+        """
+        Create or update every record in records, concurrency requests at a time
+
+        Records with a "record_id" are updated (PATCH /records/{uid}) and the others created (POST /records),
+        see bulk_create_records and bulk_update_records for the record dicts and how results are reported.
+
+        :param records: iterable of record dicts
+        :param concurrency: number of requests in flight
+        :param max_pending: maximum number of records buffered (default 2 * concurrency)
+        :return: generator of bulk.BulkResult
+        """
+        def write(record):
+            return self._bulk_update(record) if record.get("record_id") else self._bulk_create(record)
+
+        return bulk.run_bounded(write, records, concurrency=concurrency, max_pending=max_pending)
+
+    def _bulk_create(self, record):
+        response = self.request(method="POST", url="/records", data=self._record_body(
+            record["name"], record["properties"], record.get("data", {}), record.get("hidden", False),
+            record_type=record["record_type"],
+        ))
+        self._invalidate(record["record_type"])
+        return response
+
+    def _bulk_update(self, record):
+        response = self.request(method="PATCH", url=f"/records/{record['record_id']}", data=self._record_body(
+            record["name"], record["properties"], record.get("data", {}), record.get("hidden", False),
+        ))
+        self._invalidate(record_id=record["record_id"])
+        return response
 
     def record_objects(self, record_id):
         """
@@ -152,7 +318,7 @@ class Client(apiclient.ApiClient):
         """
         url = f"/records/{record_id}/objects"
         try:
-            return self.request(method="GET", url=url)
+            return self._get_record_data(url, record_id)
         except exceptions.OmniSearchError:
             return None
 
@@ -180,6 +346,8 @@ class Client(apiclient.ApiClient):
             return self.request(method="POST", url=url, data=data)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_id=record_id)
 
     def delete_record_objects(self, record_id):
         """
@@ -193,6 +361,8 @@ class Client(apiclient.ApiClient):
             return self.request(method="DELETE", url=url)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_id=record_id)
 
     def record_objects_type(self, record_id, object_type):
         """
@@ -203,7 +373,7 @@ class Client(apiclient.ApiClient):
         url = f"/records/{record_id}/objects/{object_type}"
 
         try:
-            return self.request(method="GET", url=url)
+            return self._get_record_data(url, record_id)
         except exceptions.OmniSearchError:
             return None
 
@@ -219,6 +389,8 @@ class Client(apiclient.ApiClient):
             return self.request(method="PUT", url=url, data=data)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_id=record_id)
 
     def delete_record_objects_type(self, record_id, object_type):
         """
@@ -233,6 +405,8 @@ class Client(apiclient.ApiClient):
             return self.request(method="DELETE", url=url)
         except exceptions.OmniSearchError:
             return None
+        finally:
+            self._invalidate(record_id=record_id)
 
     def record_type_content(self, record_id, object_type):
         """
@@ -244,7 +418,7 @@ class Client(apiclient.ApiClient):
         """
         url = f"/records/{record_id}/objects/{object_type}/content"
         try:
-            return self.request(method="GET", url=url)
+            return self._get_record_data(url, record_id)
         except exceptions.OmniSearchError:
             return None
 
@@ -258,10 +432,42 @@ class Client(apiclient.ApiClient):
         """
         url = f"/records/{record_id}/objects/{object_type}/transcript"
         try:
-            return self.request(method="GET", url=url)
+            return self._get_record_data(url, record_id)
         except exceptions.OmniSearchError:
             return None
 
+    def stream_record_type_content(self, record_id, object_type, item_path=None):
+        """
+        GET /records/{uid}/objects/{type}/content, parsed incrementally
+
+        Yields the items of the content as they are read from the response, so memory is bounded by the
+        size of one item rather than the whole document. Requires ijson.
+
+        :param record_id:
+        :param object_type:
+        :param item_path: ijson prefix of the items; by default the document itself if it is an array,
+        otherwise its first top level array
+        :return: generator of items; sent when iteration starts, raises OmniSearchError if the request fails
+        """
+        url = f"/records/{record_id}/objects/{object_type}/content"
+        response = self.request(method="GET", url=url, stream=True)
+        yield from streaming.iter_response_items(response, item_path=item_path)
+
+    def stream_record_type_transcript(self, record_id, object_type, item_path=None):
+        """
+        GET /records/{uid}/objects/{type}/transcript, parsed incrementally
+
+        Yields transcript segments as they are read from the response. See stream_record_type_content.
+
+        :param record_id:
+        :param object_type:
+        :param item_path: ijson prefix of the segments
+        :return: generator of segments; sent when iteration starts, raises OmniSearchError if the request fails
+        """
+        url = f"/records/{record_id}/objects/{object_type}/transcript"
+        response = self.request(method="GET", url=url, stream=True)
+        yield from streaming.iter_response_items(response, item_path=item_path)
+
     def record_schema(
             self, record_type, query="", record_ids=None, object_types=None, filters=None,
             include_hidden=False, disable_autocorrect=False,
@@ -298,25 +504,38 @@ class Client(apiclient.ApiClient):
         sorted by value ascending
         :return:
         """
+        params = self._schema_params(
+            query, record_ids, object_types, filters, include_hidden, disable_autocorrect, excluded_properties,
+            aggregate_properties, sort_by_count,
+        )
+        try:
+            return self._get(f"/schema/{record_type}", params, record_type, cached=True)
+        except exceptions.OmniSearchError:
+            return None
+
+    @staticmethod
+    def _schema_params(
+            query="", record_ids=None, object_types=None, filters=None, include_hidden=False,
+            disable_autocorrect=False, excluded_properties=None, aggregate_properties=None, sort_by_count=False,
+    ):
+        """GET /schema/{record_type} query parameters of record_schema's arguments"""
         if aggregate_properties is None:
             aggregate_properties = []
         if excluded_properties is None:
             excluded_properties = []
         if filters is None:
             filters = []
-        elif type(filters) == list:
+        elif isinstance(filters, list):
             filters = json.dumps(filters)
         if object_types is None:
             object_types = []
-        elif type(object_types) == list:
+        elif isinstance(object_types, list):
             object_types = json.dumps(object_types)
         if record_ids is None:
             record_ids = []
-        elif type(record_ids) == list:
+        elif isinstance(record_ids, list):
             record_ids = json.dumps(record_ids)
-        url = f"/schema/{record_type}"
-
-        params = {
+        return {
             "query": query,
             "record_uids": record_ids,
             "object_types": object_types,
@@ -328,10 +547,53 @@ class Client(apiclient.ApiClient):
             "sort_by_count": sort_by_count,
         }
 
-        try:
-            return self.request(method="GET", url=url, params=params)
-        except exceptions.OmniSearchError:
-            return None
+    def record_schema_many(self, record_type, facets, query="", concurrency=8, **kwargs):
+        """
+        GET /schema/{record_type} for several facet queries concurrently, merged into one facet map
+
+        Drill-down facets, for example, are each counted with the filters of the other facets:
+
+            schema, errors = client.record_schema_many("post", [
+                {"properties": ["author"], "filters": [["categories", "HasIntersectionWith", ["Tax"]]]},
+                {"properties": ["categories"], "filters": [["author", "EqualTo", "Elaine Jones"]],
+                 "aggregate_properties": ["categories"]},
+            ])
+
+        :param record_type: record type
+        :param facets: list of facet queries, each a dict of record_schema arguments (query, filters,
+        aggregate_properties, excluded_properties, ...) and optionally "properties", the properties of its schema
+        going into the facet map (default all of them)
+        :param query: search query of every facet without a query of its own
+        :param concurrency: number of requests in flight
+        :param kwargs: record_schema arguments shared by every facet, a facet's own arguments take precedence
+        :return: ({property: [[value, count], ...]}, {facet index: exception}), each property taken from the first
+        facet holding it; the facets whose request failed (or whose arguments are invalid) are left out of the map
+        and reported with their error
+        """
+        def fetch(facet):
+            facet = dict(facet)
+            facet.pop("properties", None)
+            params = self._schema_params(**{**kwargs, "query": query, **facet})
+            return self._get(f"/schema/{record_type}", params, record_type, cached=True)
+
+        schemas = [None] * len(facets)
+        errors = {}
+        for result in bulk.run_bounded(fetch, facets, concurrency=concurrency):
+            if result.ok:
+                schemas[result.index] = result.response
+            else:
+                self.logger.error(f"Facet {result.index} of /schema/{record_type} failed: {result.error}")
+                errors[result.index] = result.error
+
+        merged = {}
+        for facet, schema in zip(facets, schemas):
+            if schema is None:
+                continue
+            properties = facet.get("properties")
+            for key in (schema if properties is None else properties):
+                if key in schema and key not in merged:
+                    merged[key] = schema[key]
+        return merged, errors
 
     def search(
             self, record_type, query="", record_ids=None, object_types=None, filters=None,
@@ -367,6 +629,23 @@ class Client(apiclient.ApiClient):
         :param page_size:
         :return:
         """
+        url, params = self._search_request(
+            record_type, query, record_ids, object_types, filters, include_hidden, disable_autocorrect, sort_by,
+            detailed, page, page_size,
+        )
+        try:
+            return self._get(url, params, record_type, cached=True)
+        except exceptions.OmniSearchError:
+            return None
+
+    @staticmethod
+    def _search_request(
+            record_type, query="", record_ids=None, object_types=None, filters=None, include_hidden=False,
+            disable_autocorrect=False, sort_by="", detailed=False, page=1, page_size=10,
+    ):
+        """
+        :return: (url, query parameters) of the search arguments
+        """
         if filters is None:
             filters = []
         if object_types is None:
@@ -389,8 +668,47 @@ class Client(apiclient.ApiClient):
             "page": page,
             "page_size": page_size
         }
+        return url, params
 
-        try:
-            return self.request(method="GET", url=url, params=params)
-        except exceptions.OmniSearchError:
-            return None
+    def iter_search(
+            self, record_type, query="", record_ids=None, object_types=None, filters=None,
+            include_hidden=False, disable_autocorrect=False, sort_by="",
+            detailed=False, page_size=100, first_page=pagination.SEARCH_FIRST_PAGE, prefetch=True):
+        """
+        GET /search/{record_type} for every page, yielding one result at a time
+
+        Takes the search arguments except page. The next page is fetched in the background while the
+        current one is consumed. Iteration stops after the first page holding fewer than page_size results.
+
+        :param first_page: page to start from (/search pages are numbered from 1)
+        :param prefetch: fetch the next page while the current one is consumed
+        :return: generator of results; raises OmniSearchError if a page can't be fetched
+        """
+        def fetch(page):
+            return self.search(
+                record_type=record_type, query=query, record_ids=record_ids, object_types=object_types,
+                filters=filters, include_hidden=include_hidden, disable_autocorrect=disable_autocorrect,
+                sort_by=sort_by, detailed=detailed, page=page, page_size=page_size,
+            )
+
+        return pagination.iter_pages(fetch, first_page, page_size, prefetch=prefetch)
+
+    def stream_search(
+            self, record_type, query="", record_ids=None, object_types=None, filters=None,
+            include_hidden=False, disable_autocorrect=False, sort_by="",
+            detailed=True, page=1, page_size=10, item_path=None):
+        """
+        GET /search/{record_type}/detailed, parsed incrementally
+
+        Takes the search arguments and yields hits as they are read from the response, so a detailed page
+        with large content objects never has to be held in memory at once. Requires ijson.
+
+        :param item_path: ijson prefix of the hits; by default the first top level array of the response
+        :return: generator of hits; sent when iteration starts, raises OmniSearchError if the request fails
+        """
+        url, params = self._search_request(
+            record_type, query, record_ids, object_types, filters, include_hidden, disable_autocorrect, sort_by,
+            detailed, page, page_size,
+        )
+        response = self.request(method="GET", url=url, params=params, stream=True)
+        yield from streaming.iter_response_items(response, item_path=item_path)
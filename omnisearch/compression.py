@@ -0,0 +1,140 @@
+"""
+Request body compression and response Accept-Encoding negotiation
+
+    client = Client(logger=logger, api_key=key, api_host=host, compress_requests="gzip", compression_threshold=1024)
+    client.create_record_objects(record_id, objects)
+    print(client.compression_stats.as_dict())
+
+zstd needs zstandard (pip install omnisearch[zstd]); the transports then also decode zstd responses.
+"""
+import gzip
+import threading
+import zlib
+
+REQUEST_ENCODINGS = ("gzip", "zstd")
+
+# Levels favouring speed: bodies are compressed on the calling thread for every request
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires zstandard, install it with: pip install omnisearch[zstd]")
+    return zstandard
+
+
+def compress(body, encoding, level=None):
+    """
+    :param body: request body
+    :param encoding: gzip or zstd
+    :param level: compression level (default DEFAULT_LEVELS)
+    :return: compressed body
+    """
+    level = DEFAULT_LEVELS.get(encoding) if level is None else level
+    if encoding == "gzip":
+        # mtime=0 so the same body always compresses to the same bytes
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "zstd":
+        return _zstd().ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unsupported request encoding {encoding!r}, use one of {', '.join(REQUEST_ENCODINGS)}")
+
+
+def decompress(body, encoding):
+    """
+    :param body: compressed body
+    :param encoding: Content-Encoding of body (gzip, deflate or zstd)
+    :return: decompressed body
+    """
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    if encoding == "zstd":
+        return _zstd().ZstdDecompressor().decompressobj().decompress(body)
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def decodable_encodings():
+    """Response encodings the transports can decode here: gzip and deflate, and zstd and br when installed"""
+    encodings = ["gzip", "deflate"]
+    for encoding, module in (("zstd", "zstandard"), ("br", "brotli")):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        encodings.insert(0, encoding)
+    return encodings
+
+
+def accept_encoding(encodings):
+    """
+    :param encodings: response encodings in order of preference, or "identity" for uncompressed responses
+    :return: Accept-Encoding header value
+    :raises ValueError: for encodings the transports can't decode
+    """
+    if isinstance(encodings, str):
+        encodings = [encodings]
+    decodable = decodable_encodings() + ["identity"]
+    unsupported = [encoding for encoding in encodings if encoding not in decodable]
+    if unsupported:
+        raise ValueError(f"Can't decode {', '.join(unsupported)} responses, supported: {', '.join(decodable)}")
+    return ", ".join(encodings)
+
+
+class CompressionStats:
+    def __init__(self):
+        """
+        Compression counters of a client.
+
+        compressed_requests: request bodies sent compressed
+        skipped_requests: request bodies under the threshold, or not smaller compressed, sent as they are
+        request_bytes: size of the compressed request bodies before compression
+        request_bytes_sent: size of the compressed request bodies as sent
+        compressed_responses: responses received with a Content-Encoding
+        response_bytes: decoded size of the compressed responses
+        response_bytes_received: size of the compressed responses as received (when they had a Content-Length)
+        """
+        self.compressed_requests = 0
+        self.skipped_requests = 0
+        self.request_bytes = 0
+        self.request_bytes_sent = 0
+        self.compressed_responses = 0
+        self.response_bytes = 0
+        self.response_bytes_received = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, size, sent_size=None):
+        """
+        :param size: body size
+        :param sent_size: compressed size, None if the body was sent as it is
+        """
+        with self._lock:
+            if sent_size is None:
+                self.skipped_requests += 1
+                return
+            self.compressed_requests += 1
+            self.request_bytes += size
+            self.request_bytes_sent += sent_size
+
+    def record_response(self, size, received_size):
+        with self._lock:
+            self.compressed_responses += 1
+            self.response_bytes += size
+            self.response_bytes_received += received_size
+
+    def as_dict(self):
+        return {
+            "compressed_requests": self.compressed_requests,
+            "skipped_requests": self.skipped_requests,
+            "request_bytes": self.request_bytes,
+            "request_bytes_sent": self.request_bytes_sent,
+            "request_ratio": self.request_bytes / self.request_bytes_sent if self.request_bytes_sent else None,
+            "compressed_responses": self.compressed_responses,
+            "response_bytes": self.response_bytes,
+            "response_bytes_received": self.response_bytes_received,
+            "response_ratio": (
+                self.response_bytes / self.response_bytes_received if self.response_bytes_received else None
+            ),
+        }
@@ -0,0 +1,102 @@
+"""Conditional GET requests: validators (ETag, Last-Modified) remembered per url with the body they validate"""
+import threading
+from collections import OrderedDict
+
+
+class ValidatorStore:
+    def __init__(self, maxsize=1024, max_bytes=32 * 1024 * 1024, max_body_bytes=1024 * 1024):
+        """
+        The validators and body of the last 200 response of each GET url, least recently used first.
+
+        Repeat GETs of a url send If-None-Match / If-Modified-Since, and a 304 Not Modified is answered with the
+        stored body instead of downloading it again. Keys are given by the client and include its host, API
+        version and a hash of its api key, so a store can be shared by clients.
+
+        conditional_requests: GETs sent with validators
+        not_modified: 304 responses served from the store
+        bytes_saved: body bytes the 304 responses didn't download
+
+        :param maxsize: maximum number of urls remembered
+        :param max_bytes: maximum total size of the stored bodies, the least recently used are dropped past it
+        :param max_body_bytes: largest body stored, larger ones (e.g. detailed records, transcripts) are fetched
+        unconditionally
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.max_body_bytes = max_body_bytes
+        self.bytes = 0
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def headers(self, key):
+        """
+        :param key: the client's key of the request
+        :return: the conditional request headers for key, empty if nothing is stored for it
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            self._entries.move_to_end(key)
+            self.conditional_requests += 1
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store(self, key, response_headers, content):
+        """
+        Remember the validators and body of a 200 response, or forget key when the response has no validators
+        or its body is larger than max_body_bytes
+        """
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous[2])
+            if (not etag and not last_modified) or len(content) > self.max_body_bytes:
+                return
+            self._entries[key] = (etag, last_modified, content)
+            self.bytes += len(content)
+            while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                _, (_, _, dropped) = self._entries.popitem(last=False)
+                self.bytes -= len(dropped)
+
+    def not_modified_content(self, key):
+        """
+        :return: the stored body answering a 304 for key, None if it is no longer stored
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            content = entry[2]
+            self.not_modified += 1
+            self.bytes_saved += len(content)
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "conditional_requests": self.conditional_requests,
+            "not_modified": self.not_modified,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,626 @@
+"""
+In-process stand-in for the OmniSearch API
+
+Implements every route used by omnisearch.client.Client against an in-memory store, with optional
+per-route latency, jitter, errors and 429 throttling, so the client can be exercised and measured offline:
+
+    with Emulator(api_key="test", faults={"*": Faults(latency=0.01, jitter=0.005)}) as emulator:
+        client = Client(logger=logger, api_key="test", api_host=emulator.api_host)
+        client.create_records(record_type="post", name="Post 1", properties={"title": "Post 1"}, data={})
+
+or from a shell:
+
+    python -m omnisearch.emulator --port 8080 --key test --latency 0.01
+"""
+import argparse
+import ast
+import hashlib
+import json
+import random
+import socket
+import socketserver
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from omnisearch import compression, instrumentation
+
+LANGUAGES = ["en", "de", "es", "fr", "it", "nl", "pt"]
+
+# Handler name suffix of each route template; handlers are Emulator.<method>_<suffix>
+HANDLERS = {
+    "/hello": "hello",
+    "/languages": "languages",
+    "/records": "records",
+    "/records/{uid}": "record",
+    "/records/{uid}/objects": "record_objects",
+    "/records/{uid}/objects/{type}": "record_object",
+    "/records/{uid}/objects/{type}/content": "record_object_content",
+    "/records/{uid}/objects/{type}/transcript": "record_object_transcript",
+    "/schema/{type}": "schema",
+    "/search/{type}": "search",
+    "/search/{type}/detailed": "search_detailed",
+}
+
+
+class EmulatorError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Faults:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1):
+        """
+        Behaviour injected into the responses of a route.
+
+        :param latency: seconds added to every response
+        :param jitter: up to this many seconds added at random on top of latency
+        :param error_rate: fraction of requests answered with a 500
+        :param throttle_rate: fraction of requests answered with a 429
+        :param retry_after: Retry-After seconds sent with 429 responses
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+
+def parse_list(value):
+    """Decode a list query parameter, JSON encoded or in Python repr form"""
+    if not value:
+        return []
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            parsed = parse(value)
+            return parsed if isinstance(parsed, list) else [parsed]
+        except (ValueError, SyntaxError):
+            pass
+    return [value]
+
+
+def parse_bool(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def _compare(op, actual, expected):
+    if op == "equalto":
+        return actual == expected
+    if op == "notequalto":
+        return actual != expected
+    if op == "contains":
+        if isinstance(actual, str):
+            return str(expected).lower() in actual.lower()
+        return isinstance(actual, list) and expected in actual
+    if op == "startswith":
+        return isinstance(actual, str) and actual.startswith(str(expected))
+    if op == "endswith":
+        return isinstance(actual, str) and actual.endswith(str(expected))
+    if op == "isin":
+        return isinstance(expected, list) and actual in expected
+    if op == "hasintersectionwith":
+        actual_values = actual if isinstance(actual, list) else [actual]
+        expected_values = expected if isinstance(expected, list) else [expected]
+        return bool(set(map(str, actual_values)) & set(map(str, expected_values)))
+    try:
+        if op == "lessthan":
+            return actual < expected
+        if op == "greaterthan":
+            return actual > expected
+        if op == "lessthanorequalto":
+            return actual <= expected
+        if op == "greaterthanorequalto":
+            return actual >= expected
+    except TypeError:
+        return False
+    raise EmulatorError(400, f"Unknown filter type {op}")
+
+
+def matches_filters(properties, filters):
+    for key, op, expected in filters:
+        if key not in properties or not _compare(op.lower(), properties[key], expected):
+            return False
+    return True
+
+
+def matches_query(record, query):
+    if not query:
+        return True
+    query = query.lower()
+    values = [record["name"] or ""] + [v for v in record["properties"].values() if isinstance(v, str)]
+    return any(query in value.lower() for value in values)
+
+
+class Store:
+    def __init__(self):
+        """Records and their objects, keyed by uid"""
+        self.records = {}
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def add(self, record_type, name, properties, data=None, hidden=False, uid=None):
+        uid = uid or f"record-{uuid.uuid4().hex}"
+        with self.lock:
+            self.records[uid] = {
+                "uid": uid,
+                "type": record_type,
+                "name": name,
+                "properties": properties or {},
+                "data": data or {},
+                "hidden": bool(hidden),
+            }
+            self.objects[uid] = {}
+        return self.records[uid]
+
+    def get(self, uid):
+        record = self.records.get(uid)
+        if record is None:
+            raise EmulatorError(404, "Record not found")
+        return record
+
+    def select(self, record_type, query="", record_uids=None, filters=None, include_hidden=False):
+        return [
+            r for r in list(self.records.values())
+            if r["type"] == record_type
+            and (include_hidden or not r["hidden"])
+            and (not record_uids or r["uid"] in record_uids)
+            and matches_query(r, query)
+            and matches_filters(r["properties"], filters or [])
+        ]
+
+
+class Emulator:
+    def __init__(
+            self, host="127.0.0.1", port=0, api_key=None, api_version="v1", faults=None, seed=None, http2=False
+    ):
+        """
+        :param host: interface to listen on
+        :param port: port to listen on, 0 for any free port
+        :param api_key: key requests must carry, None to accept any
+        :param api_version: version prefix of the routes
+        :param faults: dict of Faults keyed by "METHOD /route/{template}", "/route/{template}" or "*"
+        :param seed: seed for the fault injection randomness
+        :param http2: speak HTTP/2 with prior knowledge (h2c) instead of HTTP/1.1, needs h2
+        """
+        self.api_key = api_key
+        self.api_version = api_version
+        self.faults = faults or {}
+        self.store = Store()
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.not_modified = 0
+        self.compressed_requests = 0
+        if http2:
+            self._server = socketserver.ThreadingTCPServer((host, port), _h2_handler(self))
+        else:
+            self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def api_host(self):
+        """The api_host to give to Client"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="omnisearch-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def faults_for(self, method, route):
+        return self.faults.get(f"{method} {route}") or self.faults.get(route) or self.faults.get("*")
+
+    def inject(self, method, route):
+        """Sleep and raise the fault configured for the route, if any"""
+        faults = self.faults_for(method, route)
+        if faults is None:
+            return
+        delay = faults.latency + (self.random.uniform(0, faults.jitter) if faults.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        roll = self.random.random()
+        if roll < faults.throttle_rate:
+            raise EmulatorError(429, "Too many requests", headers={"Retry-After": str(faults.retry_after)})
+        if roll < faults.throttle_rate + faults.error_rate:
+            raise EmulatorError(500, "Injected error")
+
+    def handle(self, method, path, query, body):
+        """
+        :return: (status, response body, route template)
+        """
+        prefix = f"/api/{self.api_version}"
+        if not path.startswith(prefix):
+            raise EmulatorError(404, "Not found")
+        path = path[len(prefix):]
+        if self.api_key is not None and query.get("key") != self.api_key:
+            raise EmulatorError(401, "Invalid API key")
+
+        route, path_params = instrumentation.match_route(path)
+        if route not in HANDLERS:
+            raise EmulatorError(404, "Not found")
+
+        self.inject(method, route)
+        handler = getattr(self, f"{method.lower()}_{HANDLERS[route]}", None)
+        if handler is None:
+            raise EmulatorError(405, "Method not allowed")
+        status, result = handler(query, body, **path_params)
+        return status, result, route
+
+    # Routes
+
+    def get_hello(self, query, body):
+        return 200, {"message": "Hello from the OmniSearch emulator"}
+
+    def get_languages(self, query, body):
+        return 200, LANGUAGES
+
+    def get_records(self, query, body):
+        page = int(query.get("page") or 0)
+        page_size = int(query.get("page_size") or 10)
+        records = [r for r in list(self.store.records.values()) if r["type"] == query.get("type")]
+        return 200, {
+            "records": records[page * page_size:(page + 1) * page_size],
+            "total": len(records),
+            "page": page,
+            "page_size": page_size,
+        }
+
+    def post_records(self, query, body):
+        if not body or not body.get("type"):
+            raise EmulatorError(400, "Record type is required")
+        record = self.store.add(
+            body["type"], body.get("name"), body.get("properties"), body.get("data"), body.get("hidden", False)
+        )
+        return 201, record
+
+    def get_record(self, query, body, uid):
+        return 200, self.store.get(uid)
+
+    def patch_record(self, query, body, uid):
+        record = self.store.get(uid)
+        body = body or {}
+        modified = False
+        for key in ("name", "properties", "data", "hidden"):
+            if key in body and body[key] != record[key]:
+                record[key] = body[key]
+                modified = True
+        return 200, {"modified": modified}
+
+    def delete_record(self, query, body, uid):
+        self.store.get(uid)
+        with self.store.lock:
+            del self.store.records[uid]
+            del self.store.objects[uid]
+        return 200, {"message": "Record deleted"}
+
+    def get_record_objects(self, query, body, uid):
+        self.store.get(uid)
+        return 200, self.store.objects[uid]
+
+    def post_record_objects(self, query, body, uid):
+        self.store.get(uid)
+        current = self.store.objects[uid]
+        objects = (body or {}).get("objects") or {}
+        self.store.objects[uid] = {
+            object_type: current.get(object_type) if value is None else value
+            for object_type, value in objects.items()
+            if value is not None or object_type in current
+        }
+        return 201, self.store.objects[uid]
+
+    def delete_record_objects(self, query, body, uid):
+        self.store.get(uid)
+        self.store.objects[uid] = {}
+        return 200, {"message": "Objects deleted"}
+
+    def get_record_object(self, query, body, uid, type):
+        self.store.get(uid)
+        if type not in self.store.objects[uid]:
+            raise EmulatorError(404, "Object not found")
+        return 200, self.store.objects[uid][type]
+
+    def put_record_object(self, query, body, uid, type):
+        self.store.get(uid)
+        self.store.objects[uid][type] = body
+        return 200, body
+
+    def delete_record_object(self, query, body, uid, type):
+        self.get_record_object(query, body, uid, type)
+        del self.store.objects[uid][type]
+        return 200, {"message": "Object deleted"}
+
+    def get_record_object_content(self, query, body, uid, type):
+        _, value = self.get_record_object(query, body, uid, type)
+        return 200, value.get("content") if isinstance(value, dict) else value
+
+    def get_record_object_transcript(self, query, body, uid, type):
+        _, value = self.get_record_object(query, body, uid, type)
+        return 200, value.get("transcript", []) if isinstance(value, dict) else []
+
+    def _select(self, query, type):
+        return self.store.select(
+            type,
+            query=query.get("query", ""),
+            record_uids=parse_list(query.get("record_uids")),
+            filters=parse_list(query.get("filters")),
+            include_hidden=parse_bool(query.get("include_hidden")),
+        )
+
+    def get_schema(self, query, body, type):
+        excluded = set(parse_list(query.get("excluded_properties")))
+        aggregate = set(parse_list(query.get("aggregate_properties")))
+        counts = {}
+        for record in self._select(query, type):
+            for key, value in record["properties"].items():
+                if key in excluded:
+                    continue
+                values = value if key in aggregate and isinstance(value, list) else [value]
+                buckets = counts.setdefault(key, {})
+                for v in values:
+                    marker = json.dumps(v, sort_keys=True)
+                    buckets[marker] = buckets.get(marker, 0) + 1
+
+        def order(bucket):
+            return -bucket[1] if parse_bool(query.get("sort_by_count")) else json.dumps(bucket[0], sort_keys=True)
+
+        return 200, {
+            key: sorted(([json.loads(marker), count] for marker, count in buckets.items()), key=order)
+            for key, buckets in counts.items()
+        }
+
+    def get_search(self, query, body, type, detailed=False):
+        records = self._select(query, type)
+        sort_by = query.get("sort_by")
+        if sort_by:
+            field, _, order = sort_by.partition(":")
+            records.sort(
+                key=lambda r: json.dumps(r["properties"].get(field), sort_keys=True),
+                reverse=order.endswith("descending"),
+            )
+        page = max(int(query.get("page") or 1), 1)
+        page_size = int(query.get("page_size") or 10)
+        results = records[(page - 1) * page_size:page * page_size]
+        if detailed:
+            results = [dict(r, objects=self.store.objects.get(r["uid"], {})) for r in results]
+        return 200, {"results": results, "total": len(records), "page": page, "page_size": page_size}
+
+    def get_search_detailed(self, query, body, type):
+        return self.get_search(query, body, type, detailed=True)
+
+
+def _response_encoding(accept_encoding):
+    """The encoding to compress a response with, given the request's Accept-Encoding"""
+    accepted = {value.split(";")[0].strip() for value in (accept_encoding or "").split(",")}
+    for encoding in compression.decodable_encodings():
+        if encoding in accepted and encoding in ("zstd", "gzip"):
+            return encoding
+    return None
+
+
+def respond(emulator, method, target, raw, headers):
+    """
+    Answer one HTTP request, whatever the protocol it came in
+
+    :param target: request path and query string
+    :param raw: request body
+    :param headers: request headers with lower case names
+    :return: (status, response headers, payload)
+    """
+    emulator.requests += 1
+    url = urlparse(target)
+    query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+    response_headers = {}
+    try:
+        if raw and headers.get("content-encoding"):
+            try:
+                raw = compression.decompress(raw, headers["content-encoding"])
+            except (ValueError, ImportError, OSError, EOFError, zlib.error):
+                raise EmulatorError(415, f"Can't decode a {headers['content-encoding']} body")
+            emulator.compressed_requests += 1
+        body = json.loads(raw) if raw else None
+        status, result, _ = emulator.handle(method, url.path, query, body)
+    except EmulatorError as e:
+        status, result, response_headers = e.status, {"error": e.message}, e.headers
+    except ValueError:
+        status, result = 400, {"error": "Invalid JSON body"}
+
+    payload = json.dumps(result).encode("utf-8")
+    if method == "GET" and status == 200:
+        # Validators for conditional requests: a GET repeating the ETag of an unchanged body gets a 304
+        etag = f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+        response_headers = {**response_headers, "ETag": etag}
+        if headers.get("if-none-match") == etag:
+            emulator.not_modified += 1
+            return 304, response_headers, b""
+    response_headers = {"Content-Type": "application/json", **response_headers}
+    encoding = _response_encoding(headers.get("accept-encoding")) if len(payload) >= 1024 else None
+    if encoding:
+        payload = compression.compress(payload, encoding)
+        response_headers["Content-Encoding"] = encoding
+    return status, response_headers, payload
+
+
+def _handler(emulator):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes, Nagle's algorithm would hold the body back for the client's ACK
+        disable_nagle_algorithm = True
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            status, headers, payload = respond(
+                emulator, self.command, self.path, raw, {k.lower(): v for k, v in self.headers.items()}
+            )
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _respond
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class _H2Handler(socketserver.BaseRequestHandler):
+    """
+    HTTP/2 with prior knowledge (h2c): every request stream is answered in its own thread, so slow responses
+    don't hold up the other streams of the connection
+    """
+
+    # Set by _h2_handler
+    emulator = None
+    h2 = None
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connection = self.h2.connection.H2Connection(
+            self.h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        # Guards the connection state and the socket; waited on for flow control window updates
+        self.window = threading.Condition()
+        self.closed = False
+        # Headers and body chunks of the request streams still being received
+        self.streams = {}
+        with self.window:
+            self.connection.initiate_connection()
+            self._flush()
+        try:
+            while True:
+                data = self.request.recv(65536)
+                if not data or not self._receive(data):
+                    break
+        finally:
+            with self.window:
+                self.closed = True
+                self.window.notify_all()
+
+    def _receive(self, data):
+        """
+        :return: False once the connection is over
+        """
+        with self.window:
+            try:
+                events = self.connection.receive_data(data)
+            except self.h2.exceptions.ProtocolError:
+                self._flush()
+                return False
+            for event in events:
+                self._handle_event(event)
+            self._flush()
+            self.window.notify_all()
+        return not any(isinstance(event, self.h2.events.ConnectionTerminated) for event in events)
+
+    def _handle_event(self, event):
+        events = self.h2.events
+        if isinstance(event, events.RequestReceived):
+            self.streams[event.stream_id] = (dict(event.headers), [])
+        elif isinstance(event, events.DataReceived):
+            self.streams[event.stream_id][1].append(event.data)
+            self.connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, events.StreamEnded):
+            headers, body = self.streams.pop(event.stream_id)
+            threading.Thread(
+                target=self._respond, args=(event.stream_id, headers, b"".join(body)), daemon=True
+            ).start()
+        elif isinstance(event, events.StreamReset):
+            self.streams.pop(event.stream_id, None)
+
+    def _flush(self):
+        data = self.connection.data_to_send()
+        if data:
+            self.request.sendall(data)
+
+    def _respond(self, stream_id, request_headers, raw):
+        status, headers, payload = respond(
+            self.emulator, request_headers[":method"], request_headers[":path"], raw, request_headers
+        )
+        response_headers = [(":status", str(status)), ("content-length", str(len(payload)))]
+        response_headers += [(key.lower(), value) for key, value in headers.items()]
+        with self.window:
+            try:
+                if self.closed:
+                    return
+                self.connection.send_headers(stream_id, response_headers, end_stream=not payload)
+                self._flush()
+                self._send_body(stream_id, payload)
+            except (self.h2.exceptions.ProtocolError, OSError):
+                # The client reset the stream or went away
+                return
+
+    def _send_body(self, stream_id, payload):
+        """Send payload as the flow control windows allow, called holding self.window"""
+        while payload:
+            size = min(self.connection.local_flow_control_window(stream_id), self.connection.max_outbound_frame_size)
+            if size <= 0:
+                self.window.wait()
+                if self.closed:
+                    return
+                continue
+            chunk, payload = payload[:size], payload[size:]
+            self.connection.send_data(stream_id, chunk, end_stream=not payload)
+            self._flush()
+
+
+def _h2_handler(emulator):
+    try:
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+    except ImportError:
+        raise ImportError("The HTTP/2 emulator requires h2, install it with: pip install omnisearch[http2]")
+
+    return type("Handler", (_H2Handler,), {"emulator": emulator, "h2": h2})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the OmniSearch API emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--key", default=None, help="API key requests must carry")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random seconds added on top of latency")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--throttle_rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument("--http2", action="store_true", help="Speak HTTP/2 with prior knowledge (h2c)")
+    args = parser.parse_args()
+
+    faults = {"*": Faults(args.latency, args.jitter, args.error_rate, args.throttle_rate)}
+    emulator = Emulator(host=args.host, port=args.port, api_key=args.key, faults=faults, http2=args.http2)
+    print(f"OmniSearch emulator listening on {emulator.api_host}")
+    try:
+        emulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
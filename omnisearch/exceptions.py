@@ -1,2 +1,4 @@
 class OmniSearchError(Exception):
-    pass
+    def __init__(self, message="", status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,222 @@
+"""
+HTTP/2 transport: an httpx client behind the part of the requests.Session interface ApiClient uses
+
+Concurrent requests from any number of threads are multiplexed as streams over one connection per host (up to
+the server's concurrent stream limit) instead of each holding its own pooled HTTP/1.1 socket. HTTP/2 is
+negotiated by ALPN on https hosts; plain http hosts speak HTTP/1.1 unless prior_knowledge is set.
+
+Requests are sent by an httpx.AsyncClient on an event loop thread owned by the session: httpcore takes the next
+stream id and sends the stream's headers without a lock, which threads sharing a connection would race on, while
+on one loop nothing runs in between.
+"""
+import asyncio
+import datetime
+import threading
+import time
+
+import requests
+
+
+class ConnectTimer:
+    def __init__(self, stats):
+        """
+        httpcore trace callback of one request: counts the connections it opens and the time spent opening them
+
+        :param stats: transport.PoolStats
+        """
+        self.stats = stats
+        self.connect = 0.0
+        self._started = None
+
+    async def __call__(self, event, info):
+        if event == "connection.connect_tcp.started":
+            self.stats.record_new_connection()
+            self._started = time.perf_counter()
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            now = time.perf_counter()
+            self.connect += now - (self._started or now)
+            self._started = now
+
+
+class RawStream:
+    def __init__(self, session, response):
+        """
+        Binary file-like reader of a streamed httpx.Response, standing in for requests' Response.raw
+
+        :param session: HTTP2Session the response was sent by
+        :param response: httpx.Response sent with stream=True
+        """
+        self._session = session
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+        # The body is always decoded; kept for callers setting it as they would on urllib3's response
+        self.decode_content = True
+
+    async def _next_chunk(self):
+        return await self._chunks.__anext__()
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                chunk = self._session.run(self._next_chunk())
+            except StopAsyncIteration:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class HTTP2Response:
+    def __init__(self, session, response, elapsed, stream=False):
+        """
+        :param session: HTTP2Session the response was sent by
+        :param response: httpx.Response
+        :param elapsed: seconds until the response headers arrived
+        :param stream: leave the body unread, to be read from raw
+        """
+        self._session = session
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+        self.raw = RawStream(session, response) if stream else None
+
+    @property
+    def content(self):
+        try:
+            return self._response.content
+        except self._session._httpx.ResponseNotRead:
+            return self._session.run(self._response.aread())
+
+    @property
+    def text(self):
+        self.content
+        return self._response.text
+
+    def close(self):
+        self._session.run(self._response.aclose())
+
+
+class HTTP2Session:
+    def __init__(
+            self, stats, ssl_context=None, max_connections=10, max_keepalive_connections=10, keepalive_expiry=5.0,
+            max_retries=0, prior_knowledge=False
+    ):
+        """
+        :param stats: transport.PoolStats, counting requests and new connections (an HTTP/2 connection is shared,
+        so exhausted and wait_time stay 0)
+        :param ssl_context: optional ssl.SSLContext for https connections
+        :param max_connections: maximum number of connections (HTTP/2 needs one per host)
+        :param max_keepalive_connections: maximum number of idle connections kept open
+        :param keepalive_expiry: seconds an idle connection is kept open
+        :param max_retries: number of retries on connection errors (an int or a urllib3 Retry)
+        :param prior_knowledge: speak HTTP/2 without negotiating it, required for HTTP/2 over plain http (h2c)
+        """
+        try:
+            import httpx
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError("The HTTP/2 transport requires httpx[http2], install it with: pip install omnisearch[http2]")
+
+        if not isinstance(max_retries, int):
+            max_retries = max_retries.connect or max_retries.total or 0
+
+        self._httpx = httpx
+        self.stats = stats
+        self._timings = threading.local()
+        # Hosts with a connection; until then requests to a host wait for the first one to open it, rather than
+        # each negotiating a connection of their own
+        self._connected = set()
+        self._connecting = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="omnisearch-http2", daemon=True)
+        self._thread.start()
+        self.client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                verify=ssl_context or True,
+                http1=not prior_knowledge,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                retries=max_retries,
+            ),
+        )
+
+    def run(self, coroutine):
+        """Run coroutine on the session's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def reset_connect_time(self):
+        """Start measuring the time the current thread's requests spend opening connections"""
+        self._timings.connect = 0.0
+
+    def connect_time(self):
+        """Seconds the current thread's requests spent opening connections since reset_connect_time"""
+        return getattr(self._timings, "connect", 0.0)
+
+    async def _send(self, request, stream):
+        """
+        :return: (httpx.Response, seconds until its headers arrived)
+        """
+        start = time.perf_counter()
+        host = request.url.scheme, request.url.host, request.url.port
+        if host in self._connected:
+            response = await self.client.send(request, stream=True)
+        else:
+            if self._connecting is None:
+                self._connecting = asyncio.Lock()
+            async with self._connecting:
+                response = await self.client.send(request, stream=True)
+                self._connected.add(host)
+        elapsed = time.perf_counter() - start
+        if not stream:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+        return response, elapsed
+
+    def request(self, method, url, data=None, headers=None, timeout=None, stream=False):
+        """
+        :param timeout: (connect, read) seconds, as taken by requests
+        :return: HTTP2Response
+        :raises requests.RequestException: the requests exception matching the httpx error
+        """
+        httpx = self._httpx
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        timer = ConnectTimer(self.stats)
+        request = self.client.build_request(
+            method,
+            url,
+            content=data,
+            headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            extensions={"trace": timer},
+        )
+        self.stats.record_checkout(False, 0.0)
+        try:
+            response, elapsed = self.run(self._send(request, stream))
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.RequestException(str(e)) from e
+        finally:
+            self._timings.connect = self.connect_time() + timer.connect
+        return HTTP2Response(self, response, elapsed, stream=stream)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self.run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,243 @@
+"""
+Per-request instrumentation
+
+ApiClient calls every hook in its hooks list with a RequestEvent once a request completes (or fails):
+
+    collector = HistogramCollector()
+    client = Client(logger=logger, api_key=key, api_host=host, hooks=[collector])
+    ...
+    print(collector.to_prometheus())
+"""
+import re
+import threading
+
+ROUTES = [
+    ("/hello", re.compile(r"^/hello$")),
+    ("/languages", re.compile(r"^/languages$")),
+    ("/records", re.compile(r"^/records$")),
+    ("/records/{uid}", re.compile(r"^/records/(?P<uid>[^/]+)$")),
+    ("/records/{uid}/objects", re.compile(r"^/records/(?P<uid>[^/]+)/objects$")),
+    ("/records/{uid}/objects/{type}", re.compile(r"^/records/(?P<uid>[^/]+)/objects/(?P<type>[^/]+)$")),
+    ("/records/{uid}/objects/{type}/content",
+     re.compile(r"^/records/(?P<uid>[^/]+)/objects/(?P<type>[^/]+)/content$")),
+    ("/records/{uid}/objects/{type}/transcript",
+     re.compile(r"^/records/(?P<uid>[^/]+)/objects/(?P<type>[^/]+)/transcript$")),
+    ("/schema/{type}", re.compile(r"^/schema/(?P<type>[^/]+)$")),
+    ("/search/{type}", re.compile(r"^/search/(?P<type>[^/]+)$")),
+    ("/search/{type}/detailed", re.compile(r"^/search/(?P<type>[^/]+)/detailed$")),
+]
+
+# Template of every url no route matches, so ids in unknown urls don't each get a metric series
+OTHER_ROUTE = "other"
+
+
+def match_route(url):
+    """
+    :param url: API path without the version prefix, e.g. /records/record-123/objects
+    :return: (route template, path parameters), or (OTHER_ROUTE, {}) for an unknown route
+    """
+    for template, pattern in ROUTES:
+        match = pattern.match(url)
+        if match:
+            return template, match.groupdict()
+    return OTHER_ROUTE, {}
+
+
+def route_template(url):
+    """/records/record-123/objects -> /records/{uid}/objects"""
+    return match_route(url)[0]
+
+
+class RequestEvent:
+    __slots__ = (
+        "method", "route", "status", "connect", "ttfb", "total",
+        "request_bytes", "response_bytes", "retries", "error",
+        "request_encoding", "uncompressed_request_bytes", "response_encoding", "compressed_response_bytes",
+    )
+
+    def __init__(
+            self, method, route, status=None, connect=None, ttfb=None, total=None,
+            request_bytes=0, response_bytes=None, retries=0, error=None,
+            request_encoding=None, uncompressed_request_bytes=None, response_encoding=None,
+            compressed_response_bytes=None,
+    ):
+        """
+        :param method: HTTP method
+        :param route: route template, e.g. /records/{uid}
+        :param status: response status code, None if no response was received
+        :param connect: seconds spent opening new connections for the request (DNS, TCP and TLS), 0 when a
+        pooled connection was reused
+        :param ttfb: seconds until the response headers were received
+        :param total: seconds until the response body was read (headers only for streamed responses)
+        :param request_bytes: size of the request body as sent
+        :param response_bytes: size of the response body, None for streamed responses
+        :param retries: number of retries made by the transport
+        :param error: exception raised by the transport, if any
+        :param request_encoding: Content-Encoding of the request body, None if sent uncompressed
+        :param uncompressed_request_bytes: size of a compressed request body before compression
+        :param response_encoding: Content-Encoding of the response
+        :param compressed_response_bytes: size of a compressed response as received, when it had a Content-Length
+        """
+        self.method = method
+        self.route = route
+        self.status = status
+        self.connect = connect
+        self.ttfb = ttfb
+        self.total = total
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.retries = retries
+        self.error = error
+        self.request_encoding = request_encoding
+        self.uncompressed_request_bytes = uncompressed_request_bytes
+        self.response_encoding = response_encoding
+        self.compressed_response_bytes = compressed_response_bytes
+
+    @property
+    def request_ratio(self):
+        """Compression ratio of the request body, None if it wasn't compressed"""
+        if self.uncompressed_request_bytes is None or not self.request_bytes:
+            return None
+        return self.uncompressed_request_bytes / self.request_bytes
+
+    @property
+    def response_ratio(self):
+        """Compression ratio of the response, None if it wasn't compressed or its compressed size is unknown"""
+        if not self.compressed_response_bytes or self.response_bytes is None:
+            return None
+        return self.response_bytes / self.compressed_response_bytes
+
+    def __repr__(self):
+        return f"RequestEvent({', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__)})"
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound), ...] ending with +Inf"""
+        result, total = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float("inf"), self.count))
+        return result
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q quantile"""
+        if not self.count:
+            return None
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return bound
+
+
+def _label_value(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method, route, status):
+    return f'method="{_label_value(method)}",route="{_label_value(route)}",status="{_label_value(status)}"'
+
+
+class HistogramCollector:
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="omnisearch_client"):
+        """
+        Hook aggregating RequestEvents per (method, route, status) into latency histograms and byte and retry
+        counters, exportable in the Prometheus text format.
+        """
+        self.buckets = buckets
+        self.prefix = prefix
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        status = str(event.status) if event.status is not None else type(event.error).__name__
+        key = (event.method, event.route, status)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    "total": Histogram(self.buckets),
+                    "ttfb": Histogram(self.buckets),
+                    "connect": Histogram(self.buckets),
+                    "request_bytes": 0,
+                    "response_bytes": 0,
+                    "uncompressed_request_bytes": 0,
+                    "compressed_response_bytes": 0,
+                    "retries": 0,
+                }
+            if event.total is not None:
+                series["total"].observe(event.total)
+            if event.ttfb is not None:
+                series["ttfb"].observe(event.ttfb)
+            if event.connect:
+                series["connect"].observe(event.connect)
+            series["request_bytes"] += event.request_bytes or 0
+            series["response_bytes"] += event.response_bytes or 0
+            # Bodies sent or received as they are count the same before and after compression
+            series["uncompressed_request_bytes"] += (
+                event.uncompressed_request_bytes if event.uncompressed_request_bytes is not None
+                else event.request_bytes or 0
+            )
+            series["compressed_response_bytes"] += (
+                event.compressed_response_bytes if event.compressed_response_bytes is not None
+                else event.response_bytes or 0
+            )
+            series["retries"] += event.retries or 0
+
+    def to_prometheus(self):
+        """
+        :return: the collected metrics in the Prometheus text exposition format
+        """
+        with self._lock:
+            series = sorted(self.series.items())
+        lines = []
+        for name, help_text in (
+            ("total", "Time until the response body was read"),
+            ("ttfb", "Time until the response headers were received"),
+            ("connect", "Time spent opening new connections"),
+        ):
+            metric = f"{self.prefix}_request_{name}_seconds"
+            lines.append(f"# HELP {metric} {help_text}.")
+            lines.append(f"# TYPE {metric} histogram")
+            for (method, route, status), values in series:
+                histogram = values[name]
+                labels = _labels(method, route, status)
+                for bound, total in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {total}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        for name, help_text in (
+            ("request_bytes", "Request body bytes sent"),
+            ("response_bytes", "Response body bytes received, decoded"),
+            ("uncompressed_request_bytes", "Request body bytes before compression"),
+            ("compressed_response_bytes", "Response body bytes received, before decoding"),
+            ("retries", "Retries made by the transport"),
+        ):
+            metric = f"{self.prefix}_{name}_total"
+            lines.append(f"# HELP {metric} {help_text}.")
+            lines.append(f"# TYPE {metric} counter")
+            for (method, route, status), values in series:
+                labels = _labels(method, route, status)
+                lines.append(f"{metric}{{{labels}}} {values[name]}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,223 @@
+"""
+Local SQLite mirror of the records (and optionally their objects) of a record type
+
+    mirror = Mirror(client, "post.db", objects=True)
+    stats = mirror.sync("post")
+    for record in mirror.records("post"):
+        ...
+
+The API has no change feed, so every sync pages through the record type with Client.iter_records. Each record is
+compared with the mirror by a hash of its content, and only new or changed records are written and have their
+objects fetched. Records a sync didn't see are deleted only when the sync is verified complete: it reached the last
+page, every page had a recognized shape, and the records it saw match the total every page reported. An
+interrupted, empty or unverified sync (e.g. records deleted while paging shifted the pages) deletes nothing. Rows
+keep the record as JSON text, so SQLite's JSON functions can query it:
+
+    SELECT uid FROM records WHERE json_extract(record, '$.properties.author') = 'Elaine Jones'
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+from omnisearch import bulk, pagination
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    uid TEXT PRIMARY KEY,
+    record_type TEXT NOT NULL,
+    name TEXT,
+    hidden INTEGER,
+    record TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_generation ON records (record_type, generation);
+CREATE TABLE IF NOT EXISTS objects (
+    uid TEXT PRIMARY KEY,
+    objects TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    record_type TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    started REAL,
+    finished REAL
+);
+"""
+
+
+def encode(record):
+    """Canonical JSON text of a record, the same for equal records whatever their key order"""
+    return json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Mirror:
+    def __init__(self, client, path, objects=False, page_size=100, batch_size=500, concurrency=8):
+        """
+        :param client: Client
+        :param path: SQLite database file
+        :param objects: also mirror the objects of every record
+        :param page_size: records fetched per page
+        :param batch_size: records compared and written per transaction
+        :param concurrency: object requests in flight
+        """
+        self.client = client
+        self.objects_enabled = objects
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def sync(self, record_type, refresh_objects=False):
+        """
+        Bring the mirror of record_type up to date
+
+        :param record_type:
+        :param refresh_objects: fetch the objects of every record, not only of new and changed ones (objects can
+        change without their record changing)
+        :return: {"seen", "created", "updated", "unchanged", "deleted", "objects_fetched", "objects_failed",
+        "verified"}, verified False when records not seen were kept because the walk couldn't be verified complete
+        :raises OmniSearchError: if a page can't be fetched, leaving the records synced so far and deleting none
+        """
+        row = self.db.execute("SELECT generation FROM syncs WHERE record_type = ?", (record_type,)).fetchone()
+        generation = (row[0] if row else 0) + 1
+        stats = dict.fromkeys(
+            ("seen", "created", "updated", "unchanged", "deleted", "objects_fetched", "objects_failed"), 0
+        )
+        started = time.time()
+
+        batch = []
+        walk = pagination.Walk()
+        for record in self.client.iter_records(record_type, page_size=self.page_size, walk=walk):
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self._sync_batch(record_type, batch, generation, refresh_objects, stats)
+                batch = []
+        if batch:
+            self._sync_batch(record_type, batch, generation, refresh_objects, stats)
+
+        synced = self.db.execute(
+            "SELECT COUNT(*) FROM records WHERE record_type = ? AND generation = ?", (record_type, generation)
+        ).fetchone()[0]
+        stats["verified"] = walk.verified(synced)
+        with self.db:
+            if stats["verified"]:
+                stale = "SELECT uid FROM records WHERE record_type = ? AND generation < ?"
+                self.db.execute(f"DELETE FROM objects WHERE uid IN ({stale})", (record_type, generation))
+                stats["deleted"] = self.db.execute(
+                    "DELETE FROM records WHERE record_type = ? AND generation < ?", (record_type, generation)
+                ).rowcount
+            self.db.execute(
+                "INSERT INTO syncs (record_type, generation, started, finished) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (record_type) DO UPDATE SET "
+                "generation = excluded.generation, started = excluded.started, finished = excluded.finished",
+                (record_type, generation, started, time.time()),
+            )
+        return stats
+
+    def _sync_batch(self, record_type, records, generation, refresh_objects, stats):
+        encoded = {}
+        for record in records:
+            text = encode(record)
+            encoded[record["uid"]] = (record, text, content_hash(text))
+        stats["seen"] += len(encoded)
+
+        uids = list(encoded)
+        placeholders = ",".join("?" * len(uids))
+        stored = dict(self.db.execute(f"SELECT uid, hash FROM records WHERE uid IN ({placeholders})", uids))
+
+        changed, unchanged = [], []
+        for uid, (record, text, digest) in encoded.items():
+            if stored.get(uid) == digest:
+                unchanged.append(uid)
+                continue
+            stats["updated" if uid in stored else "created"] += 1
+            changed.append((uid, record_type, record.get("name"), int(bool(record.get("hidden"))), text, digest,
+                            generation))
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO records (uid, record_type, name, hidden, record, hash, generation) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (uid) DO UPDATE SET "
+                "record_type = excluded.record_type, name = excluded.name, hidden = excluded.hidden, "
+                "record = excluded.record, hash = excluded.hash, generation = excluded.generation",
+                changed,
+            )
+            self.db.executemany(
+                "UPDATE records SET generation = ? WHERE uid = ?", [(generation, uid) for uid in unchanged]
+            )
+        stats["unchanged"] += len(unchanged)
+
+        if not self.objects_enabled:
+            return
+        if refresh_objects:
+            fetch = uids
+        else:
+            # Objects of changed records, and of unchanged ones mirrored before objects were
+            missing = self.db.execute(
+                f"SELECT uid FROM records WHERE uid IN ({placeholders}) "
+                f"AND NOT EXISTS (SELECT 1 FROM objects WHERE objects.uid = records.uid)",
+                uids,
+            )
+            fetch = list({row[0] for row in changed} | {row[0] for row in missing})
+        self._sync_objects(fetch, stats)
+
+    def _sync_objects(self, uids, stats):
+        fetched, failed = [], []
+        for result in bulk.run_bounded(self.client.record_objects, uids, concurrency=self.concurrency):
+            # record_objects returns None when the request fails
+            if result.ok and result.response is not None:
+                fetched.append((result.payload, encode(result.response)))
+            else:
+                failed.append((result.payload,))
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO objects (uid, objects) VALUES (?, ?) "
+                "ON CONFLICT (uid) DO UPDATE SET objects = excluded.objects",
+                fetched,
+            )
+            # Forget the hash of records whose objects couldn't be fetched, so the next sync retries them
+            self.db.executemany("UPDATE records SET hash = '' WHERE uid = ?", failed)
+        stats["objects_fetched"] += len(fetched)
+        stats["objects_failed"] += len(failed)
+
+    def records(self, record_type):
+        """
+        :return: generator of the mirrored records of record_type
+        """
+        cursor = self.db.execute("SELECT record FROM records WHERE record_type = ? ORDER BY uid", (record_type,))
+        for (text,) in cursor:
+            yield json.loads(text)
+
+    def record(self, uid):
+        """
+        :return: the mirrored record, None if it isn't mirrored
+        """
+        row = self.db.execute("SELECT record FROM records WHERE uid = ?", (uid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def objects(self, uid):
+        """
+        :return: the mirrored objects of a record, None if they aren't mirrored
+        """
+        row = self.db.execute("SELECT objects FROM objects WHERE uid = ?", (uid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, record_type):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE record_type = ?", (record_type,)).fetchone()[0]
@@ -0,0 +1,153 @@
+"""
+Compact result types
+
+Every model keeps its top level scalar fields in __slots__ and its nested fields (properties, data,
+content, ...) as encoded JSON bytes that are decoded each time they are accessed. Holding many results
+this way costs a fraction of the memory of the nested dicts returned by Client:
+
+    hits = models.hits_from_response(client.search(record_type="post", page_size=100))
+    hits[0].uid             # plain attribute
+    hits[0].properties      # decoded on access
+"""
+from array import array
+
+from omnisearch import pagination, serialization
+
+
+class _Lazy:
+    """Descriptor decoding a nested field from its encoded slot"""
+
+    def __init__(self, name):
+        self.name = name
+        self.slot = f"_{name}"
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        raw = getattr(obj, self.slot)
+        return None if raw is None else owner.codec.loads(raw)
+
+
+class _Model:
+    __slots__ = ("_extra",)
+    # Encoded with the standard library, whose output is sized exactly; orjson keeps its over-allocated
+    # output buffer around, which would cost more than the dicts being replaced
+    encoder = serialization.JsonCodec()
+    codec = serialization.get_codec("auto")
+    eager_fields = ()
+    lazy_fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.lazy_fields:
+            setattr(cls, name, _Lazy(name))
+        cls._known = frozenset(cls.eager_fields + cls.lazy_fields)
+
+    @classmethod
+    def from_dict(cls, value):
+        obj = cls.__new__(cls)
+        for name in cls.eager_fields:
+            setattr(obj, name, value.get(name))
+        for name in cls.lazy_fields:
+            field = value.get(name)
+            setattr(obj, f"_{name}", None if field is None else cls.encoder.dumps(field))
+        extra = {k: v for k, v in value.items() if k not in cls._known}
+        obj._extra = cls.encoder.dumps(extra) if extra else None
+        return obj
+
+    @property
+    def extra(self):
+        """Fields of the response that aren't modelled"""
+        return {} if self._extra is None else self.codec.loads(self._extra)
+
+    def to_dict(self):
+        value = self.extra
+        for name in self.eager_fields + self.lazy_fields:
+            field = getattr(self, name)
+            if field is not None:
+                value[name] = field
+        return value
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.eager_fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class Record(_Model):
+    __slots__ = ("uid", "type", "name", "hidden", "_properties", "_data")
+    eager_fields = ("uid", "type", "name", "hidden")
+    lazy_fields = ("properties", "data")
+
+
+class SearchHit(_Model):
+    __slots__ = ("uid", "type", "name", "score", "_properties", "_data", "_objects")
+    eager_fields = ("uid", "type", "name", "score")
+    lazy_fields = ("properties", "data", "objects")
+
+
+class RecordObject(_Model):
+    __slots__ = ("type", "url", "_content")
+    eager_fields = ("type", "url")
+    lazy_fields = ("content",)
+
+
+class SchemaBuckets:
+    """
+    The [[value, count], ...] buckets of one schema property, with the counts held in an array
+    """
+    __slots__ = ("values", "counts")
+
+    def __init__(self, buckets):
+        self.values = tuple(bucket[0] for bucket in buckets)
+        self.counts = array("q", (bucket[1] for bucket in buckets))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return zip(self.values, self.counts)
+
+    def __getitem__(self, index):
+        return self.values[index], self.counts[index]
+
+    def __repr__(self):
+        return f"SchemaBuckets({list(self)!r})"
+
+
+def records_from_response(response):
+    """
+    :param response: a Client.records page
+    :return: list of Record
+    """
+    return [Record.from_dict(item) for item in pagination.page_items(response)]
+
+
+def hits_from_response(response):
+    """
+    :param response: a Client.search page
+    :return: list of SearchHit
+    """
+    return [SearchHit.from_dict(item) for item in pagination.page_items(response)]
+
+
+def objects_from_response(response):
+    """
+    :param response: a Client.record_objects response, mapping object type to object
+    :return: dict of object type to RecordObject
+    """
+    if not response:
+        return {}
+    return {
+        object_type: RecordObject.from_dict(dict(value, type=value.get("type", object_type)))
+        for object_type, value in response.items()
+    }
+
+
+def schema_from_response(response):
+    """
+    :param response: a Client.record_schema response, mapping property name to [[value, count], ...]
+    :return: dict of property name to SchemaBuckets
+    """
+    if not response:
+        return {}
+    return {name: SchemaBuckets(buckets) for name, buckets in response.items() if isinstance(buckets, list)}
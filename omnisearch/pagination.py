@@ -0,0 +1,134 @@
+"""Auto-paginating iteration over paged OmniSearch endpoints"""
+from concurrent.futures import ThreadPoolExecutor
+
+from omnisearch import exceptions
+
+# /records pages are numbered from 0, /search pages from 1
+RECORDS_FIRST_PAGE = 0
+SEARCH_FIRST_PAGE = 1
+
+ITEM_KEYS = ("records", "results", "hits", "items", "data")
+
+
+def page_items(response):
+    """
+    Return the list of items held by a page response.
+
+    A page is either a list of items or a dict holding the items under one of ITEM_KEYS.
+
+    :param response: decoded page response
+    :return: list
+    """
+    if response is None:
+        return []
+    if isinstance(response, list):
+        return response
+    for key in ITEM_KEYS:
+        if isinstance(response.get(key), list):
+            return response[key]
+    return []
+
+
+def is_page(response):
+    """
+    :return: True if response has one of the shapes page_items reads items from
+    """
+    if isinstance(response, list):
+        return True
+    return isinstance(response, dict) and any(isinstance(response.get(key), list) for key in ITEM_KEYS)
+
+
+class Walk:
+    def __init__(self):
+        """
+        What one iter_pages walk saw, to tell whether it went through every item
+
+        pages: pages fetched
+        items: items yielded
+        totals: distinct item counts reported by the pages ("total"), more than one if items were added or removed
+        during the walk
+        unrecognized: pages page_items didn't recognize the shape of
+        finished: the walk reached its last page
+        """
+        self.pages = 0
+        self.items = 0
+        self.totals = set()
+        self.unrecognized = 0
+        self.finished = False
+
+    def record(self, response, items):
+        self.pages += 1
+        self.items += len(items)
+        if not is_page(response):
+            self.unrecognized += 1
+        elif isinstance(response, dict) and isinstance(response.get("total"), int):
+            self.totals.add(response["total"])
+
+    def verified(self, count):
+        """
+        :param count: distinct items the caller kept from the walk
+        :return: True if the walk finished, recognized every page, wasn't empty, and count matches the one total
+        every page reported
+        """
+        return (
+            self.finished
+            and not self.unrecognized
+            and self.items > 0
+            and len(self.totals) == 1
+            and count == next(iter(self.totals))
+        )
+
+
+def iter_pages(fetch, first_page, page_size, prefetch=True, walk=None):
+    """
+    Yield every item of every page returned by fetch(page), starting at first_page and stopping after
+    the first page holding fewer than page_size items.
+
+    With prefetch the next page is requested on a background thread while the caller consumes the
+    current one.
+
+    :param fetch: callable taking a page number and returning the decoded page (None on error)
+    :param first_page: number of the first page
+    :param page_size: number of items requested per page
+    :param prefetch: fetch page N+1 while page N is being consumed
+    :param walk: optional Walk recording the pages
+    :return: generator of items
+    """
+    def get(page):
+        response = fetch(page)
+        if response is None:
+            raise exceptions.OmniSearchError(f"Error fetching page {page}")
+        items = page_items(response)
+        if walk is not None:
+            walk.record(response, items)
+        return items
+
+    def finish():
+        if walk is not None:
+            walk.finished = True
+
+    if not prefetch:
+        page = first_page
+        while True:
+            items = get(page)
+            yield from items
+            if len(items) < page_size:
+                finish()
+                return
+            page += 1
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="omnisearch-prefetch")
+    try:
+        page = first_page
+        future = executor.submit(get, page)
+        while True:
+            items = future.result()
+            if len(items) < page_size:
+                yield from items
+                finish()
+                return
+            page += 1
+            future = executor.submit(get, page)
+            yield from items
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
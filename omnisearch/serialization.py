@@ -0,0 +1,64 @@
+"""Pluggable JSON codecs serializing straight to and from bytes"""
+import json
+
+
+class JsonCodec:
+    """Standard library json"""
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """orjson (pip install orjson)"""
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class MsgspecCodec:
+    """msgspec (pip install msgspec)"""
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self.dumps = msgspec.json.Encoder().encode
+        self.loads = msgspec.json.Decoder().decode
+
+
+CODECS = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def get_codec(codec=None):
+    """
+    Resolve a codec.
+
+    :param codec: None for the standard library codec, a codec name ("json", "orjson", "msgspec"),
+    "auto" for the fastest installed codec, or an object with dumps(obj) -> bytes and loads(bytes) methods
+    :return: codec
+    """
+    if codec is None:
+        return JsonCodec()
+    if codec == "auto":
+        for cls in (OrjsonCodec, MsgspecCodec):
+            try:
+                return cls()
+            except ImportError:
+                pass
+        return JsonCodec()
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec}, expected one of {', '.join(CODECS)}")
+        return CODECS[codec]()
+    return codec
@@ -0,0 +1,92 @@
+"""Coalescing of identical concurrent calls into one"""
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Runs at most one call per key at a time across threads: callers arriving while a call for their
+        key is in flight wait for it and share its result (or exception) instead of making their own.
+
+        calls: calls actually made
+        coalesced: calls that shared the result of one in flight
+        """
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.event.set()
+
+    def stats(self):
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        """
+        SingleFlight for coroutines running on one event loop.
+        """
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+
+    async def do(self, key, func):
+        """
+        :param func: coroutine function called with no arguments
+        """
+        # Imported here: the sync client uses this module and shouldn't pay for importing asyncio
+        import asyncio
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = self._in_flight[key] = asyncio.ensure_future(func())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                del self._in_flight[key]
+            else:
+                future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+    def stats(self):
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
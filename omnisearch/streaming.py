@@ -0,0 +1,69 @@
+"""Incremental parsing of large JSON responses"""
+import itertools
+
+
+def _ijson():
+    try:
+        import ijson
+    except ImportError:
+        raise ImportError("Streaming requires ijson, install it with: pip install omnisearch[stream]")
+    return ijson
+
+
+def detect_item_path(events):
+    """
+    Find the array holding the items of a response: the document itself when it is an array, otherwise
+    the first array held by a top level key.
+
+    :param events: ijson parse events
+    :return: (item prefix, events) where events replays the events consumed while looking
+    """
+    seen = []
+    for event in events:
+        seen.append(event)
+        prefix, name, _ = event
+        if name == "start_array" and "." not in prefix:
+            path = f"{prefix}.item" if prefix else "item"
+            return path, itertools.chain(seen, events)
+        if name == "start_map" and prefix:
+            # Skip over nested objects instead of buffering their events
+            seen.pop()
+            depth = 1
+            for _, skipped, _ in events:
+                if skipped in ("start_map", "start_array"):
+                    depth += 1
+                elif skipped in ("end_map", "end_array"):
+                    depth -= 1
+                if depth == 0:
+                    break
+    return None, iter(())
+
+
+def iter_items(fileobj, item_path=None):
+    """
+    Yield the items of a JSON array read incrementally from fileobj, so only one item is held in memory
+    at a time.
+
+    :param fileobj: binary file-like object
+    :param item_path: ijson prefix of the items (e.g. "results.item"); detected with detect_item_path
+    when not given
+    :return: generator of decoded items
+    """
+    ijson = _ijson()
+    events = ijson.parse(fileobj, use_float=True)
+    if item_path is None:
+        item_path, events = detect_item_path(events)
+        if item_path is None:
+            return
+    yield from ijson.items(events, item_path)
+
+
+def iter_response_items(response, item_path=None):
+    """
+    Yield the items of a streamed requests.Response and close it once exhausted or abandoned.
+    """
+    try:
+        response.raw.decode_content = True
+        yield from iter_items(response.raw, item_path=item_path)
+    finally:
+        response.close()
@@ -0,0 +1,121 @@
+"""Connection pooling for the requests transport with pool usage counters"""
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_timings = threading.local()
+
+
+def reset_connect_time():
+    """Start measuring the time the current thread spends opening connections"""
+    _timings.connect = 0.0
+
+
+def connect_time():
+    """Seconds the current thread spent opening connections since reset_connect_time"""
+    return getattr(_timings, "connect", 0.0)
+
+
+class PoolStats:
+    def __init__(self):
+        """
+        Counters shared by every connection pool of an adapter.
+
+        requests: connections checked out of a pool (one per HTTP request attempt)
+        new_connections: connections opened (each one a TCP, and for https a TLS, handshake)
+        exhausted: checkouts that found every pooled connection in use
+        wait_time: seconds spent waiting for a pooled connection
+        """
+        self.requests = 0
+        self.new_connections = 0
+        self.exhausted = 0
+        self.wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, exhausted, wait_time):
+        with self._lock:
+            self.requests += 1
+            self.wait_time += wait_time
+            if exhausted:
+                self.exhausted += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def as_dict(self):
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_rate": reused / self.requests if self.requests else 0.0,
+            "exhausted": self.exhausted,
+            "wait_time": self.wait_time,
+        }
+
+
+class _TimedConnectMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _timings.connect = connect_time() + time.perf_counter() - start
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class _InstrumentedPoolMixin:
+    stats = None
+
+    def _get_conn(self, timeout=None):
+        exhausted = self.pool is not None and self.pool.empty()
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout)
+        self.stats.record_checkout(exhausted, time.perf_counter() - start)
+        # New connections and pooled ones closed since (by the server, or for want of keep-alive) connect on use
+        if conn.sock is None:
+            self.stats.record_new_connection()
+        return conn
+
+
+class InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats, ssl_context=None, **kwargs):
+        """
+        HTTPAdapter whose connection pools record checkouts and new connections into stats.
+
+        :param stats: PoolStats
+        :param ssl_context: optional ssl.SSLContext used for https connections
+        :param kwargs: HTTPAdapter arguments (pool_connections, pool_maxsize, pool_block, max_retries)
+        """
+        self.stats = stats
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.ssl_context is not None:
+            pool_kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        stats = self.stats
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("HTTPConnectionPool", (InstrumentedHTTPConnectionPool,), {"stats": stats}),
+            "https": type("HTTPSConnectionPool", (InstrumentedHTTPSConnectionPool,), {"stats": stats}),
+        }
@@ -1,6 +1,9 @@
+import functools
 import json
 import random
-from chance import chance
+from itertools import accumulate
+
+from chance import chance, dictionaries
 
 
 def pick_one(values):
@@ -8,8 +11,59 @@ def pick_one(values):
 
 
 def pick_many(values, minimum, maximum):
-    num_values = random.choice(range(minimum, maximum))
-    return json.dumps(list(set(random.choices(values, k=num_values))))
+    num_values = random.randrange(minimum, maximum)
+    # dict.fromkeys de-duplicates in pick order, a set's order would depend on the string hash seed
+    return json.dumps(list(dict.fromkeys(random.choices(values, k=num_values))))
+
+
+# chance builds words one random.randint per letter, which makes its text functions the bulk of corpus
+# generation. These draw whole syllables instead, with the same distribution: a syllable is 2 or 3 letters with
+# even odds, alternating consonant and vowel starting with a consonant. They generate different text from the same
+# seed, so only the corpus generator uses them (corpus_functions_map).
+
+@functools.lru_cache(maxsize=None)
+def _syllables(language):
+    consonants, vowels = dictionaries.consonants[language], dictionaries.vowels[language]
+    two = [c + v for c in consonants for v in vowels]
+    three = [s + c for s in two for c in consonants]
+    weights = [0.5 / len(two)] * len(two) + [0.5 / len(three)] * len(three)
+    return two + three, list(accumulate(weights))
+
+
+def _words(count, language='en', syllables=0):
+    """count words of syllables syllables each, 2 or 3 with even odds when 0"""
+    pool, cum_weights = _syllables(language)
+    lengths = [syllables or 2 + (random.random() < 0.5) for _ in range(count)]
+    drawn = random.choices(pool, cum_weights=cum_weights, k=sum(lengths))
+    words, start = [], 0
+    for length in lengths:
+        words.append("".join(drawn[start:start + length]))
+        start += length
+    return words
+
+
+def word(syllables=0, language='en'):
+    return _words(1, language, syllables)[0]
+
+
+def sentence(words=0, ended_by='', language='en'):
+    length = words or random.randint(12, 18)
+    ended_by = random.choice(ended_by) if ended_by else '.'
+    return " ".join(_words(length, language)).capitalize() + ended_by
+
+
+def paragraph(sentences=0, language='en'):
+    length = sentences or random.randint(3, 7)
+    return " ".join(sentence(ended_by='....?!', language=language) for _ in range(length))
+
+
+def path(depth=0, minimum=4, maximum=6):
+    return "/" + "/".join(_words(depth or random.randint(minimum, maximum)))
+
+
+def filepath(extentions=None, depth=0, minimum=4, maximum=6):
+    extention = random.choice(extentions or dictionaries.extentions)
+    return f"{path(depth, minimum, maximum)}/{word()}.{extention}"
 
 
 functions_map = {
@@ -41,6 +95,15 @@ functions_map = {
     'pick_many': pick_many,
 }
 
+corpus_functions_map = {
+    **functions_map,
+    'word': word,
+    'sentence': sentence,
+    'paragraph': paragraph,
+    'path': path,
+    'filepath': filepath,
+}
+
 
 def chance_dictionary(values):
     """
@@ -58,12 +121,33 @@ def chance_dictionary(values):
     :param values: dict
     :return: dict
     """
-    result = dict()
+    return generate_dictionary(compile_dictionary(values))
+
+
+def compile_dictionary(values, functions=None):
+    """
+    Resolve the generator function of every key of a chance_dictionary spec once, for generating many
+    dictionaries from the same spec with generate_dictionary.
+
+    :param values: dict
+    :param functions: generator functions by name (default functions_map)
+    :return: list of (key, function, params), function is None for constant values
+    """
+    functions = functions_map if functions is None else functions
+    compiled = []
     for key in values:
         fname = values[key][0]
-        if fname not in functions_map:
-            result[key] = values[key]
+        if fname not in functions:
+            compiled.append((key, None, values[key]))
         else:
             params = values[key][1] if len(values[key]) == 2 else {}
-            result[key] = functions_map[fname](**params)
-    return result
+            compiled.append((key, functions[fname], params))
+    return compiled
+
+
+def generate_dictionary(compiled):
+    """
+    :param compiled: compile_dictionary result
+    :return: dict
+    """
+    return {key: value if function is None else function(**value) for key, function, value in compiled}
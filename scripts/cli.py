@@ -7,20 +7,21 @@ export OMNISEARCH_API_KEY=<your api key>
 python scripts/cli.py hello --colour
 """
 import functools
+import itertools
 import logging
+import os
+import time
 from collections import OrderedDict
 import json
-import string
-from datetime import datetime
-from typing import Optional
+import shlex
 import click
-from portabletext_html import PortableTextRenderer
-from portabletext_html.types import Block
 
-from omnisearch.client import Client
 from omnisearch import exceptions
-from scripts.colour_json import print_json_in_colour
-from scripts.chance_extension import chance_dictionary
+from scripts import templates
+from scripts.colour_json import OUTPUTS, print_json_in_colour, print_json_stream
+
+# Heavy modules (requests through omnisearch.client, chance, portabletext_html, pygments) are imported by
+# the functions that use them, so each command only pays for what it needs at startup.
 
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
@@ -38,12 +39,52 @@ def common_params(func):
     )
     @click.option("--key", envvar='OMNISEARCH_API_KEY', help="OmniSearch API Key.", type=str)
     @click.option("--colour", is_flag=True, show_default=True, default=False, help="Print json output in colour.")
+    @click.option(
+        "--output", type=click.Choice(OUTPUTS), show_default=True, default="pretty",
+        help="Output format: pretty printed, compact json, or ndjson (one compact line per record)."
+    )
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         return func(*args, **kwargs)
     return wrapper
 
 
+_clients = {}
+
+
+def make_client(host, version, key):
+    """
+    One client per (host, version, key), so the commands run by shell and batch share its connection pool.
+    Record and object reads go through a disk cache when OMNISEARCH_DISK_CACHE names its database file, and
+    request bodies are compressed when OMNISEARCH_COMPRESS_REQUESTS is gzip or zstd.
+    """
+    client = _clients.get((host, version, key))
+    if client is not None:
+        return client
+
+    from omnisearch.client import Client
+
+    disk_cache = None
+    if os.environ.get("OMNISEARCH_DISK_CACHE"):
+        from omnisearch.cache import DiskCache
+
+        disk_cache = DiskCache(os.environ["OMNISEARCH_DISK_CACHE"])
+    client = _clients[(host, version, key)] = Client(
+        logger=logger, api_key=key, api_host=host, api_version=version, disk_cache=disk_cache,
+        compress_requests=os.environ.get("OMNISEARCH_COMPRESS_REQUESTS") or None,
+    )
+    return client
+
+
+def close_clients():
+    """Close the clients made by make_client and their disk caches"""
+    while _clients:
+        _, client = _clients.popitem()
+        client.close()
+        if client.disk_cache is not None:
+            client.disk_cache.close()
+
+
 class NaturalOrderGroup(click.Group):
     """Command group trying to list subcommands in the order they were added.
 
@@ -64,8 +105,11 @@ class NaturalOrderGroup(click.Group):
 
 
 @click.group(cls=NaturalOrderGroup, commands=OrderedDict())
-def cli():
-    pass
+@click.pass_context
+def cli(ctx):
+    # Commands run by shell and batch share the session's clients, which are closed once the session ends
+    if not (ctx.obj or {}).get("session"):
+        ctx.call_on_close(close_clients)
 
 
 @cli.command()
@@ -75,12 +119,13 @@ def hello(
     version,
     key,
     colour,
+    output,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         hello_response = omnisearch_client.hello()
-        print_json_in_colour(hello_response, colour=colour)
+        print_json_in_colour(hello_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /hello")
 
@@ -92,12 +137,13 @@ def get_languages(
     version,
     key,
     colour,
+    output,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         languages_response = omnisearch_client.languages()
-        print_json_in_colour(languages_response, colour=colour)
+        print_json_in_colour(languages_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /languages")
 
@@ -107,20 +153,28 @@ def get_languages(
 @click.option("--record_type", help="OmniSearch Record Type.", type=str)
 @click.option("--page", help="OmniSearch Page Number.", type=int, default=0)
 @click.option("--page_size", help="OmniSearch Page Size.", type=int, default=10)
+@click.option("--all", "all_pages", is_flag=True, show_default=True, default=False,
+              help="Stream the records of every page from --page on.")
 def get_records(
     host,
     version,
     key,
     colour,
+    output,
     record_type,
     page,
     page_size,
+    all_pages,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
+        if all_pages:
+            records = omnisearch_client.iter_records(record_type=record_type, page_size=page_size, first_page=page)
+            print_json_stream(records, colour=colour, output=output)
+            return
         records_response = omnisearch_client.records(record_type=record_type, page=page, page_size=page_size)
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records")
 
@@ -140,6 +194,7 @@ def create_records(
     version,
     key,
     colour,
+    output,
     record_type,
     name,
     hidden,
@@ -148,7 +203,7 @@ def create_records(
     properties,
     data,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     properties_json, data_json = get_data(generate, replacement, properties, data)
 
@@ -160,7 +215,7 @@ def create_records(
             data=data_json,
             hidden=hidden
         )
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records")
 
@@ -173,13 +228,14 @@ def get_record(
     version,
     key,
     colour,
+    output,
     record_id,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.record(record_id=record_id)
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /record/{uid}")
 
@@ -199,6 +255,7 @@ def update_record(
     version,
     key,
     colour,
+    output,
     record_id,
     name,
     hidden,
@@ -207,7 +264,7 @@ def update_record(
     properties,
     data,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     properties_json, data_json = get_data(generate, replacement, properties, data)
 
@@ -221,7 +278,7 @@ def update_record(
         )
         if "modified" in records_response and not records_response["modified"]:
             raise exceptions.OmniSearchError
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /record/{uid}")
 
@@ -234,9 +291,10 @@ def delete_record(
     version,
     key,
     colour,
+    output,
     record_id,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.delete_record(record_id=record_id)
@@ -244,7 +302,7 @@ def delete_record(
             raise exceptions.OmniSearchError
 
         if records_response:
-            print_json_in_colour(records_response, colour=colour)
+            print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /record/{uid}")
 
@@ -257,13 +315,14 @@ def get_record_objects(
     version,
     key,
     colour,
+    output,
     record_id,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.record_objects(record_id=record_id)
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /record/{uid}/objects")
 
@@ -275,27 +334,34 @@ def get_record_objects(
               help="Key/Value replacements in properties or data.")
 @click.option("--generate", type=click.Path(exists=True), help="Generate data.")
 @click.option("--objects", type=click.Path(exists=True), required=True, help="Properties objects file")
+@click.option("--render_cache", type=click.Path(file_okay=False), default=None,
+              help="Rendered Portable Text cache directory (default ~/.cache/omnisearch/portable_text).")
+@click.option("--no_render_cache", is_flag=True, show_default=True, default=False,
+              help="Render Portable Text without the cache.")
 def create_record_objects(
     host,
     version,
     key,
     colour,
+    output,
     record_id,
     replacement,
     generate,
-    objects
+    objects,
+    render_cache,
+    no_render_cache,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     objects_json, _ = get_data(generate, replacement, objects, None)
 
-    objects_json = convert_portable_text(objects_json)
+    objects_json = convert_portable_text(objects_json, render_cache, no_render_cache)
 
     logger.info(objects_json)
 
     try:
         records_response = omnisearch_client.create_record_objects(record_id=record_id, objects=objects_json)
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /record/{uid}/objects")
 
@@ -308,13 +374,14 @@ def delete_record_objects(
     version,
     key,
     colour,
+    output,
     record_id,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.delete_record_objects(record_id=record_id)
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /record/{uid}/objects")
 
@@ -324,15 +391,15 @@ def delete_record_objects(
 @click.option("--record_id", help="OmniSearch Record ID.", type=str)
 @click.option("--object_type", help="OmniSearch Object Type.", type=str)
 def get_record_objects_by_type(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_id,
     object_type
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.record_objects_type(record_id=record_id, object_type=object_type)
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records/{uid}/objects/{type}")
 
@@ -345,16 +412,21 @@ def get_record_objects_by_type(
               help="Key/Value replacements in properties or data.")
 @click.option("--generate", type=click.Path(exists=True), help="Generate data.")
 @click.option("--objects", type=click.Path(exists=True), required=True, help="Properties objects file")
+@click.option("--render_cache", type=click.Path(file_okay=False), default=None,
+              help="Rendered Portable Text cache directory (default ~/.cache/omnisearch/portable_text).")
+@click.option("--no_render_cache", is_flag=True, show_default=True, default=False,
+              help="Render Portable Text without the cache.")
 def update_record_objects_by_type(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_id, object_type,
-    replacement, generate, objects
+    replacement, generate, objects,
+    render_cache, no_render_cache,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     objects_json, _ = get_data(generate, replacement, objects, None)
 
-    objects_json = convert_portable_text(objects_json)
+    objects_json = convert_portable_text(objects_json, render_cache, no_render_cache)
 
     logger.info(objects_json[object_type])
 
@@ -362,7 +434,7 @@ def update_record_objects_by_type(
         records_response = omnisearch_client.update_record_objects_type(
             record_id=record_id, object_type=object_type, data=objects_json[object_type]
         )
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records/{uid}/objects/{type}")
 
@@ -372,16 +444,16 @@ def update_record_objects_by_type(
 @click.option("--record_id", help="OmniSearch Record ID.", type=str)
 @click.option("--object_type", help="OmniSearch Object Type.", type=str)
 def delete_record_objects_by_type(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_id, object_type
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.delete_record_objects_type(
             record_id=record_id, object_type=object_type
         )
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records/{uid}/objects/{type}")
 
@@ -391,16 +463,16 @@ def delete_record_objects_by_type(
 @click.option("--record_id", help="OmniSearch Record ID.", type=str)
 @click.option("--object_type", help="OmniSearch Object Type.", type=str)
 def get_record_objects_by_type_content(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_id, object_type
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.record_type_content(
             record_id=record_id, object_type=object_type
         )
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records/{uid}/objects/{type}/content")
 
@@ -410,16 +482,16 @@ def get_record_objects_by_type_content(
 @click.option("--record_id", help="OmniSearch Record ID.", type=str)
 @click.option("--object_type", help="OmniSearch Object Type.", type=str)
 def get_record_objects_by_type_transcript(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_id, object_type
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
         records_response = omnisearch_client.record_type_transcript(
             record_id=record_id, object_type=object_type
         )
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /records/{uid}/objects/{type}/transcript")
 
@@ -439,34 +511,54 @@ def get_record_objects_by_type_transcript(
               help="Specify a list of properties that should be aggregated when generating the schema.",
               type=list, default=None)
 @click.option("--sort_by_count", is_flag=True, show_default=True, default=False, help="Sort by counts.")
+@click.option("--facet", "facets", multiple=True,
+              help="Facet query as a JSON object of schema arguments (filters, aggregate_properties, "
+                   "excluded_properties, properties); repeat to fetch several concurrently and merge them.")
+@click.option("--concurrency", help="Facet requests in flight.", type=int, default=8)
 def schema(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_type, query, record_ids, object_types, filters,
     hidden,
     disable_autocorrect,
     excluded_properties,
     aggregate_properties,
     sort_by_count,
+    facets,
+    concurrency,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     if filters:
         filters = json.loads(filters)
 
+    arguments = dict(
+        record_ids=record_ids,
+        object_types=object_types,
+        filters=filters,
+        include_hidden=hidden,
+        disable_autocorrect=disable_autocorrect,
+        excluded_properties=excluded_properties,
+        aggregate_properties=aggregate_properties,
+        sort_by_count=sort_by_count
+    )
     try:
-        records_response = omnisearch_client.record_schema(
-            record_type=record_type,
-            query=query,
-            record_ids=record_ids,
-            object_types=object_types,
-            filters=filters,
-            include_hidden=hidden,
-            disable_autocorrect=disable_autocorrect,
-            excluded_properties=excluded_properties,
-            aggregate_properties=aggregate_properties,
-            sort_by_count=sort_by_count
-        )
-        print_json_in_colour(records_response, colour=colour)
+        if facets:
+            records_response, errors = omnisearch_client.record_schema_many(
+                record_type,
+                [json.loads(facet) for facet in facets],
+                query=query,
+                concurrency=concurrency,
+                **arguments
+            )
+        else:
+            records_response, errors = omnisearch_client.record_schema(
+                record_type=record_type, query=query, **arguments
+            ), {}
+        print_json_in_colour(records_response, colour=colour, output=output)
+        if errors:
+            # The facet map is missing the properties of the failed facets
+            logger.error(f"{len(errors)} of {len(facets)} facets failed: {sorted(errors)}")
+            click.get_current_context().exit(1)
     except exceptions.OmniSearchError:
         logger.error("Error calling /schema/{record_type}")
 
@@ -487,8 +579,10 @@ def schema(
 @click.option("--detailed", is_flag=True, show_default=True, default=False, help="Detailed.")
 @click.option("--page", help="OmniSearch Page Number.", type=int, default=1)
 @click.option("--page_size", help="OmniSearch Page Size.", type=int, default=10)
+@click.option("--all", "all_pages", is_flag=True, show_default=True, default=False,
+              help="Stream the results of every page from --page on.")
 def search(
-    host, version, key, colour,
+    host, version, key, colour, output,
     record_type,
     query, record_ids, object_types, filters,
     hidden,
@@ -497,11 +591,28 @@ def search(
     sort_order,
     detailed,
     page=1,
-    page_size=10
+    page_size=10,
+    all_pages=False,
 ):
-    omnisearch_client = Client(logger=logger, api_key=key, api_host=host, api_version=version)
+    omnisearch_client = make_client(host, version, key)
 
     try:
+        if all_pages:
+            results = omnisearch_client.iter_search(
+                record_type=record_type,
+                query=query,
+                record_ids=record_ids,
+                object_types=object_types,
+                filters=filters,
+                sort_by=f"{sort_field}:{sort_order}" if sort_field else None,
+                include_hidden=hidden,
+                disable_autocorrect=disable_autocorrect,
+                detailed=detailed,
+                page_size=page_size,
+                first_page=page,
+            )
+            print_json_stream(results, colour=colour, output=output)
+            return
         records_response = omnisearch_client.search(
             record_type=record_type,
             query=query,
@@ -515,65 +626,324 @@ def search(
             page=page,
             page_size=page_size
         )
-        print_json_in_colour(records_response, colour=colour)
+        print_json_in_colour(records_response, colour=colour, output=output)
     except exceptions.OmniSearchError:
         logger.error("Error calling /search/{record_type}")
 
 
+@cli.command()
+@common_params
+@click.option("--file", "path", type=click.Path(exists=True, dir_okay=False), required=True,
+              help="JSONL (or gzipped JSONL) file of records.")
+@click.option("--record_type", help="OmniSearch Record Type of records that don't have one.", type=str, default=None)
+@click.option("--concurrency", help="Requests in flight.", type=int, default=8)
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None,
+              help="Checkpoint file (default <file>.checkpoint).")
+@click.option("--checkpoint_every", help="Save the checkpoint every N records.", type=int, default=1000)
+@click.option("--failed", type=click.Path(dir_okay=False), default=None, help="Append failed records to this JSONL file.")
+@click.option("--restart", is_flag=True, show_default=True, default=False, help="Ignore an existing checkpoint.")
+def ingest(
+    host,
+    version,
+    key,
+    colour,
+    output,
+    path,
+    record_type,
+    concurrency,
+    checkpoint,
+    checkpoint_every,
+    failed,
+    restart,
+):
+    """
+    Create (or, for records with a uid, update) every record of a JSONL file.
+
+    Progress is saved to the checkpoint file and a rerun resumes after the last contiguous completed line. Records
+    that were in flight when the run stopped are sent again.
+    """
+    from scripts.ingest import Checkpoint, open_jsonl, to_record
+
+    omnisearch_client = make_client(host, version, key)
+
+    checkpoint_path = checkpoint or f"{path}.checkpoint"
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    progress = Checkpoint(checkpoint_path, path)
+    if progress.line:
+        logger.info(f"Resuming {path} at line {progress.line + 1}")
+
+    failed_file = open(failed, "a") if failed else None
+    # bulk result index -> (line number, byte offset after the line)
+    in_flight = {}
+    indexes = itertools.count()
+
+    def fail(line, record, error):
+        logger.error(f"Line {line + 1}: {error}")
+        if failed_file:
+            failed_file.write(json.dumps({"line": line + 1, "error": str(error), "record": record}) + "\n")
+
+    def records(f):
+        line, offset = progress.line, progress.offset
+        for raw in f:
+            current, line, offset = line, line + 1, offset + len(raw)
+            if not raw.strip():
+                progress.complete(current, offset, None)
+                continue
+            try:
+                record = to_record(raw, record_type)
+            except (ValueError, KeyError) as e:
+                fail(current, raw.decode("utf-8", "replace").rstrip("\n"), e)
+                progress.complete(current, offset, "failed")
+                continue
+            in_flight[next(indexes)] = (current, offset)
+            yield record
+
+    start = time.perf_counter()
+    try:
+        with open_jsonl(path) as f:
+            f.seek(progress.offset)
+            results = omnisearch_client.bulk_write_records(records(f), concurrency=concurrency)
+            for sent, result in enumerate(results, 1):
+                line, offset = in_flight.pop(result.index)
+                if result.ok:
+                    outcome = "updated" if result.payload.get("record_id") else "created"
+                else:
+                    fail(line, result.payload, result.error)
+                    outcome = "failed"
+                progress.complete(line, offset, outcome)
+                if sent % checkpoint_every == 0:
+                    progress.save()
+                    logger.info(
+                        f"Line {progress.line}: {progress.counts}, {sent / (time.perf_counter() - start):.0f} records/s"
+                    )
+    finally:
+        progress.save()
+        if failed_file:
+            failed_file.close()
+
+    logger.info(f"Ingested {progress.line} lines of {path}: {progress.counts}")
+    if progress.counts["failed"]:
+        # Exit rather than SystemExit, so a shell or batch session reports the line as failed and carries on
+        click.get_current_context().exit(1)
+
+
+@cli.command()
+@common_params
+@click.option("--record_type", help="OmniSearch Record Type.", type=str, required=True)
+@click.option("--database", type=click.Path(dir_okay=False), required=True, help="SQLite mirror database file.")
+@click.option("--objects", is_flag=True, show_default=True, default=False, help="Mirror record objects too.")
+@click.option("--refresh_objects", is_flag=True, show_default=True, default=False,
+              help="Fetch the objects of every record, not only of new and changed ones.")
+@click.option("--page_size", help="OmniSearch Page Size.", type=int, default=100)
+def mirror(
+    host,
+    version,
+    key,
+    colour,
+    output,
+    record_type,
+    database,
+    objects,
+    refresh_objects,
+    page_size,
+):
+    """Mirror a record type into a local SQLite database, syncing only what changed."""
+    from omnisearch.mirror import Mirror
+
+    omnisearch_client = make_client(host, version, key)
+
+    try:
+        with Mirror(omnisearch_client, database, objects=objects, page_size=page_size) as local:
+            stats = local.sync(record_type, refresh_objects=refresh_objects)
+        if not stats["verified"]:
+            logger.warning("The sync couldn't be verified complete, records it didn't see were kept")
+        print_json_in_colour(stats, colour=colour, output=output)
+    except exceptions.OmniSearchError:
+        logger.error("Error calling /records")
+
+
+@cli.command()
+@click.option("--generate", type=click.Path(exists=True), required=True, help="Generate data.")
+@click.option("--properties", type=click.Path(exists=True), required=True, help="Properties json file")
+@click.option("--data", type=click.Path(exists=True), required=False, help="Data json file")
+@click.option('--replacement', '-r', type=(str, str), multiple=True,
+              help="Key/Value replacements in properties or data.")
+@click.option("--record_type", help="OmniSearch Record Type.", type=str, default="post")
+@click.option("--name", help="Record name template.", type=str, default="$title")
+@click.option("--count", help="Number of records.", type=int, required=True)
+@click.option("--seed", help="Random seed, the same seed generates the same corpus.", type=int, default=0)
+@click.option("--processes", help="Worker processes (default one per CPU).", type=int, default=None)
+@click.option("--chunk_size", help="Records generated per task.", type=int, default=1000)
+@click.option("--out-file", "out_file", type=click.Path(dir_okay=False), required=True,
+              help="JSONL output file, gzipped if it ends with .gz")
+def generate_corpus(
+    generate,
+    properties,
+    data,
+    replacement,
+    record_type,
+    name,
+    count,
+    seed,
+    processes,
+    chunk_size,
+    out_file,
+):
+    """Generate a JSONL corpus of synthetic records for ingest."""
+    from scripts import corpus
+
+    spec_args = {
+        "generate": generate, "properties": properties, "data": data, "record_type": record_type, "name": name,
+        "replacement": replacement,
+    }
+    start = time.perf_counter()
+    report_every = max(count // 20, chunk_size)
+
+    def progress(written):
+        if written % report_every < chunk_size or written == count:
+            logger.info(f"{written} records, {written / (time.perf_counter() - start):.0f} records/s")
+
+    corpus.generate_corpus(
+        out_file, count, spec_args, seed=seed, processes=processes, chunk_size=chunk_size, progress=progress
+    )
+
+
+SESSION_COMMANDS = ("shell", "batch")
+
+
+def has_option(args, option):
+    return any(arg == option or arg.startswith(f"{option}=") for arg in args)
+
+
+def run_line(line, host, version, key, colour, output):
+    """
+    Run one command line (e.g. "get-record --record_id 123") in this process. The session's --host, --version,
+    --key, --colour and --output are used unless the line sets them.
+
+    :return: True if the command completed, False if it failed
+    """
+    args = shlex.split(line, comments=True)
+    if not args:
+        return True
+    if args[0] in SESSION_COMMANDS:
+        logger.error(f"{args[0]} can't be run inside a session")
+        return False
+
+    # Only commands taking the common options (not e.g. generate-corpus) get the session's
+    command = cli.get_command(None, args[0])
+    if command is not None and "host" in {param.name for param in command.params}:
+        for option, value in (("--host", host), ("--version", version), ("--key", key), ("--output", output)):
+            if value is not None and not has_option(args, option):
+                args[1:1] = [option, value]
+        if colour and not has_option(args, "--colour"):
+            args.append("--colour")
+
+    try:
+        exit_code = cli.main(args=args, prog_name="cli.py", standalone_mode=False, obj={"session": True})
+    except click.ClickException as e:
+        e.show()
+        return False
+    except click.Abort:
+        raise
+    except SystemExit as e:
+        # A command exiting ends the line, not the session
+        return not e.code
+    except Exception:
+        logger.exception(f"Error running {args[0]}")
+        return False
+    return not exit_code
+
+
+@cli.command()
+@common_params
+def shell(
+    host,
+    version,
+    key,
+    colour,
+    output,
+):
+    """Run commands interactively over one client and connection pool."""
+    try:
+        import readline  # noqa: F401 line editing and history for input()
+    except ImportError:
+        pass
+
+    while True:
+        try:
+            line = input("omnisearch> ").strip()
+        except EOFError:
+            print()
+            break
+        except KeyboardInterrupt:
+            print()
+            continue
+        if line in ("exit", "quit"):
+            break
+        if line and not line.startswith("#"):
+            try:
+                run_line(line, host, version, key, colour, output)
+            except click.Abort:
+                print()
+
+
+@cli.command()
+@common_params
+@click.option("--file", "commands", type=click.File("r"), default="-", help="Commands file, one per line (default stdin).")
+@click.option("--stop_on_error", is_flag=True, show_default=True, default=False, help="Stop at the first failing command.")
+def batch(
+    host,
+    version,
+    key,
+    colour,
+    output,
+    commands,
+    stop_on_error,
+):
+    """Run newline-delimited commands over one client and connection pool."""
+    ran, failed = 0, 0
+    for line in commands:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        ran += 1
+        if not run_line(line, host, version, key, colour, output):
+            failed += 1
+            if stop_on_error:
+                break
+
+    logger.info(f"Ran {ran} commands, {failed} failed")
+    if failed:
+        click.get_current_context().exit(1)
+
+
 def get_data(generate, replacement, properties, data):
     generated_values = {}
     if generate:
-        with open(generate, 'r') as f:
-            generate_json = json.load(f)
-
-            generate_formatted = {}
-            for k, v in generate_json.items():
-                generate_formatted[k] = (v["type"], v["options"])
+        from scripts.chance_extension import chance_dictionary
+        from scripts.corpus import format_values, load_spec
 
-            generated_values = chance_dictionary(generate_formatted)
-
-            for k, v in generated_values.items():
-                if type(v) == datetime:
-                    generated_values[k] = v.strftime("%Y-%m-%d %H:%M")
+        generated_values = format_values(chance_dictionary(load_spec(generate)))
 
     for r in replacement:
         generated_values[r[0]] = r[1]
 
     logger.info(generated_values)
 
-    with open(properties, 'r') as f:
-        properties_str = f.read()
-        properties_template_text = string.Template(properties_str)
-        properties_str = properties_template_text.safe_substitute(generated_values)
-        properties_json = json.loads(properties_str)
-
-    data_json = {}
-    if data:
-        with open(data, 'r') as f:
-            data_str = f.read()
-            data_template_text = string.Template(data_str)
-            data_str = data_template_text.safe_substitute(generated_values)
-            data_json = json.loads(data_str)
+    properties_json = templates.load(properties).render(generated_values)
+    data_json = templates.load(data).render(generated_values) if data else {}
 
     return properties_json, data_json
 
 
-def youtube_serializer(node: dict, context: Optional[Block], list_item: bool):
-    return f'<div><ReactPlayer url="{node["url"]}" /></div>'
-
+def convert_portable_text(objects_json, render_cache=None, no_render_cache=False):
+    from scripts import portable_text
 
-def convert_portable_text(objects_json):
-    for k, v in objects_json.items():
-        if v["type"] == "portable_text":
-            blocks_json = json.loads(v["content"])
-            objects_json[k]["content"] = ""
-            for block in blocks_json:
-                renderer = PortableTextRenderer(
-                    block, custom_serializers={'youtube': youtube_serializer})
-                objects_json[k]["content"] += renderer.render()
-        if "type" in v:
-            del v["type"]
-    return objects_json
+    cache = None
+    if not no_render_cache:
+        cache = portable_text.RenderCache(render_cache or portable_text.default_cache_directory())
+    return portable_text.convert_objects(objects_json, cache=cache)
 
 
 if __name__ == '__main__':
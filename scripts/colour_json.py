@@ -1,13 +1,81 @@
+import functools
 import json
+import sys
 
-from pygments import highlight
-from pygments.formatters import TerminalFormatter
-from pygments.lexers import JsonLexer
+OUTPUTS = ("pretty", "json", "ndjson")
 
+# Keys holding the items of a page response, see omnisearch.pagination.ITEM_KEYS
+ITEM_KEYS = ("records", "results", "hits", "items", "data")
 
-def print_json_in_colour(json_data, colour=True):
+
+@functools.lru_cache(maxsize=None)
+def _highlighter():
+    from pygments import highlight
+    from pygments.formatters import TerminalFormatter
+    from pygments.lexers import JsonLexer
+
+    return functools.partial(highlight, lexer=JsonLexer(), formatter=TerminalFormatter())
+
+
+def _pretty(json_data, colour):
     json_str = json.dumps(json_data, indent=4, sort_keys=True)
-    if colour:
-        print(highlight(json_str, JsonLexer(), TerminalFormatter()))
+    # Colour is only for people: escape codes would corrupt output piped into another program
+    if colour and sys.stdout.isatty():
+        return _highlighter()(json_str)
+    return json_str + "\n"
+
+
+def _compact(json_data):
+    return json.dumps(json_data, separators=(",", ":"))
+
+
+def _items(json_data):
+    """The documents to print one per line: a list's items, a page's items or the document itself"""
+    if isinstance(json_data, list):
+        return json_data
+    if isinstance(json_data, dict):
+        for key in ITEM_KEYS:
+            if isinstance(json_data.get(key), list):
+                return json_data[key]
+    return [json_data]
+
+
+def print_json_in_colour(json_data, colour=True, output="pretty"):
+    """
+    :param json_data: decoded response
+    :param colour: colour pretty output when stdout is a terminal
+    :param output: pretty (indented, sorted keys), json (compact) or ndjson (a compact line per item of a list or
+    page response)
+    """
+    if output == "ndjson":
+        print_json_stream(_items(json_data), output=output)
+    elif output == "json":
+        sys.stdout.write(_compact(json_data) + "\n")
+    else:
+        sys.stdout.write(_pretty(json_data, colour))
+
+
+def print_json_stream(items, colour=True, output="pretty"):
+    """
+    Print items as they are produced, e.g. by Client.iter_records: ndjson a compact line per item, json a compact
+    array written item by item, pretty one document per item.
+
+    :param items: iterable of decoded items
+    :param colour: colour pretty output when stdout is a terminal
+    :param output: pretty, json or ndjson
+    """
+    write = sys.stdout.write
+    if output == "ndjson":
+        for item in items:
+            write(_compact(item) + "\n")
+    elif output == "json":
+        write("[")
+        try:
+            for i, item in enumerate(items):
+                write(("," if i else "") + _compact(item))
+        finally:
+            # Close the array even when items fails partway, so what was written is still valid JSON
+            write("]\n")
     else:
-        print(json_str)
+        for item in items:
+            write(_pretty(item, colour))
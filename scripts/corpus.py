@@ -0,0 +1,154 @@
+"""
+Synthetic record corpus generation from a chance spec (e.g. data/post_chance.json) and properties/data templates
+
+Records are generated in fixed size chunks, each from its own random seed derived from the corpus seed and the
+chunk number, so a corpus is the same whatever the number of processes generating it. Chunks are written to
+JSONL in order as they complete, holding only the chunks in flight in memory.
+"""
+import gzip
+import json
+import multiprocessing
+import random
+import string
+from collections import deque
+from datetime import datetime
+
+from scripts import templates
+from scripts.chance_extension import compile_dictionary, corpus_functions_map, generate_dictionary
+
+_encode_string = json.encoder.encode_basestring
+
+
+def load_spec(path):
+    """
+    :param path: chance spec file, {key: {"type": chance function, "options": {...}}}
+    :return: chance_dictionary values, {key: (chance function, options)}
+    """
+    with open(path, "r") as f:
+        return {k: (v["type"], v["options"]) for k, v in json.load(f).items()}
+
+
+def format_values(values):
+    """Format generated datetimes the way the record templates expect them"""
+    for k, v in values.items():
+        if isinstance(v, datetime):
+            values[k] = v.strftime("%Y-%m-%d %H:%M")
+    return values
+
+
+class CorpusSpec:
+    def __init__(self, generate, properties, data=None, record_type="post", name="$title", replacement=()):
+        """
+        What a generated record looks like, built once per process.
+
+        :param generate: chance spec file
+        :param properties: properties template file
+        :param data: data template file
+        :param record_type: record type of the generated records
+        :param name: template of the record name
+        :param replacement: fixed (key, value) substitutions overriding generated values
+        """
+        self.record_type = record_type
+        self._record_type_json = _encode_string(record_type)
+        self.compiled = compile_dictionary(load_spec(generate), corpus_functions_map)
+        self.properties = templates.load(properties)
+        self.data = templates.load(data) if data else None
+        self.name = string.Template(name)
+        self.replacement = dict(replacement)
+
+    def values(self):
+        values = format_values(generate_dictionary(self.compiled))
+        values.update(self.replacement)
+        return values
+
+    def record(self):
+        values = self.values()
+        return {
+            "record_type": self.record_type,
+            "name": self.name.safe_substitute(values),
+            "properties": self.properties.render(values),
+            "data": self.data.render(values) if self.data else {},
+        }
+
+    def record_json(self):
+        """The compact JSON text of a record, rendered straight from the templates"""
+        values = self.values()
+        return (
+            f'{{"record_type":{self._record_type_json},"name":{_encode_string(self.name.safe_substitute(values))},'
+            f'"properties":{self.properties.render_json(values)},'
+            f'"data":{self.data.render_json(values) if self.data else "{}"}}}'
+        )
+
+
+_spec = None
+
+
+def _init_worker(spec_args):
+    global _spec
+    _spec = CorpusSpec(**spec_args)
+
+
+def _generate_chunk(task):
+    seed, chunk, count = task
+    random.seed(f"{seed}:{chunk}")
+    return "".join(_spec.record_json() + "\n" for _ in range(count))
+
+
+def open_output(path):
+    """Open path for writing text, gzipped if it ends with .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    return open(path, "w", encoding="utf-8")
+
+
+def generate_corpus(path, count, spec_args, seed=0, processes=None, chunk_size=1000, progress=None):
+    """
+    Write count generated records to path as JSONL.
+
+    :param path: output file, gzipped if it ends with .gz
+    :param count: number of records
+    :param spec_args: CorpusSpec arguments
+    :param seed: corpus seed, the same seed and chunk_size always give the same corpus
+    :param processes: worker processes (default the number of CPUs), 1 generates in this process
+    :param chunk_size: records generated per task
+    :param progress: optional callable taking the number of records written so far
+    :return: number of records written
+    """
+    tasks = ((seed, chunk, min(chunk_size, count - start)) for chunk, start in enumerate(range(0, count, chunk_size)))
+    written = 0
+    with open_output(path) as out:
+        if processes == 1:
+            _init_worker(spec_args)
+            for task in tasks:
+                out.write(_generate_chunk(task))
+                written += task[2]
+                if progress:
+                    progress(written)
+            return written
+
+        processes = processes or multiprocessing.cpu_count()
+        max_pending = 2 * processes
+        pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(spec_args,))
+        try:
+            # Chunks are submitted at most max_pending ahead of the one being written, so a slow disk doesn't
+            # pile generated chunks up in memory
+            pending = deque()
+            for task in tasks:
+                if len(pending) >= max_pending:
+                    written = _write_chunk(out, pending.popleft(), written, progress)
+                pending.append((task[2], pool.apply_async(_generate_chunk, (task,))))
+            while pending:
+                written = _write_chunk(out, pending.popleft(), written, progress)
+        finally:
+            pool.terminate()
+            pool.join()
+    return written
+
+
+def _write_chunk(out, pending_chunk, written, progress):
+    chunk_count, result = pending_chunk
+    out.write(result.get())
+    written += chunk_count
+    if progress:
+        progress(written)
+    return written
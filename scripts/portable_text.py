@@ -0,0 +1,160 @@
+"""
+Portable Text to HTML rendering for record objects
+
+Documents are rendered in batches of blocks by one reusable renderer, large documents across a process pool,
+and the HTML is cached on disk under the sha256 of the document, so re-uploading unchanged objects doesn't
+render them again.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.renderer import is_list
+
+# Part of the cache key, change it when the rendering (e.g. a serializer) changes
+RENDER_VERSION = "1"
+
+BATCH_SIZE = 200
+PARALLEL_THRESHOLD = 2000
+
+
+def youtube_serializer(node: dict, context, list_item: bool):
+    return f'<div><ReactPlayer url="{node["url"]}" /></div>'
+
+
+SERIALIZERS = {"youtube": youtube_serializer}
+
+
+class BatchRenderer(PortableTextRenderer):
+    def __init__(self):
+        """PortableTextRenderer set up once and reused for every batch of blocks"""
+        super().__init__([], custom_serializers=SERIALIZERS)
+
+    def render_batch(self, blocks):
+        """
+        :param blocks: list of blocks, without splitting a list across batches
+        :return: HTML of the blocks, not wrapped in a div
+        """
+        self._blocks = blocks
+        self._wrapper_element = ""
+        return self.render()
+
+
+def batches(blocks, batch_size=BATCH_SIZE):
+    """
+    Split blocks into batches of about batch_size, extending a batch until the list it ends in (consecutive list
+    item blocks) is complete so a list is always rendered as a whole
+    """
+    batch = []
+    for block in blocks:
+        if len(batch) >= batch_size and not (is_list(block) and is_list(batch[-1])):
+            yield batch
+            batch = []
+        batch.append(block)
+    if batch:
+        yield batch
+
+
+_renderer = None
+
+
+def _render_batch(blocks):
+    global _renderer
+    if _renderer is None:
+        _renderer = BatchRenderer()
+    return _renderer.render_batch(blocks)
+
+
+def render_blocks(blocks, processes=None, batch_size=BATCH_SIZE, parallel_threshold=PARALLEL_THRESHOLD):
+    """
+    :param blocks: list of Portable Text blocks
+    :param processes: worker processes for documents of parallel_threshold blocks or more (default one per CPU)
+    :param batch_size: blocks rendered per call
+    :param parallel_threshold: smallest document rendered across processes
+    :return: HTML
+    """
+    processes = processes or multiprocessing.cpu_count()
+    if processes > 1 and len(blocks) >= parallel_threshold:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return "".join(executor.map(_render_batch, batches(blocks, batch_size)))
+    return "".join(_render_batch(batch) for batch in batches(blocks, batch_size))
+
+
+class RenderCache:
+    def __init__(self, directory):
+        """
+        Rendered HTML on disk, one file per document named by the sha256 of the document and RENDER_VERSION
+
+        :param directory: cache directory, created on first write
+        """
+        self.directory = directory
+
+    @staticmethod
+    def key(content):
+        return hashlib.sha256(f"{RENDER_VERSION}\n{content}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.html")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, html):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".render-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def default_cache_directory():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "omnisearch", "portable_text")
+
+
+def render_document(content, cache=None, processes=None):
+    """
+    :param content: Portable Text document, the JSON text of a list of blocks
+    :param cache: optional RenderCache
+    :param processes: see render_blocks
+    :return: HTML
+    """
+    key = cache.key(content) if cache else None
+    if cache:
+        html = cache.get(key)
+        if html is not None:
+            return html
+
+    html = render_blocks(json.loads(content), processes=processes)
+    if cache:
+        cache.set(key, html)
+    return html
+
+
+def convert_objects(objects_json, cache=None, processes=None):
+    """
+    Render the content of every portable_text object to HTML, and drop the objects' "type" key
+
+    :param objects_json: {object type: object}
+    :param cache: optional RenderCache
+    :param processes: see render_blocks
+    :return: objects_json
+    """
+    for v in objects_json.values():
+        if v.get("type") == "portable_text":
+            v["content"] = render_document(v["content"], cache=cache, processes=processes)
+        v.pop("type", None)
+    return objects_json
@@ -0,0 +1,250 @@
+"""
+Compiled JSON templates for the properties, data and objects files
+
+A template is a JSON file with string.Template placeholders, either inside strings ("$title", "/posts/$slug.html",
+or nested in a string holding escaped JSON) or in place of a value ($categories, filled with the JSON text of the
+value). It is parsed once into its slots, so rendering a record is filling them in:
+
+    template = templates.load("data/post_properties.json")
+    properties = template.render({"title": "Tax news", "categories": '["Tax"]'})
+    line = template.render_json(values)  # the same as compact JSON text, without building the dict
+"""
+import json
+import os
+import string
+
+_RAW_MARKER = "\u0000raw:"
+
+# json.dumps builds a new encoder per call when given options, these are built once
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_encode_string = json.encoder.encode_basestring
+
+
+class _Slot:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class _Quoted(_Slot):
+    """A string that is exactly one placeholder, e.g. "$title\""""
+    __slots__ = ("text",)
+
+    def __init__(self, name, text):
+        super().__init__(name)
+        self.text = text
+
+    def value(self, values):
+        value = values.get(self.name)
+        return self.text if value is None else str(value)
+
+
+class _Mixed:
+    """
+    A string with placeholders and other text, e.g. "/posts/$slug.html". When the string holds escaped JSON
+    (e.g. the portable text content of post_objects.json), values of placeholders inside its strings are
+    JSON-escaped before being substituted, so a " or \\ in them doesn't break the nested document.
+    """
+    __slots__ = ("template", "escaped")
+
+    def __init__(self, text):
+        self.template = string.Template(text)
+        self.escaped = _nested_string_placeholders(text)
+
+    def value(self, values):
+        if self.escaped:
+            values = dict(values)
+            for name in self.escaped:
+                if values.get(name) is not None:
+                    values[name] = _encode_string(str(values[name]))[1:-1]
+        return self.template.safe_substitute(values)
+
+
+class _Raw(_Slot):
+    """A placeholder standing for a whole JSON value, e.g. $categories"""
+    __slots__ = ()
+
+    def value(self, values):
+        value = values.get(self.name)
+        if value is None:
+            raise ValueError(f"No value for ${self.name}")
+        return json.loads(value) if isinstance(value, str) else value
+
+    def text(self, values):
+        value = values.get(self.name)
+        if value is None:
+            raise ValueError(f"No value for ${self.name}")
+        return value if isinstance(value, str) else _encode(value)
+
+
+def _mark_raw_slots(text):
+    """Replace placeholders outside JSON strings with marker strings, so the text parses as JSON"""
+    out, i, in_string = [], 0, False
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if char == "\\":
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            in_string = char != '"'
+        elif char == '"':
+            in_string = True
+        elif char == "$":
+            match = string.Template.pattern.match(text, i)
+            name = match and (match.group("named") or match.group("braced"))
+            if name:
+                out.append(json.dumps(_RAW_MARKER + name))
+                i = match.end()
+                continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _nested_string_placeholders(text):
+    """
+    :return: names of the placeholders inside the strings of text when text is itself JSON, else an empty set
+    """
+    if not text.lstrip().startswith(("{", "[")):
+        return set()
+    try:
+        json.loads(text)
+    except ValueError:
+        return set()
+    names, i, in_string = set(), 0, False
+    while i < len(text):
+        char = text[i]
+        if in_string and char == "\\":
+            i += 2
+            continue
+        if in_string and char == "$":
+            match = string.Template.pattern.match(text, i)
+            if match:
+                name = match.group("named") or match.group("braced")
+                if name:
+                    names.add(name)
+                i = match.end()
+                continue
+        if char == '"':
+            in_string = not in_string
+        i += 1
+    return names
+
+
+def _compile_string(text):
+    if text.startswith(_RAW_MARKER):
+        return _Raw(text[len(_RAW_MARKER):])
+    if "$" not in text:
+        return text
+    match = string.Template.pattern.fullmatch(text)
+    name = match and (match.group("named") or match.group("braced"))
+    return _Quoted(name, text) if name else _Mixed(text)
+
+
+def _compile(node):
+    if isinstance(node, dict):
+        return {_compile_string(k): _compile(v) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_compile(v) for v in node]
+    if isinstance(node, str):
+        return _compile_string(node)
+    return node
+
+
+class JsonTemplate:
+    def __init__(self, text):
+        """
+        :param text: JSON text with string.Template placeholders
+        """
+        self.tree = _compile(json.loads(_mark_raw_slots(text)))
+        self.slots = set()
+        self._parts = []
+        constant = []
+        self._serialize(self.tree, constant)
+        self._parts.append("".join(constant))
+
+    def _serialize(self, node, constant):
+        """Flatten node into self._parts: runs of constant JSON text between the slots to fill in"""
+        if isinstance(node, dict):
+            constant.append("{")
+            for i, (key, value) in enumerate(node.items()):
+                if i:
+                    constant.append(",")
+                self._serialize(key, constant)
+                constant.append(":")
+                self._serialize(value, constant)
+            constant.append("}")
+        elif isinstance(node, list):
+            constant.append("[")
+            for i, value in enumerate(node):
+                if i:
+                    constant.append(",")
+                self._serialize(value, constant)
+            constant.append("]")
+        elif isinstance(node, (_Slot, _Mixed)):
+            if isinstance(node, _Slot):
+                self.slots.add(node.name)
+            else:
+                self.slots.update(
+                    m.group("named") or m.group("braced")
+                    for m in node.template.pattern.finditer(node.template.template)
+                    if m.group("named") or m.group("braced")
+                )
+            self._parts.append("".join(constant))
+            constant.clear()
+            self._parts.append(node)
+        else:
+            constant.append(_encode(node))
+
+    def render(self, values):
+        """
+        :param values: {placeholder: value}, placeholders without a value are left in strings as they are
+        :return: the template filled in with values, as new dicts and lists
+        """
+        return _render(self.tree, values)
+
+    def render_json(self, values):
+        """
+        :param values: {placeholder: value}
+        :return: compact JSON text of render(values)
+        """
+        out = []
+        for part in self._parts:
+            if isinstance(part, str):
+                out.append(part)
+            elif isinstance(part, _Raw):
+                out.append(part.text(values))
+            else:
+                out.append(_encode_string(part.value(values)))
+        return "".join(out)
+
+
+def _render(node, values):
+    if isinstance(node, dict):
+        return {
+            (k if isinstance(k, str) else k.value(values)): _render(v, values) for k, v in node.items()
+        }
+    if isinstance(node, list):
+        return [_render(v, values) for v in node]
+    if isinstance(node, (_Slot, _Mixed)):
+        return node.value(values)
+    return node
+
+
+_cache = {}
+
+
+def load(path):
+    """
+    :param path: template file
+    :return: JsonTemplate, compiled once per file until the file changes
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r") as f:
+            cached = _cache[path] = (mtime, JsonTemplate(f.read()))
+    return cached[1]
@@ -40,6 +40,14 @@ setup(
     keywords=["omnisearch", "omnisearch-api"],
     packages=find_packages(),
     install_requires=["requests"],
+    extras_require={
+        "async": ["httpx"],
+        "orjson": ["orjson"],
+        "msgspec": ["msgspec"],
+        "stream": ["ijson"],
+        "http2": ["httpx[http2]"],
+        "zstd": ["zstandard"],
+    },
     license_files=('LICENSE',),
     classifiers=[
         "Development Status :: 4 - Alpha",
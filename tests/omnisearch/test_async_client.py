@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import unittest
+
+from omnisearch.asyncclient import AsyncClient
+from omnisearch.emulator import Emulator, Faults
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClientTestCase(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.emulator = Emulator(api_key="test").start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.emulator.stop()
+
+    async def test_hello(self):
+        async with AsyncClient(logger=logger, api_key="test", api_host=self.emulator.api_host) as client:
+            self.assertEqual(await client.hello(), {"message": "Hello from the OmniSearch emulator"})
+
+    async def test_concurrent_calls_with_gather(self):
+        async with AsyncClient(logger=logger, api_key="test", api_host=self.emulator.api_host) as client:
+            created = await asyncio.gather(*(
+                client.create_records("post", f"Post {i}", {"title": f"Post {i}", "n": i}, {}) for i in range(10)
+            ))
+            records = await asyncio.gather(*(client.record(record["uid"]) for record in created))
+            search, schema = await asyncio.gather(
+                client.search("post", query="Post", page_size=100),
+                client.record_schema("post", filters=[["n", "LessThan", 5]]),
+            )
+
+        self.assertEqual([record["name"] for record in records], [f"Post {i}" for i in range(10)])
+        self.assertGreaterEqual(search["total"], 10)
+        self.assertEqual(sorted(value for value, _ in schema["n"]), [0, 1, 2, 3, 4])
+
+    async def test_coalesced_reads_share_one_request(self):
+        with Emulator(api_key="test", faults={"GET /records/{uid}": Faults(latency=0.1)}) as emulator:
+            async with AsyncClient(
+                    logger=logger, api_key="test", api_host=emulator.api_host, coalesce=True
+            ) as client:
+                uid = (await client.create_records("post", "Post", {"title": "Post"}, {}))["uid"]
+                requests = emulator.requests
+                records = await asyncio.gather(*(client.record(uid) for _ in range(8)))
+
+        self.assertTrue(all(record["uid"] == uid for record in records))
+        self.assertEqual(emulator.requests - requests, 1)
+        self.assertEqual(client.single_flight.stats()["coalesced"], 7)
+
+    async def test_error_status_returns_none(self):
+        async with AsyncClient(logger=logger, api_key="test", api_host=self.emulator.api_host) as client:
+            with self.assertLogs(logger, level="ERROR"):
+                self.assertIsNone(await client.record("record-missing"))
+            with self.assertLogs(logger, level="ERROR"):
+                self.assertIsNone(await client.update_record("record-missing", "Name", {}, {}))
+
+    async def test_transport_error_returns_none(self):
+        # Nothing listens on the discard port
+        async with AsyncClient(logger=logger, api_key="test", api_host="http://127.0.0.1:9/api") as client:
+            with self.assertLogs(logger, level="ERROR"):
+                self.assertIsNone(await client.hello())
+
+
+if __name__ == "__main__":
+    unittest.main()
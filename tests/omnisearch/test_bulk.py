@@ -0,0 +1,52 @@
+import logging
+import unittest
+
+from omnisearch import exceptions
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+
+class BulkTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.emulator = Emulator(api_key="test").start()
+        cls.client = Client(logger=logger, api_key="test", api_host=cls.emulator.api_host)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.emulator.stop()
+
+    def test_mixed_batch_reports_every_item(self):
+        records = [
+            {"record_type": "post", "name": "Post 1", "properties": {"title": "Post 1"}, "data": {}},
+            {"record_type": "post", "name": "No properties"},
+            {"record_type": "post", "name": "Post 2", "properties": {"title": "Post 2"}, "data": {}},
+        ]
+        results = sorted(self.client.bulk_create_records(records, concurrency=2), key=lambda r: r.index)
+
+        self.assertEqual([r.index for r in results], [0, 1, 2])
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].response["name"], "Post 1")
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].error, KeyError)
+        self.assertIsNone(results[1].response)
+        self.assertTrue(results[2].ok)
+
+    def test_api_errors_are_reported_per_item(self):
+        created = self.client.create_records("post", "Post", {"title": "Post"}, {})
+        records = [
+            {"record_id": created["uid"], "name": "Renamed", "properties": {"title": "Renamed"}, "data": {}},
+            {"record_id": "record-missing", "name": "Missing", "properties": {}, "data": {}},
+        ]
+        results = sorted(self.client.bulk_update_records(records), key=lambda r: r.index)
+
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1].error, exceptions.OmniSearchError)
+        self.assertEqual(results[1].error.status_code, 404)
+        self.assertEqual(self.client.record(created["uid"])["name"], "Renamed")
+
+
+if __name__ == "__main__":
+    unittest.main()
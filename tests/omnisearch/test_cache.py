@@ -0,0 +1,105 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from omnisearch import cache
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.client = Client(
+            logger=logger, api_key="test", api_host=self.emulator.api_host,
+            response_cache=cache.ResponseCache(maxsize=16, ttl=60),
+        )
+        self.client.create_records("post", "Post 1", {"title": "Post 1"}, {})
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_repeat_search_is_served_from_cache(self):
+        first = self.client.search("post", query="Post")
+        requests = self.emulator.requests
+        second = self.client.search("post", query="Post")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.emulator.requests, requests)
+        self.assertEqual(self.client.response_cache.stats()["hits"], 1)
+
+    def test_write_invalidates_record_type(self):
+        self.client.record_schema("post")
+        self.client.create_records("post", "Post 2", {"title": "Post 2"}, {})
+        schema = self.client.record_schema("post")
+
+        self.assertEqual(sorted(value for value, _ in schema["title"]), ["Post 1", "Post 2"])
+        self.assertEqual(self.client.response_cache.stats()["invalidations"], 1)
+
+    def test_shared_cache_is_keyed_by_account(self):
+        response_cache = cache.ResponseCache(maxsize=16, ttl=60)
+        with Emulator(api_key="other") as emulator:
+            clients = [
+                Client(logger=logger, api_key="test", api_host=self.emulator.api_host, response_cache=response_cache),
+                Client(logger=logger, api_key="other", api_host=emulator.api_host, response_cache=response_cache),
+            ]
+            clients[1].create_records("post", "Other 1", {"title": "Other 1"}, {})
+            clients[1].create_records("post", "Other 2", {"title": "Other 2"}, {})
+
+            self.assertEqual(len(clients[0].search("post")["results"]), 1)
+            self.assertEqual(len(clients[1].search("post")["results"]), 2)
+            self.assertEqual(emulator.requests, 3)
+            self.assertEqual(response_cache.stats()["hits"], 0)
+
+
+class DiskCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.db")
+
+    def tearDown(self):
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def make_client(self):
+        return Client(
+            logger=logger, api_key="test", api_host=self.emulator.api_host, disk_cache=cache.DiskCache(self.path)
+        )
+
+    def test_cache_is_shared_between_clients(self):
+        client = self.make_client()
+        uid = client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+        client.record(uid)
+
+        other = self.make_client()
+        requests = self.emulator.requests
+        self.assertEqual(other.record(uid)["name"], "Post")
+        self.assertEqual(self.emulator.requests, requests)
+        self.assertEqual(other.disk_cache.stats()["hits"], 1)
+
+    def test_write_invalidates_record(self):
+        client = self.make_client()
+        uid = client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+        client.record(uid)
+        client.update_record(uid, "Renamed", {"title": "Renamed"}, {})
+
+        self.assertEqual(client.record(uid)["name"], "Renamed")
+
+    def test_eviction_keeps_size_under_max_bytes(self):
+        disk_cache = cache.DiskCache(self.path, max_bytes=1000)
+        for i in range(20):
+            disk_cache.set(("key", i), {"value": "x" * 100}, tag=str(i))
+
+        stats = disk_cache.stats()
+        self.assertLessEqual(stats["bytes"], 1000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIs(disk_cache.get(("key", 0)), cache.MISSING)
+        self.assertEqual(disk_cache.get(("key", 19)), {"value": "x" * 100})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import logging
+import unittest
+
+from omnisearch import cache, exceptions
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator, Faults
+
+logger = logging.getLogger(__name__)
+
+
+class ClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.client = Client(logger=logger, api_key="test", api_host=self.emulator.api_host)
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def create(self, count, record_type="post"):
+        return [
+            self.client.create_records(record_type, f"Post {i}", {"title": f"Post {i}", "n": i}, {})["uid"]
+            for i in range(count)
+        ]
+
+    def test_bulk_create_records(self):
+        records = [{"record_type": "post", "name": f"Post {i}", "properties": {"n": i}} for i in range(20)]
+
+        results = sorted(self.client.bulk_create_records(iter(records), concurrency=4), key=lambda r: r.index)
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([result.response["name"] for result in results], [f"Post {i}" for i in range(20)])
+        self.assertEqual(len(list(self.client.iter_records("post"))), 20)
+
+    def test_bulk_update_records_reports_failures(self):
+        uids = self.create(3)
+        records = [{"record_id": uid, "name": "Renamed", "properties": {}} for uid in uids]
+        records.insert(1, {"record_id": "record-missing", "name": "Missing", "properties": {}})
+
+        with self.assertLogs(logger, level="ERROR"):
+            results = {r.index: r for r in self.client.bulk_update_records(records, concurrency=2)}
+
+        self.assertEqual([results[i].ok for i in range(4)], [True, False, True, True])
+        self.assertEqual(results[1].error.status_code, 404)
+        self.assertEqual({self.client.record(uid)["name"] for uid in uids}, {"Renamed"})
+
+    def test_bulk_write_records_creates_and_updates(self):
+        uid = self.create(1)[0]
+        records = [
+            {"record_id": uid, "name": "Updated", "properties": {}},
+            {"record_type": "post", "name": "Created", "properties": {}},
+        ]
+
+        results = sorted(self.client.bulk_write_records(records), key=lambda r: r.index)
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(results[1].response["name"], "Created")
+        self.assertEqual(self.client.record(uid)["name"], "Updated")
+
+    def test_iter_records_walks_every_page(self):
+        uids = self.create(25)
+        for prefetch in (True, False):
+            records = list(self.client.iter_records("post", page_size=10, prefetch=prefetch))
+            self.assertEqual(sorted(r["uid"] for r in records), sorted(uids))
+
+    def test_iter_search_walks_every_page(self):
+        self.create(25)
+        self.assertEqual(len(list(self.client.iter_search("post", query="Post", page_size=10))), 25)
+        self.assertEqual(list(self.client.iter_records("empty", page_size=10)), [])
+
+    def test_iter_records_failed_page_raises(self):
+        with Emulator(api_key="test", faults={"GET /records": Faults(error_rate=1.0)}) as emulator:
+            client = Client(logger=logger, api_key="test", api_host=emulator.api_host)
+            with self.assertLogs(logger, level="ERROR"), self.assertRaises(exceptions.OmniSearchError):
+                list(client.iter_records("post", page_size=10))
+
+    def test_stream_search_yields_the_search_results(self):
+        self.create(12)
+        results = self.client.search("post", query="Post", detailed=True, page_size=20)["results"]
+
+        self.assertEqual(list(self.client.stream_search("post", query="Post", page_size=20)), results)
+
+    def test_response_cache(self):
+        client = Client(
+            logger=logger, api_key="test", api_host=self.emulator.api_host,
+            response_cache=cache.ResponseCache(maxsize=16, ttl=60),
+        )
+        self.create(2)
+        schema = client.record_schema("post")
+        requests = self.emulator.requests
+
+        self.assertIs(client.record_schema("post"), schema)
+        self.assertEqual(self.emulator.requests, requests)
+        client.create_records("post", "Post 2", {"title": "Post 2"}, {})
+        self.assertEqual(len(client.record_schema("post")["title"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import importlib.util
+import logging
+import os
+import unittest
+
+from omnisearch import compression
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+BODY = b'{"content": "' + b"<p>Tax reform</p>" * 500 + b'"}'
+
+
+def installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+class CompressTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        for encoding in compression.REQUEST_ENCODINGS:
+            if encoding == "zstd" and not installed("zstandard"):
+                continue
+            with self.subTest(encoding=encoding):
+                compressed = compression.compress(BODY, encoding)
+                self.assertLess(len(compressed), len(BODY) / 10)
+                self.assertEqual(compression.decompress(compressed, encoding), BODY)
+
+    def test_gzip_is_deterministic(self):
+        self.assertEqual(compression.compress(BODY, "gzip"), compression.compress(BODY, "gzip"))
+        self.assertNotEqual(compression.compress(BODY, "gzip", level=1), compression.compress(BODY, "gzip", level=9))
+
+    def test_unsupported_encodings(self):
+        with self.assertRaises(ValueError):
+            compression.compress(BODY, "br")
+        with self.assertRaises(ValueError):
+            compression.decompress(BODY, "compress")
+
+    @unittest.skipIf(installed("zstandard"), "zstandard is installed")
+    def test_zstd_needs_zstandard(self):
+        with self.assertRaises(ImportError):
+            compression.compress(BODY, "zstd")
+        with self.assertRaises(ImportError):
+            Client(logger=logger, api_key="test", api_host="http://localhost", compress_requests="zstd")
+
+
+class AcceptEncodingTestCase(unittest.TestCase):
+    def test_header(self):
+        self.assertEqual(compression.accept_encoding("identity"), "identity")
+        self.assertEqual(compression.accept_encoding(["gzip", "deflate"]), "gzip, deflate")
+        self.assertEqual(compression.decodable_encodings()[-2:], ["gzip", "deflate"])
+
+    def test_undecodable_encodings_are_refused(self):
+        with self.assertRaises(ValueError):
+            compression.accept_encoding(["gzip", "lzma"])
+        if not installed("zstandard"):
+            with self.assertRaises(ValueError):
+                compression.accept_encoding("zstd")
+
+
+class ClientCompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.events = []
+        self.client = Client(
+            logger=logger, api_key="test", api_host=self.emulator.api_host, hooks=[self.events.append],
+            compress_requests="gzip", compression_threshold=1024,
+        )
+        self.uid = self.client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_bodies_over_the_threshold_are_compressed(self):
+        content = BODY.decode("utf-8")
+        self.client.update_record_objects_type(self.uid, "page", {"content": content})
+
+        self.assertEqual(self.emulator.compressed_requests, 1)
+        self.assertEqual(self.client.record_objects_type(self.uid, "page"), {"content": content})
+        stats = self.client.compression_stats.as_dict()
+        self.assertEqual((stats["compressed_requests"], stats["skipped_requests"]), (1, 1))
+        self.assertGreater(stats["request_ratio"], 10)
+        event = self.events[1]
+        self.assertEqual(event.request_encoding, "gzip")
+        self.assertEqual(event.uncompressed_request_bytes, len(self.client.codec.dumps({"content": content})))
+        self.assertGreater(event.request_ratio, 10)
+
+    def test_bodies_under_the_threshold_are_sent_as_they_are(self):
+        self.client.compression_threshold = len(BODY) * 2
+        self.client.update_record_objects_type(self.uid, "page", {"content": BODY.decode("utf-8")})
+
+        self.assertEqual(self.emulator.compressed_requests, 0)
+        self.assertEqual(self.client.compression_stats.skipped_requests, 2)
+        self.assertIsNone(self.events[1].request_encoding)
+
+    def test_bodies_not_smaller_compressed_are_sent_as_they_are(self):
+        random_bytes = os.urandom(4096)
+        body, headers, uncompressed_size = self.client._compress(random_bytes)
+
+        self.assertEqual((body, uncompressed_size), (random_bytes, None))
+        self.assertNotIn("Content-Encoding", headers)
+
+    def test_accept_encoding(self):
+        self.client.update_record_objects_type(self.uid, "page", {"content": BODY.decode("utf-8")})
+
+        self.client.record_objects_type(self.uid, "page")
+        stats = self.client.compression_stats.as_dict()
+        self.assertEqual(stats["compressed_responses"], 2)
+        self.assertGreater(stats["response_ratio"], 10)
+
+        identity = Client(logger=logger, api_key="test", api_host=self.emulator.api_host, accept_encoding="identity")
+        self.assertEqual(identity.headers["Accept-Encoding"], "identity")
+        identity.record_objects_type(self.uid, "page")
+        self.assertEqual(identity.compression_stats.compressed_responses, 0)
+
+    def test_unsupported_request_encoding(self):
+        with self.assertRaises(ValueError):
+            Client(logger=logger, api_key="test", api_host=self.emulator.api_host, compress_requests="br")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import logging
+import unittest
+
+from omnisearch import conditional
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+
+class ConditionalRequestsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.client = Client(
+            logger=logger, api_key="test", api_host=self.emulator.api_host, conditional_requests=True
+        )
+        self.uid = self.client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_not_modified_serves_stored_body(self):
+        first = self.client.record(self.uid)
+        second = self.client.record(self.uid)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.emulator.not_modified, 1)
+        stats = self.client.validators.stats()
+        self.assertEqual(stats["not_modified"], 1)
+        self.assertGreater(stats["bytes_saved"], 0)
+
+    def test_changed_body_is_downloaded(self):
+        self.client.record(self.uid)
+        self.client.update_record(self.uid, "Renamed", {"title": "Renamed"}, {})
+
+        self.assertEqual(self.client.record(self.uid)["name"], "Renamed")
+        self.assertEqual(self.emulator.not_modified, 0)
+
+    def test_store_is_bounded_by_bytes(self):
+        store = conditional.ValidatorStore(max_bytes=10, max_body_bytes=8)
+        store.store("a", {"ETag": '"a"'}, b"123456")
+        store.store("b", {"ETag": '"b"'}, b"123456")
+        store.store("c", {"ETag": '"c"'}, b"123456789")
+
+        self.assertEqual(store.headers("a"), {})
+        self.assertEqual(store.headers("b"), {"If-None-Match": '"b"'})
+        self.assertEqual(store.headers("c"), {})
+        self.assertEqual(store.bytes, 6)
+
+    def test_shared_store_is_keyed_by_account(self):
+        store = conditional.ValidatorStore()
+        other = Emulator(api_key="other").start()
+        try:
+            first = Client(logger=logger, api_key="test", api_host=self.emulator.api_host,
+                           conditional_requests=store)
+            second = Client(logger=logger, api_key="other", api_host=other.api_host, conditional_requests=store)
+            first.hello()
+            second.hello()
+
+            # The same url of another host and account is stored and validated separately
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.conditional_requests, 0)
+        finally:
+            other.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
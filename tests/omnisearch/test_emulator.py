@@ -0,0 +1,67 @@
+import time
+import unittest
+
+import requests
+
+from omnisearch.emulator import Emulator, Faults
+
+
+class EmulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(
+            api_key="test",
+            faults={
+                "GET /hello": Faults(latency=0.1),
+                "GET /languages": Faults(error_rate=1.0),
+                "GET /schema/{type}": Faults(throttle_rate=1.0, retry_after=3),
+            },
+            seed=1,
+        ).start()
+        self.url = self.emulator.api_host + "/v1"
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def get(self, path, key="test"):
+        return requests.get(self.url + path, params={"key": key})
+
+    def test_records_round_trip(self):
+        created = requests.post(
+            self.url + "/records", params={"key": "test"}, json={"type": "post", "name": "Post", "properties": {}}
+        )
+        self.assertEqual(created.status_code, 201)
+
+        record = self.get(f"/records/{created.json()['uid']}")
+
+        self.assertEqual(record.json()["name"], "Post")
+        self.assertEqual(self.emulator.requests, 2)
+
+    def test_api_key_is_required(self):
+        self.assertEqual(self.get("/records/missing", key="wrong").status_code, 401)
+
+    def test_unknown_routes_and_records(self):
+        self.assertEqual(self.get("/nowhere").status_code, 404)
+        self.assertEqual(self.get("/records/missing").status_code, 404)
+
+    def test_latency_is_injected(self):
+        start = time.perf_counter()
+        self.assertEqual(self.get("/hello").status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+    def test_errors_and_throttling_are_injected(self):
+        self.assertEqual(self.get("/languages").status_code, 500)
+        throttled = self.get("/schema/post")
+        self.assertEqual(throttled.status_code, 429)
+        self.assertEqual(throttled.headers["Retry-After"], "3")
+
+    def test_unchanged_get_is_answered_with_304(self):
+        params = {"key": "test", "type": "post"}
+        etag = requests.get(self.url + "/records", params=params).headers["ETag"]
+        response = requests.get(self.url + "/records", params=params, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.emulator.not_modified, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
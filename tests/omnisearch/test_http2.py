@@ -0,0 +1,59 @@
+import logging
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator, Faults
+
+try:
+    import h2  # noqa: F401
+    import httpx  # noqa: F401
+except ImportError:
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+
+@unittest.skipIf(h2 is None, "needs httpx[http2]")
+class HTTP2TestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test", faults={"*": Faults(latency=0.01)}, http2=True).start()
+        self.events = []
+        self.client = Client(
+            logger=logger, api_key="test", api_host=self.emulator.api_host, http2="prior_knowledge",
+            hooks=[self.events.append],
+        )
+
+    def tearDown(self):
+        self.client.close()
+        self.emulator.stop()
+
+    def test_concurrent_requests_share_one_connection(self):
+        uid = self.client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            records = list(executor.map(lambda _: self.client.record(uid), range(256)))
+
+        self.assertTrue(all(record and record["uid"] == uid for record in records))
+        self.assertEqual(self.client.pool_stats.new_connections, 1)
+        self.assertEqual(self.client.pool_stats.requests, 257)
+
+    def test_connect_time_is_reported_by_the_opening_request(self):
+        self.client.hello()
+        self.client.hello()
+
+        self.assertGreater(self.events[0].connect, 0)
+        self.assertEqual(self.events[1].connect, 0)
+
+    def test_close_stops_the_event_loop_thread(self):
+        with Client(logger=logger, api_key="test", api_host=self.emulator.api_host, http2="prior_knowledge") as client:
+            self.assertEqual(client.hello()["message"], "Hello from the OmniSearch emulator")
+            thread = client.session._thread
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(client.session._loop.is_closed())
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
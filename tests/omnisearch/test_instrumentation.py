@@ -0,0 +1,80 @@
+import logging
+import unittest
+
+from omnisearch import exceptions, instrumentation
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+
+class MatchRouteTestCase(unittest.TestCase):
+    def test_known_routes(self):
+        self.assertEqual(
+            instrumentation.match_route("/records/record-1/objects/page/content"),
+            ("/records/{uid}/objects/{type}/content", {"uid": "record-1", "type": "page"}),
+        )
+        self.assertEqual(instrumentation.route_template("/search/post/detailed"), "/search/{type}/detailed")
+
+    def test_unknown_routes_share_one_template(self):
+        self.assertEqual(instrumentation.match_route("/records/record-1/unknown/x"), ("other", {}))
+        self.assertEqual(instrumentation.route_template("/users/user-1"), instrumentation.OTHER_ROUTE)
+
+
+class HistogramCollectorTestCase(unittest.TestCase):
+    def test_to_prometheus(self):
+        collector = instrumentation.HistogramCollector(buckets=(0.1, 1.0), prefix="test")
+        collector(instrumentation.RequestEvent(
+            "GET", "/hello", status=200, connect=0.05, ttfb=0.05, total=0.2, request_bytes=0, response_bytes=40,
+        ))
+        collector(instrumentation.RequestEvent(
+            "GET", "/hello", status=200, connect=0, ttfb=0.5, total=2.0, response_bytes=60, retries=1,
+        ))
+
+        lines = collector.to_prometheus().splitlines()
+        labels = 'method="GET",route="/hello",status="200"'
+        for line in (
+            "# HELP test_request_total_seconds Time until the response body was read.",
+            "# TYPE test_request_total_seconds histogram",
+            f'test_request_total_seconds_bucket{{{labels},le="0.1"}} 0',
+            f'test_request_total_seconds_bucket{{{labels},le="1.0"}} 1',
+            f'test_request_total_seconds_bucket{{{labels},le="+Inf"}} 2',
+            f"test_request_total_seconds_sum{{{labels}}} 2.2",
+            f"test_request_total_seconds_count{{{labels}}} 2",
+            f"test_request_connect_seconds_count{{{labels}}} 1",
+            "# TYPE test_response_bytes_total counter",
+            f"test_response_bytes_total{{{labels}}} 100",
+            f"test_retries_total{{{labels}}} 1",
+        ):
+            self.assertIn(line, lines)
+
+    def test_label_values_are_escaped(self):
+        collector = instrumentation.HistogramCollector(buckets=(1.0,), prefix="test")
+        collector(instrumentation.RequestEvent("GET", 'a\\b"c\nd', status=200, total=0.5))
+
+        output = collector.to_prometheus()
+        self.assertIn('test_retries_total{method="GET",route="a\\\\b\\"c\\nd",status="200"} 0', output)
+        # 3 histograms of 6 lines and 5 counters of 3, none split by the newline
+        self.assertEqual(len(output.splitlines()), 33)
+
+    def test_client_requests(self):
+        collector = instrumentation.HistogramCollector()
+        with Emulator(api_key="test") as emulator:
+            client = Client(logger=logger, api_key="test", api_host=emulator.api_host, hooks=[collector])
+            client.hello()
+            client.hello()
+            with self.assertLogs(logger, level="ERROR"), self.assertRaises(exceptions.OmniSearchError):
+                client.request(method="GET", url="/users/user-1")
+
+        output = collector.to_prometheus()
+        self.assertIn(
+            'omnisearch_client_request_total_seconds_count{method="GET",route="/hello",status="200"} 2', output
+        )
+        self.assertIn(
+            'omnisearch_client_request_total_seconds_count{method="GET",route="other",status="404"} 1', output
+        )
+        self.assertNotIn("user-1", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
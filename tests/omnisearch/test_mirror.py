@@ -0,0 +1,73 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+from omnisearch.mirror import Mirror
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.client = Client(logger=logger, api_key="test", api_host=self.emulator.api_host)
+        self.uids = [
+            self.client.create_records("post", f"Post {i}", {"title": f"Post {i}"}, {})["uid"] for i in range(12)
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+        self.mirror = Mirror(self.client, os.path.join(self.directory.name, "post.db"), page_size=5)
+        self.mirror.sync("post")
+
+    def tearDown(self):
+        self.mirror.close()
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def test_verified_sync_deletes_unseen_records(self):
+        self.client.delete_record(self.uids[0])
+
+        stats = self.mirror.sync("post")
+
+        self.assertTrue(stats["verified"])
+        self.assertEqual(stats["deleted"], 1)
+        self.assertEqual(self.mirror.count("post"), 11)
+
+    def test_unrecognized_first_page_deletes_nothing(self):
+        with mock.patch.object(self.client, "records", return_value={"unexpected": []}):
+            stats = self.mirror.sync("post")
+
+        self.assertFalse(stats["verified"])
+        self.assertEqual(stats["deleted"], 0)
+        self.assertEqual(self.mirror.count("post"), 12)
+
+    def test_empty_first_page_deletes_nothing(self):
+        with mock.patch.object(self.client, "records", return_value={"records": [], "total": 0}):
+            stats = self.mirror.sync("post")
+
+        self.assertFalse(stats["verified"])
+        self.assertEqual(self.mirror.count("post"), 12)
+
+    def test_short_walk_deletes_nothing(self):
+        # A page cut short, as when records deleted during the walk shift the pages
+        records = self.client.records
+
+        def short_pages(record_type, page=0, page_size=10):
+            response = records(record_type=record_type, page=page, page_size=page_size)
+            if page == 1:
+                response["records"] = response["records"][:2]
+            return response
+
+        with mock.patch.object(self.client, "records", side_effect=short_pages):
+            stats = self.mirror.sync("post")
+
+        self.assertFalse(stats["verified"])
+        self.assertEqual(stats["seen"], 7)
+        self.assertEqual(self.mirror.count("post"), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
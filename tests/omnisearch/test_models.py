@@ -0,0 +1,81 @@
+import logging
+import unittest
+
+from omnisearch import models
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+RECORD = {
+    "uid": "record-1",
+    "type": "post",
+    "name": "Tax reform",
+    "hidden": False,
+    "properties": {"title": "Tax reform", "tags": ["tax", "budget"]},
+    "data": {"body": "Réforme fiscale"},
+    "created": "2026-01-01",
+}
+
+
+class ModelTestCase(unittest.TestCase):
+    def test_nested_fields_are_held_encoded_and_decoded_on_access(self):
+        record = models.Record.from_dict(RECORD)
+
+        self.assertIsInstance(record._properties, bytes)
+        self.assertIsInstance(record._data, bytes)
+        self.assertEqual(record.properties, RECORD["properties"])
+        self.assertEqual(record.data, RECORD["data"])
+        self.assertEqual((record.uid, record.name, record.hidden), ("record-1", "Tax reform", False))
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_every_access_decodes_a_fresh_copy(self):
+        record = models.Record.from_dict(RECORD)
+        record.properties["title"] = "Changed"
+
+        self.assertEqual(record.properties["title"], "Tax reform")
+        self.assertIsNot(record.properties, record.properties)
+
+    def test_to_dict_round_trip(self):
+        record = models.Record.from_dict(RECORD)
+
+        self.assertEqual(record.extra, {"created": "2026-01-01"})
+        self.assertEqual(record.to_dict(), RECORD)
+        self.assertEqual(repr(record), "Record(uid='record-1', type='post', name='Tax reform', hidden=False)")
+
+    def test_missing_fields(self):
+        hit = models.SearchHit.from_dict({"uid": "record-1"})
+
+        self.assertIsNone(hit._objects)
+        self.assertIsNone(hit.objects)
+        self.assertEqual(hit.extra, {})
+        self.assertEqual(hit.to_dict(), {"uid": "record-1"})
+
+    def test_objects_and_schema(self):
+        objects = models.objects_from_response({"page": {"url": "https://example.com", "content": [1, 2]}})
+        self.assertEqual((objects["page"].type, objects["page"].content), ("page", [1, 2]))
+        self.assertEqual(models.objects_from_response(None), {})
+
+        schema = models.schema_from_response({"tags": [["tax", 2], ["budget", 1]]})
+        self.assertEqual(list(schema["tags"]), [("tax", 2), ("budget", 1)])
+        self.assertEqual((len(schema["tags"]), schema["tags"][1]), (2, ("budget", 1)))
+
+
+class ModelResponseTestCase(unittest.TestCase):
+    def test_models_match_client_responses(self):
+        with Emulator(api_key="test") as emulator:
+            client = Client(logger=logger, api_key="test", api_host=emulator.api_host)
+            for i in range(3):
+                client.create_records("post", f"Post {i}", {"title": f"Post {i}", "n": i}, {"body": "text"})
+
+            response = client.records("post", page_size=10)
+            self.assertEqual([record.to_dict() for record in models.records_from_response(response)], response["records"])
+
+            response = client.search("post", query="Post", detailed=True)
+            hits = models.hits_from_response(response)
+            self.assertEqual([hit.to_dict() for hit in hits], response["results"])
+            self.assertEqual(sorted(hit.properties["n"] for hit in hits), [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from omnisearch import exceptions, pagination
+
+
+def pages_of(items, page_size, first_page=0, total=True):
+    """fetch(page) over items, recording the pages requested"""
+    requested = []
+
+    def fetch(page):
+        requested.append(page)
+        start = (page - first_page) * page_size
+        response = {"records": items[start:start + page_size]}
+        if total:
+            response["total"] = len(items)
+        return response
+
+    return fetch, requested
+
+
+class PageItemsTestCase(unittest.TestCase):
+    def test_shapes(self):
+        self.assertEqual(pagination.page_items([1, 2]), [1, 2])
+        self.assertEqual(pagination.page_items({"results": [1]}), [1])
+        self.assertEqual(pagination.page_items({"hits": [1], "total": 1}), [1])
+        self.assertEqual(pagination.page_items(None), [])
+        self.assertEqual(pagination.page_items({"message": "ok"}), [])
+        self.assertFalse(pagination.is_page({"message": "ok"}))
+
+
+class IterPagesTestCase(unittest.TestCase):
+    def test_walks_every_page(self):
+        for prefetch in (True, False):
+            fetch, requested = pages_of(list(range(25)), 10)
+            self.assertEqual(list(pagination.iter_pages(fetch, 0, 10, prefetch=prefetch)), list(range(25)))
+            self.assertEqual(requested, [0, 1, 2])
+
+    def test_page_size_dividing_the_total_fetches_an_empty_last_page(self):
+        fetch, requested = pages_of(list(range(20)), 5, first_page=1)
+        self.assertEqual(list(pagination.iter_pages(fetch, 1, 5)), list(range(20)))
+        self.assertEqual(requested, [1, 2, 3, 4, 5])
+
+    def test_failed_page_raises(self):
+        def fetch(page):
+            return [page] * 10 if page == 0 else None
+
+        for prefetch in (True, False):
+            items = pagination.iter_pages(fetch, 0, 10, prefetch=prefetch)
+            with self.assertRaises(exceptions.OmniSearchError):
+                list(items)
+
+    def test_walk_verified(self):
+        fetch, _ = pages_of(list(range(25)), 10)
+        walk = pagination.Walk()
+        items = list(pagination.iter_pages(fetch, 0, 10, walk=walk))
+
+        self.assertEqual((walk.pages, walk.items), (3, 25))
+        self.assertTrue(walk.verified(len(items)))
+        self.assertFalse(walk.verified(24))
+
+    def test_walk_unverified(self):
+        fetch, _ = pages_of(list(range(25)), 10, total=False)
+        walk = pagination.Walk()
+        self.assertFalse(walk.verified(len(list(pagination.iter_pages(fetch, 0, 10, walk=walk)))))
+
+        walk = pagination.Walk()
+        items = pagination.iter_pages(pages_of(list(range(25)), 10)[0], 0, 10, walk=walk)
+        next(items)
+        items.close()
+        self.assertFalse(walk.finished)
+        self.assertFalse(walk.verified(25))
+
+
+if __name__ == "__main__":
+    unittest.main()
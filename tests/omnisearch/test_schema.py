@@ -0,0 +1,66 @@
+import logging
+import unittest
+
+from omnisearch import exceptions
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator, Faults
+
+logger = logging.getLogger(__name__)
+
+
+class RecordSchemaManyTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.emulator = Emulator(api_key="test").start()
+        cls.client = Client(logger=logger, api_key="test", api_host=cls.emulator.api_host)
+        for author, title in (("Ann", "Tax news"), ("Bob", "Audit news"), ("Ann", "Audit tips")):
+            cls.client.create_records("post", title, {"author": author, "title": title}, {})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.emulator.stop()
+
+    def test_facets_are_merged(self):
+        schema, errors = self.client.record_schema_many("post", [
+            {"properties": ["author"], "filters": [["title", "Contains", "Audit"]]},
+            {"properties": ["title"], "filters": [["author", "EqualTo", "Ann"]]},
+        ])
+
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(schema), ["author", "title"])
+        self.assertEqual(sorted(value for value, _ in schema["author"]), ["Ann", "Bob"])
+        self.assertEqual(sorted(value for value, _ in schema["title"]), ["Audit tips", "Tax news"])
+
+    def test_facet_query_overrides_the_shared_query(self):
+        schema, errors = self.client.record_schema_many(
+            "post", [{"properties": ["title"], "query": "Tax"}], query="Audit"
+        )
+
+        self.assertEqual(errors, {})
+        self.assertEqual([value for value, _ in schema["title"]], ["Tax news"])
+
+    def test_failed_facets_are_reported(self):
+        with self.assertLogs(self.client.logger, level="ERROR"):
+            schema, errors = self.client.record_schema_many("post", [
+                {"properties": ["author"]},
+                {"properties": ["title"], "unknown_argument": True},
+            ])
+
+        self.assertEqual(sorted(schema), ["author"])
+        self.assertEqual(list(errors), [1])
+        self.assertIsInstance(errors[1], TypeError)
+
+    def test_failed_requests_are_reported_with_their_error(self):
+        with Emulator(api_key="test", faults={"GET /schema/{type}": Faults(error_rate=1.0)}) as emulator:
+            client = Client(logger=logger, api_key="test", api_host=emulator.api_host)
+            with self.assertLogs(client.logger, level="ERROR"):
+                schema, errors = client.record_schema_many("post", [{}, {}])
+
+        self.assertEqual(schema, {})
+        self.assertEqual(sorted(errors), [0, 1])
+        self.assertIsInstance(errors[0], exceptions.OmniSearchError)
+        self.assertEqual(errors[0].status_code, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
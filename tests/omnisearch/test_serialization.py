@@ -0,0 +1,67 @@
+import logging
+import unittest
+
+from omnisearch import serialization
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS = [
+    {},
+    [],
+    {"uid": "record-1", "name": "Tax reform", "hidden": False, "data": None, "score": 0.125, "count": 2 ** 40},
+    {"title": "Réforme fiscale — 税制改革 🧾", "escapes": "quote \" backslash \\ newline \n tab \t"},
+    {"records": [{"properties": {"tags": ["a", "b"], "nested": {"deep": [1, [2, [3]]]}}} for _ in range(3)]},
+]
+
+
+def installed_codecs():
+    for name in serialization.CODECS:
+        try:
+            yield serialization.get_codec(name)
+        except ImportError:
+            pass
+
+
+class CodecTestCase(unittest.TestCase):
+    def test_round_trip_matches_json_codec(self):
+        reference = serialization.JsonCodec()
+        for codec in installed_codecs():
+            for document in DOCUMENTS:
+                with self.subTest(codec=codec.name, document=document):
+                    encoded = codec.dumps(document)
+                    self.assertIsInstance(encoded, bytes)
+                    self.assertEqual(codec.loads(encoded), document)
+                    self.assertEqual(reference.loads(encoded), document)
+                    self.assertEqual(codec.loads(reference.dumps(document)), document)
+
+    def test_loads_accepts_str(self):
+        for codec in installed_codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.loads('{"name": "Ünïcode"}'), {"name": "Ünïcode"})
+
+    def test_get_codec(self):
+        self.assertIsInstance(serialization.get_codec(), serialization.JsonCodec)
+        self.assertIn(serialization.get_codec("auto").name, serialization.CODECS)
+        with self.assertRaises(ValueError):
+            serialization.get_codec("pickle")
+
+        codec = serialization.JsonCodec()
+        self.assertIs(serialization.get_codec(codec), codec)
+
+
+class ClientCodecTestCase(unittest.TestCase):
+    def test_every_codec_talks_to_the_api(self):
+        with Emulator(api_key="test") as emulator:
+            for codec in installed_codecs():
+                with self.subTest(codec=codec.name):
+                    client = Client(logger=logger, api_key="test", api_host=emulator.api_host, codec=codec)
+                    properties = DOCUMENTS[3]
+                    uid = client.create_records("post", codec.name, properties, {"n": 1})["uid"]
+                    record = client.record(uid)
+                    self.assertEqual((record["properties"], record["data"]), (properties, {"n": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
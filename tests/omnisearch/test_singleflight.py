@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+from omnisearch import singleflight
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator, Faults
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_concurrent_record_calls_share_one_request(self):
+        with Emulator(api_key="test", faults={"GET /records/{uid}": Faults(latency=0.2)}) as emulator:
+            client = Client(logger=logger, api_key="test", api_host=emulator.api_host, coalesce=True)
+            uid = client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+            requests_before = emulator.requests
+
+            results = [None] * 8
+            barrier = threading.Barrier(len(results))
+
+            def call(i):
+                barrier.wait()
+                results[i] = client.record(uid)
+
+            threads = [threading.Thread(target=call, args=(i,)) for i in range(len(results))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertTrue(all(result["uid"] == uid for result in results))
+            self.assertEqual(emulator.requests - requests_before, 1)
+            self.assertEqual(client.single_flight.stats(), {"calls": 1, "coalesced": 7, "in_flight": 0})
+
+    def test_errors_are_shared(self):
+        flight = singleflight.SingleFlight()
+
+        def fail():
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fail)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_async_calls_share_one_call(self):
+        flight = singleflight.AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {"calls": 1, "coalesced": 4, "in_flight": 0})
+
+    def test_sync_client_does_not_import_asyncio(self):
+        code = "import sys, omnisearch.client; print('asyncio' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=ROOT).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import importlib.util
+import io
+import logging
+import unittest
+
+from omnisearch import exceptions, streaming
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+
+logger = logging.getLogger(__name__)
+
+
+class RecordingClient(Client):
+    """Client keeping the streamed responses it returns"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.responses = []
+
+    def request(self, method, url, data=None, params=None, stream=False):
+        response = super().request(method=method, url=url, data=data, params=params, stream=stream)
+        if stream:
+            self.responses.append(response)
+        return response
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.raw = io.BytesIO(body)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@unittest.skipUnless(importlib.util.find_spec("ijson"), "needs ijson")
+class IterResponseItemsTestCase(unittest.TestCase):
+    def test_items(self):
+        response = FakeResponse(b'{"total": 2, "results": [{"n": 1}, {"n": 2}]}')
+        self.assertEqual(list(streaming.iter_response_items(response)), [{"n": 1}, {"n": 2}])
+        self.assertTrue(response.closed)
+
+    def test_closed_after_parse_error(self):
+        response = FakeResponse(b'[{"n": 1}, {"n": ')
+        items = streaming.iter_response_items(response)
+        self.assertEqual(next(items), {"n": 1})
+        with self.assertRaises(Exception):
+            next(items)
+        self.assertTrue(response.closed)
+
+
+@unittest.skipUnless(importlib.util.find_spec("ijson"), "needs ijson")
+class ClientStreamingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        # Uncompressed, so a partially read response is still open
+        self.client = RecordingClient(
+            logger=logger, api_key="test", api_host=self.emulator.api_host, accept_encoding="identity"
+        )
+        self.uid = self.client.create_records("post", "Post", {"title": "Post"}, {})["uid"]
+        self.content = [{"paragraph": i, "text": "lorem ipsum " * 20} for i in range(2000)]
+        self.client.update_record_objects_type(self.uid, "page", {
+            "content": self.content,
+            "transcript": [{"start": i, "text": "segment"} for i in range(3)],
+        })
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_request_is_sent_when_iteration_starts(self):
+        requests = self.emulator.requests
+        items = self.client.stream_record_type_content(self.uid, "page")
+        self.assertEqual(self.emulator.requests, requests)
+
+        items.close()
+        self.assertEqual(self.emulator.requests, requests)
+        self.assertEqual(self.client.responses, [])
+
+    def test_response_closed_after_partial_iteration(self):
+        items = self.client.stream_record_type_content(self.uid, "page")
+        self.assertEqual([next(items) for _ in range(2)], self.content[:2])
+        self.assertFalse(self.client.responses[0].raw.closed)
+
+        items.close()
+        self.assertTrue(self.client.responses[0].raw.closed)
+
+    def test_response_closed_when_exhausted(self):
+        self.assertEqual(list(self.client.stream_record_type_content(self.uid, "page")), self.content)
+        self.assertEqual(len(list(self.client.stream_record_type_transcript(self.uid, "page"))), 3)
+        self.assertEqual(len(list(self.client.stream_search("post", query="Post"))), 1)
+        self.assertTrue(all(response.raw.closed for response in self.client.responses))
+
+    def test_failed_request_raises_on_iteration(self):
+        items = self.client.stream_record_type_content(self.uid, "missing")
+        with self.assertLogs(logger, level="ERROR"), self.assertRaises(exceptions.OmniSearchError) as raised:
+            next(items)
+        self.assertEqual(raised.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
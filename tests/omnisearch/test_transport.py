@@ -0,0 +1,83 @@
+import logging
+import threading
+import unittest
+
+from omnisearch import exceptions, transport
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator, Faults
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStatsTestCase(unittest.TestCase):
+    def test_as_dict(self):
+        stats = transport.PoolStats()
+        self.assertEqual(stats.as_dict()["reuse_rate"], 0.0)
+
+        for exhausted in (False, False, True, False):
+            stats.record_checkout(exhausted, 0.25)
+        stats.record_new_connection()
+
+        self.assertEqual(stats.as_dict(), {
+            "requests": 4,
+            "new_connections": 1,
+            "reused_connections": 3,
+            "reuse_rate": 0.75,
+            "exhausted": 1,
+            "wait_time": 1.0,
+        })
+
+
+class PooledHTTPAdapterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test", faults={"GET /records/{uid}": Faults(latency=0.05)}).start()
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def make_client(self, **kwargs):
+        return Client(logger=logger, api_key="test", api_host=self.emulator.api_host, **kwargs)
+
+    def test_keep_alive_reuses_one_connection(self):
+        client = self.make_client()
+        for _ in range(5):
+            client.hello()
+
+        stats = client.pool_stats.as_dict()
+        self.assertEqual((stats["requests"], stats["new_connections"], stats["reused_connections"]), (5, 1, 4))
+
+    def test_without_keep_alive_every_request_connects(self):
+        client = self.make_client(keep_alive=False)
+        for _ in range(3):
+            client.hello()
+
+        self.assertEqual(client.pool_stats.as_dict()["new_connections"], 3)
+        self.assertGreater(transport.connect_time(), 0.0)
+
+    def test_blocking_pool_never_opens_more_than_pool_maxsize(self):
+        client = self.make_client(pool_maxsize=2, pool_block=True)
+        threads = [threading.Thread(target=client.record, args=("record-missing",)) for _ in range(6)]
+        with self.assertLogs(logger, level="ERROR"):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        stats = client.pool_stats.as_dict()
+        self.assertEqual(stats["requests"], 6)
+        self.assertLessEqual(stats["new_connections"], 2)
+        self.assertGreater(stats["exhausted"], 0)
+        self.assertGreater(stats["wait_time"], 0.0)
+
+    def test_read_timeout(self):
+        client = self.make_client(read_timeout=0.01)
+        with self.assertLogs(logger, level="ERROR") as logs, self.assertRaises(exceptions.OmniSearchError):
+            client.request(method="GET", url="/records/record-missing")
+
+        self.assertIn("ReadTimeout", logs.output[0])
+        self.assertNotIn("key=test", logs.output[0])
+        self.assertEqual(client.timeout, (10.0, 0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
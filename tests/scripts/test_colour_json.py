@@ -0,0 +1,31 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+
+from scripts.colour_json import print_json_stream
+
+
+class PrintJsonStreamTestCase(unittest.TestCase):
+    def test_json_array_is_closed_when_items_fail(self):
+        def items():
+            yield {"uid": "a"}
+            yield {"uid": "b"}
+            raise RuntimeError("page failed")
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), self.assertRaises(RuntimeError):
+            print_json_stream(items(), output="json")
+
+        self.assertEqual(json.loads(stdout.getvalue()), [{"uid": "a"}, {"uid": "b"}])
+
+    def test_ndjson(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            print_json_stream(iter([{"uid": "a"}, {"uid": "b"}]), output="ndjson")
+
+        self.assertEqual(stdout.getvalue(), '{"uid":"a"}\n{"uid":"b"}\n')
+
+
+if __name__ == "__main__":
+    unittest.main()
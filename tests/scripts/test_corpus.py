@@ -0,0 +1,63 @@
+import gzip
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from scripts import corpus
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "data")
+SPEC_ARGS = {
+    "generate": os.path.join(DATA, "post_chance.json"),
+    "properties": os.path.join(DATA, "post_properties.json"),
+    "data": os.path.join(DATA, "post_data.json"),
+}
+
+
+class GenerateCorpusTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def generate(self, name, count=250, **kwargs):
+        path = os.path.join(self.directory.name, name)
+        corpus.generate_corpus(path, count, SPEC_ARGS, chunk_size=40, **kwargs)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def test_same_seed_same_corpus_whatever_the_processes(self):
+        single = self.generate("single.jsonl", seed=7, processes=1)
+        pooled = self.generate("pooled.jsonl", seed=7, processes=3)
+        gzipped = self.generate("pooled.jsonl.gz", seed=7, processes=2)
+
+        self.assertEqual(single, pooled)
+        self.assertEqual(single, gzipped)
+
+    def test_other_seed_other_corpus(self):
+        self.assertNotEqual(self.generate("a.jsonl", seed=1, processes=1), self.generate("b.jsonl", seed=2, processes=1))
+
+    def test_records(self):
+        progress = []
+        lines = self.generate("corpus.jsonl", count=100, seed=0, processes=2, progress=progress.append).splitlines()
+
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(progress, [40, 80, 100])
+        for line in lines:
+            record = json.loads(line)
+            self.assertEqual(record["record_type"], "post")
+            self.assertEqual(record["name"], record["properties"]["title"])
+
+    def test_record_json_matches_record(self):
+        spec = corpus.CorpusSpec(**SPEC_ARGS)
+        random.seed("state")
+        expected = spec.record()
+        random.seed("state")
+        self.assertEqual(json.loads(spec.record_json()), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from omnisearch.client import Client
+from omnisearch.emulator import Emulator
+from scripts.cli import cli
+from scripts.ingest import Checkpoint, to_record
+
+logger = logging.getLogger(__name__)
+
+
+class ToRecordTestCase(unittest.TestCase):
+    def test_both_shapes(self):
+        self.assertEqual(
+            to_record('{"uid": "record-1", "type": "post", "name": "Post"}'),
+            {"record_type": "post", "name": "Post", "properties": {}, "data": {}, "hidden": False,
+             "record_id": "record-1"},
+        )
+        self.assertEqual(to_record('{"name": "Post"}', record_type="post")["record_type"], "post")
+
+    def test_invalid_lines(self):
+        for line in ("[1, 2]", "42", '"post"', "null", "{", '{"record_type": "post"}', '{"name": "Post"}'):
+            with self.subTest(line=line), self.assertRaises((ValueError, KeyError)):
+                to_record(line)
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def test_watermark_only_advances_over_contiguous_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = Checkpoint(os.path.join(directory, "checkpoint"), os.path.join(directory, "records.jsonl"))
+            checkpoint.complete(1, 20, "created")
+            checkpoint.complete(2, 30, "failed")
+            self.assertEqual((checkpoint.line, checkpoint.offset), (0, 0))
+
+            checkpoint.complete(0, 10, "updated")
+            self.assertEqual((checkpoint.line, checkpoint.offset), (3, 30))
+            self.assertEqual(checkpoint.counts, {"created": 1, "updated": 1, "failed": 1})
+
+            checkpoint.save()
+            reloaded = Checkpoint(checkpoint.path, checkpoint.source)
+            self.assertEqual((reloaded.line, reloaded.offset, reloaded.counts),
+                             (3, 30, {"created": 1, "updated": 1, "failed": 1}))
+
+
+class IngestResumeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.client = Client(logger=logger, api_key="test", api_host=self.emulator.api_host)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "records.jsonl")
+        with open(self.path, "w") as f:
+            for i in range(5):
+                f.write(json.dumps({"record_type": "post", "name": f"Post {i}", "properties": {"n": i}}) + "\n")
+
+    def tearDown(self):
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def ingest(self, *args):
+        return CliRunner().invoke(
+            cli, ["ingest", "--host", self.emulator.api_host, "--key", "test", "--file", self.path, *args]
+        )
+
+    def test_resume_sends_only_lines_after_the_checkpoint(self):
+        # A run interrupted after the first three lines
+        with open(self.path, "rb") as f:
+            offset = sum(len(f.readline()) for _ in range(3))
+        checkpoint = Checkpoint(f"{self.path}.checkpoint", self.path)
+        checkpoint.line, checkpoint.offset, checkpoint.counts["created"] = 3, offset, 3
+        checkpoint.save()
+
+        result = self.ingest()
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        names = sorted(r["name"] for r in self.client.iter_records("post"))
+        self.assertEqual(names, ["Post 3", "Post 4"])
+        resumed = Checkpoint(f"{self.path}.checkpoint", self.path)
+        self.assertEqual((resumed.line, resumed.counts["created"]), (5, 5))
+
+    def test_restart_ignores_the_checkpoint(self):
+        self.assertEqual(self.ingest().exit_code, 0)
+        self.assertEqual(self.ingest("--restart").exit_code, 0)
+        self.assertEqual(len(list(self.client.iter_records("post"))), 10)
+
+    def test_failed_records_exit_1(self):
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"record_id": "record-missing", "name": "Missing"}) + "\n")
+
+        result = self.ingest()
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(Checkpoint(f"{self.path}.checkpoint", self.path).counts,
+                         {"created": 5, "updated": 0, "failed": 1})
+
+    def test_lines_that_are_not_records_fail_alone(self):
+        with open(self.path, "a") as f:
+            f.write("[1, 2]\n42\n")
+            f.write(json.dumps({"record_type": "post", "name": "Post 5", "properties": {}}) + "\n")
+
+        for _ in range(2):
+            result = self.ingest()
+
+            self.assertEqual(result.exit_code, 1, result.output)
+            self.assertIsInstance(result.exception, SystemExit)
+            self.assertEqual(Checkpoint(f"{self.path}.checkpoint", self.path).line, 8)
+        names = sorted(r["name"] for r in self.client.iter_records("post"))
+        self.assertEqual(names, [f"Post {i}" for i in range(6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
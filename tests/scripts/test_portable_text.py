@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+
+from portabletext_html import PortableTextRenderer
+
+from scripts import portable_text
+
+DOCUMENT = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "data", "post_portabletext.json")
+
+
+def block(key, style="normal", list_item=None):
+    value = {
+        "_type": "block", "_key": key, "style": style, "markDefs": [],
+        "children": [{"_type": "span", "_key": f"{key}-span", "marks": ["em"] if style == "normal" else [], "text": key}],
+    }
+    if list_item:
+        value["listItem"], value["level"] = list_item, 1
+    return value
+
+
+def baseline(blocks):
+    """The renderer-per-block rendering BatchRenderer replaced"""
+    return "".join(PortableTextRenderer(b, custom_serializers=portable_text.SERIALIZERS).render() for b in blocks)
+
+
+def whole_document(blocks):
+    """One renderer over the whole document, without its wrapping div"""
+    html = PortableTextRenderer(blocks, custom_serializers=portable_text.SERIALIZERS).render()
+    return html[len("<div>"):-len("</div>")] if len(blocks) > 1 else html
+
+
+class BatchRendererTestCase(unittest.TestCase):
+    def setUp(self):
+        with open(DOCUMENT, "r") as f:
+            self.sample = json.load(f)
+        self.blocks = [b for i in range(30) for b in (block(f"h{i}", style="h2"), block(f"p{i}"))] + self.sample
+
+    def test_matches_the_baseline_renderer(self):
+        for batch_size in (1, 7, portable_text.BATCH_SIZE):
+            with self.subTest(batch_size=batch_size):
+                self.assertEqual(portable_text.render_blocks(self.blocks, batch_size=batch_size), baseline(self.blocks))
+
+    def test_renderer_is_reused_between_documents(self):
+        renderer = portable_text.BatchRenderer()
+        self.assertEqual(renderer.render_batch(self.sample), baseline(self.sample))
+        self.assertEqual(renderer.render_batch(self.blocks[:4]), baseline(self.blocks[:4]))
+
+    def test_lists_are_never_split(self):
+        items = [block(f"item{i}", list_item="bullet") for i in range(5)]
+        blocks = [block("before")] * 3 + items + [block("after")]
+
+        batches = list(portable_text.batches(blocks, batch_size=4))
+        self.assertEqual([len(batch) for batch in batches], [8, 1])
+
+        html = portable_text.render_blocks(blocks, batch_size=4)
+        self.assertEqual(html, whole_document(blocks))
+        self.assertEqual(html.count("<ul>"), 1)
+
+    def test_parallel_rendering_matches_serial(self):
+        blocks = self.blocks * 5
+        self.assertEqual(
+            portable_text.render_blocks(blocks, processes=2, batch_size=16, parallel_threshold=100),
+            portable_text.render_blocks(blocks, processes=1),
+        )
+
+
+class RenderCacheTestCase(unittest.TestCase):
+    def test_cached_documents_are_not_rendered_again(self):
+        content = json.dumps([block("cached")])
+        with tempfile.TemporaryDirectory() as directory:
+            cache = portable_text.RenderCache(directory)
+            html = portable_text.render_document(content, cache=cache)
+            self.assertEqual(html, '<p><em>cached</em></p>')
+
+            cache.set(cache.key(content), "stored")
+            self.assertEqual(portable_text.render_document(content, cache=cache), "stored")
+
+            objects = {"content": {"type": "portable_text", "content": content}, "other": {"type": "x", "url": "u"}}
+            self.assertEqual(
+                portable_text.convert_objects(objects, cache=cache),
+                {"content": {"content": "stored"}, "other": {"url": "u"}},
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from omnisearch.emulator import Emulator
+from scripts import cli
+
+
+class SessionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator(api_key="test").start()
+        self.options = ["--host", self.emulator.api_host, "--key", "test"]
+        self.runner = CliRunner()
+
+    def invoke(self, args, stdin=None):
+        return self.runner.invoke(cli.cli, args + self.options, input=stdin)
+
+    def tearDown(self):
+        cli.close_clients()
+        self.emulator.stop()
+
+    def session_client(self):
+        """The client the session's commands will use, still readable once the session closed it"""
+        return cli.make_client(self.emulator.api_host, "v1", "test")
+
+    def test_run_line_reuses_the_session_client(self):
+        client = self.session_client()
+        for _ in range(3):
+            self.assertTrue(cli.run_line("hello", self.emulator.api_host, "v1", "test", False, "json"))
+        self.assertTrue(cli.run_line("# comment only", None, None, None, False, None))
+
+        self.assertIs(self.session_client(), client)
+        stats = client.pool_stats.as_dict()
+        self.assertEqual((stats["requests"], stats["new_connections"]), (3, 1))
+
+    def test_run_line_failures(self):
+        host = self.emulator.api_host
+        self.assertFalse(cli.run_line("no-such-command", host, "v1", "test", False, "json"))
+        self.assertFalse(cli.run_line("batch --file commands.txt", host, "v1", "test", False, "json"))
+        self.assertFalse(cli.run_line("get-record --no_such_option", host, "v1", "test", False, "json"))
+
+    def test_batch_shares_one_connection(self):
+        client = self.session_client()
+        result = self.invoke(["batch", "--output", "json"], stdin="hello\n# comment\n\n" * 20)
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.count("Hello from the OmniSearch emulator"), 20)
+        stats = client.pool_stats.as_dict()
+        self.assertEqual((stats["requests"], stats["new_connections"], stats["reused_connections"]), (20, 1, 19))
+        # Closed with the session
+        self.assertEqual(cli._clients, {})
+
+    def test_batch_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            properties = os.path.join(directory, "properties.json")
+            with open(properties, "w") as f:
+                json.dump({"title": "$title"}, f)
+            path = os.path.join(directory, "commands.txt")
+            with open(path, "w") as f:
+                f.write(f"create-records --record_type post --name Post --properties {properties} -r title Post\n")
+                f.write("get-records --record_type post --output json\n")
+            result = self.invoke(["batch", "--file", path])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        records = json.loads(result.output.strip().splitlines()[-1])["records"]
+        self.assertEqual([record["name"] for record in records], ["Post"])
+
+    def test_batch_failures(self):
+        commands = "hello\nno-such-command\nhello\n"
+
+        client = self.session_client()
+        result = self.invoke(["batch"], stdin=commands)
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(client.pool_stats.requests, 2)
+
+        client = self.session_client()
+        result = self.invoke(["batch", "--stop_on_error"], stdin=commands)
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(client.pool_stats.requests, 1)
+
+    def test_shell(self):
+        client = self.session_client()
+        result = self.invoke(["shell", "--output", "json"], stdin="hello\nno-such-command\nhello\nquit\nhello\n")
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.count("Hello from the OmniSearch emulator"), 2)
+        self.assertEqual(client.pool_stats.new_connections, 1)
+        self.assertEqual(cli._clients, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import unittest
+
+from scripts.templates import JsonTemplate
+
+VALUES = {"title": 'Say "hi" \\ bye', "slug": "say-hi", "categories": '["Tax"]'}
+
+
+class JsonTemplateTestCase(unittest.TestCase):
+    def test_values_in_strings_are_escaped(self):
+        template = JsonTemplate('{"title": "$title", "url": "/posts/$slug.html", "categories": $categories}')
+        expected = {"title": 'Say "hi" \\ bye', "url": "/posts/say-hi.html", "categories": ["Tax"]}
+
+        self.assertEqual(template.render(VALUES), expected)
+        self.assertEqual(json.loads(template.render_json(VALUES)), expected)
+
+    def test_values_in_nested_json_strings_are_escaped_twice(self):
+        nested = json.dumps([{"_type": "span", "text": "$title: ${slug}"}])
+        template = JsonTemplate(json.dumps({"content": nested, "prefix": "[$title]"}))
+
+        for rendered in (template.render(VALUES), json.loads(template.render_json(VALUES))):
+            self.assertEqual(json.loads(rendered["content"]), [{"_type": "span", "text": 'Say "hi" \\ bye: say-hi'}])
+            # Not JSON, so substituted as it is
+            self.assertEqual(rendered["prefix"], '[Say "hi" \\ bye]')
+
+    def test_missing_values_are_left_in_place(self):
+        template = JsonTemplate(json.dumps({"content": json.dumps({"text": "$h1 $$ $title"})}))
+
+        rendered = template.render({"title": '"'})
+
+        self.assertEqual(json.loads(rendered["content"]), {"text": '$h1 $ "'})
+
+
+if __name__ == "__main__":
+    unittest.main()